@@ -0,0 +1,780 @@
+#!/usr/bin/env python3
+"""arXiv OAI-PMH Category Harvester.
+
+Mirrors the metadata of whole arXiv categories into a local SQLite store
+through arXiv's OAI-PMH interface, which serves full listings with
+resumption tokens and can return only the records changed since a date.
+The first harvest of a category downloads it once; later runs fetch only
+the delta since the previous run. ``arxiv_search.py --local`` queries the
+store.
+
+Usage:
+    python arxiv_oai.py harvest CATEGORY [CATEGORY ...] [--from DATE] [--full]
+    python arxiv_oai.py stats
+
+Examples:
+    python arxiv_oai.py harvest cs.LG stat.ML
+    python arxiv_oai.py harvest q-bio --from 2024-01-01
+    python arxiv_search.py "cat:cs.LG diffusion model" --local
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from typing import Any, Iterator
+
+OAI_ENDPOINT = "https://oaipmh.arxiv.org/oai"
+METADATA_PREFIX = "arXiv"
+
+DEFAULT_STORE = os.path.join(
+    os.getenv("ARXIV_STORE_DIR", os.path.expanduser("~/.cache/academic-search")),
+    "arxiv.sqlite",
+)
+
+# Physics archives are grouped under the "physics" OAI set
+PHYSICS_ARCHIVES = {
+    "astro-ph", "cond-mat", "gr-qc", "hep-ex", "hep-lat", "hep-ph", "hep-th", "math-ph",
+    "nlin", "nucl-ex", "nucl-th", "physics", "quant-ph",
+}
+
+DEFAULT_MAX_RETRIES = 5
+REQUEST_TIMEOUT = 120
+
+OAI = "{http://www.openarchives.org/OAI/2.0/}"
+ARXIV = "{http://arxiv.org/OAI/arXiv/}"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS papers (
+    id INTEGER PRIMARY KEY,
+    arxiv_id TEXT NOT NULL UNIQUE,
+    title TEXT, authors TEXT, abstract TEXT,
+    categories TEXT, created TEXT, updated TEXT,
+    doi TEXT, journal_ref TEXT, comments TEXT, license TEXT,
+    datestamp TEXT
+);
+CREATE INDEX IF NOT EXISTS papers_created ON papers (created);
+CREATE TABLE IF NOT EXISTS paper_categories (
+    paper INTEGER NOT NULL, category TEXT NOT NULL,
+    PRIMARY KEY (paper, category)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS paper_categories_category ON paper_categories (category);
+CREATE TABLE IF NOT EXISTS harvests (
+    category TEXT PRIMARY KEY,
+    set_spec TEXT, harvested_through TEXT,
+    resumption_token TEXT, token_from TEXT, token_started TEXT,
+    updated TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5 (
+    title, authors, abstract,
+    content='papers', content_rowid='id',
+    tokenize='porter unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS papers_insert AFTER INSERT ON papers BEGIN
+    INSERT INTO papers_fts (rowid, title, authors, abstract)
+    VALUES (new.id, new.title, new.authors, new.abstract);
+END;
+CREATE TRIGGER IF NOT EXISTS papers_update AFTER UPDATE ON papers BEGIN
+    INSERT INTO papers_fts (papers_fts, rowid, title, authors, abstract)
+    VALUES ('delete', old.id, old.title, old.authors, old.abstract);
+    INSERT INTO papers_fts (rowid, title, authors, abstract)
+    VALUES (new.id, new.title, new.authors, new.abstract);
+END;
+CREATE TRIGGER IF NOT EXISTS papers_delete AFTER DELETE ON papers BEGIN
+    INSERT INTO papers_fts (papers_fts, rowid, title, authors, abstract)
+    VALUES ('delete', old.id, old.title, old.authors, old.abstract);
+END;
+"""
+
+# arXiv query fields to store columns; "cat:" becomes a category condition
+FIELD_COLUMNS = {"ti": "title", "au": "authors", "author": "authors", "abs": "abstract", "all": ""}
+
+HARVEST_STATE = ("set_spec", "harvested_through", "resumption_token", "token_from", "token_started", "updated")
+
+QUERY_TOKEN = re.compile(r'"[^"]*"|[()]|[^\s()"]+')
+OPERATORS = {"AND", "OR", "NOT", "ANDNOT"}
+
+
+def oai_set(category: str) -> str:
+    """Get the OAI set containing an arXiv category or archive.
+
+    Parameters
+    ----------
+    category : str
+        A category ("cs.LG", "hep-th"), an archive ("cs", "q-bio"), or an
+        OAI set spec ("physics:hep-th"), returned unchanged.
+
+    Returns:
+        OAI set spec, e.g. "cs" for "cs.LG" and "physics:hep-th" for "hep-th".
+    """
+    if ":" in category:
+        return category
+    archive = category.split(".")[0]
+    return f"physics:{archive}" if archive in PHYSICS_ARCHIVES else archive
+
+
+def _category_filter(category: str) -> str | None:
+    """Get the category to keep from its set, or None to keep the whole set."""
+    return category if "." in category and ":" not in category else None
+
+
+def _text(element: ET.Element | None, path: str) -> str:
+    """Get whitespace-normalized text of a child element."""
+    if element is None:
+        return ""
+    child = element.find(path)
+    return " ".join(child.text.split()) if child is not None and child.text else ""
+
+
+def parse_record(record: ET.Element) -> dict[str, Any]:
+    """Convert an OAI-PMH record in arXiv metadata format to a paper dictionary.
+
+    Parameters
+    ----------
+    record : xml.etree.ElementTree.Element
+        An OAI ``record`` element.
+
+    Returns:
+        Paper dictionary with arxiv_id, title, authors (list), abstract,
+        categories (list, primary first), created, updated, doi,
+        journal_ref, comments, license, datestamp and deleted.
+    """
+    header = record.find(f"{OAI}header")
+    identifier = _text(header, f"{OAI}identifier")
+    paper: dict[str, Any] = {
+        "arxiv_id": identifier.rsplit(":", 1)[-1],
+        "datestamp": _text(header, f"{OAI}datestamp"),
+        "deleted": header is not None and header.get("status") == "deleted",
+    }
+    metadata = record.find(f"{OAI}metadata/{ARXIV}arXiv")
+    if metadata is None:
+        return paper
+
+    authors = []
+    for author in metadata.iterfind(f"{ARXIV}authors/{ARXIV}author"):
+        name = " ".join(filter(None, (_text(author, f"{ARXIV}forenames"), _text(author, f"{ARXIV}keyname"),
+                                      _text(author, f"{ARXIV}suffix"))))
+        if name:
+            authors.append(name)
+
+    paper.update({
+        "arxiv_id": _text(metadata, f"{ARXIV}id") or paper["arxiv_id"],
+        "title": _text(metadata, f"{ARXIV}title"),
+        "authors": authors,
+        "abstract": _text(metadata, f"{ARXIV}abstract"),
+        "categories": _text(metadata, f"{ARXIV}categories").split(),
+        "created": _text(metadata, f"{ARXIV}created"),
+        "updated": _text(metadata, f"{ARXIV}updated"),
+        "doi": _text(metadata, f"{ARXIV}doi"),
+        "journal_ref": _text(metadata, f"{ARXIV}journal-ref"),
+        "comments": _text(metadata, f"{ARXIV}comments"),
+        "license": _text(metadata, f"{ARXIV}license"),
+    })
+    return paper
+
+
+class OAIError(Exception):
+    """An OAI-PMH error response (other than noRecordsMatch)."""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(f"{code}: {message}")
+        self.code = code
+
+
+def parse_list_records(stream: Any) -> Iterator[dict[str, Any] | tuple[str, str]]:
+    """Stream-parse a ListRecords response.
+
+    Records are yielded as soon as their closing tag is read and then
+    cleared, so a page never has to be held in memory as a tree.
+
+    Parameters
+    ----------
+    stream : file-like
+        Response body.
+
+    Yields:
+        Paper dictionaries (see parse_record), then one
+        ("resumptionToken", token) tuple (an empty token on the last page)
+        and one ("responseDate", date) tuple.
+
+    Raises:
+        OAIError: On an OAI-PMH error other than noRecordsMatch.
+    """
+    token = ""
+    response_date = ""
+    records = None
+    for event, element in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            if element.tag == f"{OAI}ListRecords":
+                records = element
+            continue
+        if element.tag == f"{OAI}record":
+            yield parse_record(element)
+            # Each record is detached as soon as it is parsed
+            if records is not None:
+                records.remove(element)
+        elif element.tag == f"{OAI}resumptionToken":
+            token = (element.text or "").strip()
+        elif element.tag == f"{OAI}responseDate":
+            response_date = (element.text or "").strip()
+        elif element.tag == f"{OAI}error":
+            code = element.get("code", "")
+            if code != "noRecordsMatch":
+                raise OAIError(code, (element.text or "").strip())
+    yield ("resumptionToken", token)
+    yield ("responseDate", response_date)
+
+
+class ArxivStore:
+    """Local SQLite store of arXiv metadata with an FTS5 index."""
+
+    def __init__(self, path: str = DEFAULT_STORE):
+        """Open (or create) the store.
+
+        Parameters
+        ----------
+        path : str
+            SQLite file (":memory:" for no persistence).
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self) -> ArxivStore:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the database."""
+        self.conn.close()
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+
+    def upsert(self, paper: dict[str, Any]) -> None:
+        """Insert or replace one paper, or remove it if the record is deleted.
+
+        Parameters
+        ----------
+        paper : dict[str, Any]
+            Paper dictionary from parse_record.
+        """
+        if paper.get("deleted"):
+            row = self.conn.execute("SELECT id FROM papers WHERE arxiv_id = ?", (paper["arxiv_id"],)).fetchone()
+            if row is not None:
+                self.conn.execute("DELETE FROM paper_categories WHERE paper = ?", row)
+                self.conn.execute("DELETE FROM papers WHERE id = ?", row)
+            return
+
+        self.conn.execute(
+            "INSERT INTO papers (arxiv_id, title, authors, abstract, categories, created, updated, doi, "
+            "journal_ref, comments, license, datestamp) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (arxiv_id) DO UPDATE SET title = excluded.title, authors = excluded.authors, "
+            "abstract = excluded.abstract, categories = excluded.categories, created = excluded.created, "
+            "updated = excluded.updated, doi = excluded.doi, journal_ref = excluded.journal_ref, "
+            "comments = excluded.comments, license = excluded.license, datestamp = excluded.datestamp",
+            (paper["arxiv_id"], paper["title"], "; ".join(paper["authors"]), paper["abstract"],
+             " ".join(paper["categories"]), paper["created"], paper["updated"] or None, paper["doi"] or None,
+             paper["journal_ref"] or None, paper["comments"] or None, paper["license"] or None,
+             paper["datestamp"]),
+        )
+        paper_id = self.conn.execute("SELECT id FROM papers WHERE arxiv_id = ?", (paper["arxiv_id"],)).fetchone()[0]
+        self.conn.execute("DELETE FROM paper_categories WHERE paper = ?", (paper_id,))
+        self.conn.executemany("INSERT OR IGNORE INTO paper_categories (paper, category) VALUES (?, ?)",
+                              [(paper_id, category) for category in paper["categories"]])
+
+    def harvest_state(self, category: str) -> dict[str, Any] | None:
+        """Get the stored harvest state of a category, if it was harvested before."""
+        row = self.conn.execute(f"SELECT {', '.join(HARVEST_STATE)} FROM harvests WHERE category = ?",
+                                (category,)).fetchone()
+        return dict(zip(HARVEST_STATE, row)) if row is not None else None
+
+    def _save_state(self, category: str, **values: Any) -> None:
+        state = self.harvest_state(category) or dict.fromkeys(HARVEST_STATE)
+        state.update(values, updated=datetime.now().isoformat(timespec="seconds"))
+        self.conn.execute(
+            f"INSERT OR REPLACE INTO harvests (category, {', '.join(HARVEST_STATE)}) "
+            f"VALUES (?{', ?' * len(HARVEST_STATE)})",
+            (category, *(state[key] for key in HARVEST_STATE)),
+        )
+
+    def harvest(
+        self,
+        categories: list[str],
+        from_date: str | None = None,
+        full: bool = False,
+        endpoint: str = OAI_ENDPOINT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ) -> dict[str, dict[str, Any]]:
+        """Harvest new and changed records of categories into the store.
+
+        Categories in the same OAI set are harvested in one pass. Without
+        ``from_date``, each pass starts from the date the previous harvest
+        of its categories completed (OAI ``from`` is inclusive, so that
+        day is fetched again and upserted). The resumption token is saved
+        with every page, so an interrupted harvest continues where it
+        stopped.
+
+        Parameters
+        ----------
+        categories : list[str]
+            Categories ("cs.LG"), archives ("cs"), or OAI set specs.
+        from_date : str | None
+            Harvest records changed on or after this date (YYYY-MM-DD)
+            instead of since the last harvest.
+        full : bool
+            Ignore previous harvests and download the categories again.
+        endpoint : str
+            OAI-PMH base URL.
+        max_retries : int
+            Retries per request on HTTP 503 (honoring Retry-After) and
+            network errors.
+
+        Returns:
+            Dictionary of category to the counts of its set's pass: OAI
+            set, from date, records fetched, stored and deleted, and the
+            harvested_through date.
+        """
+        by_set: dict[str, list[str]] = {}
+        for category in categories:
+            by_set.setdefault(oai_set(category), []).append(category)
+
+        results = {}
+        for set_spec, members in by_set.items():
+            states = [self.harvest_state(category) or {} for category in members]
+            tokens = {state.get("resumption_token") for state in states}
+            if from_date is None and not full and len(tokens) == 1 and None not in tokens:
+                # Continue an interrupted harvest
+                resume = states[0]
+            else:
+                dates = [state.get("harvested_through") for state in states]
+                since = from_date if from_date or full or None in dates else min(dates)
+                resume = {"resumption_token": None, "token_from": since, "token_started": None}
+
+            filters = [_category_filter(category) for category in members]
+            counts = self._harvest_set(set_spec, members, resume, None if None in filters else filters,
+                                       endpoint, max_retries)
+            for category in members:
+                results[category] = counts
+        return results
+
+    def _harvest_set(self, set_spec: str, members: list[str], resume: dict[str, Any],
+                     filters: list[str] | None, endpoint: str, max_retries: int) -> dict[str, Any]:
+        """Run one ListRecords harvest of a set, committing page by page."""
+        since, token, started = resume["token_from"], resume["resumption_token"], resume["token_started"]
+        counts: dict[str, Any] = {"set": set_spec, "from": since, "fetched": 0, "stored": 0, "deleted": 0}
+        while True:
+            if token:
+                params = {"verb": "ListRecords", "resumptionToken": token}
+            else:
+                params = {"verb": "ListRecords", "metadataPrefix": METADATA_PREFIX, "set": set_spec}
+                if since:
+                    params["from"] = since
+            try:
+                page = self._request(endpoint, params, max_retries)
+            except OAIError as e:
+                if e.code == "badResumptionToken" and token:
+                    # Expired token: start the same harvest over
+                    print(f"Resumption token expired; restarting {set_spec} from {since or 'the beginning'}",
+                          file=sys.stderr)
+                    token = None
+                    continue
+                raise
+
+            papers, response = page[:-2], dict(page[-2:])
+            # The next incremental harvest starts from the day this one started
+            started = started or response["responseDate"][:10] or datetime.now(timezone.utc).strftime("%Y-%m-%d")
+            token = response["resumptionToken"]
+            with self.conn:
+                for paper in papers:
+                    counts["fetched"] += 1
+                    if paper["deleted"]:
+                        counts["deleted"] += 1
+                    elif filters and not any(category.startswith(prefix) for category in paper["categories"]
+                                             for prefix in filters):
+                        continue
+                    else:
+                        counts["stored"] += 1
+                    self.upsert(paper)
+                for category in members:
+                    if token:
+                        self._save_state(category, set_spec=set_spec, resumption_token=token,
+                                         token_from=since, token_started=started)
+                    else:
+                        self._save_state(category, set_spec=set_spec, resumption_token=None, token_from=None,
+                                         token_started=None, harvested_through=started)
+            print(f"{set_spec}: {counts['fetched']} records fetched, {counts['stored']} stored", file=sys.stderr)
+            if not token:
+                counts["harvested_through"] = started
+                return counts
+
+    @staticmethod
+    def _request(endpoint: str, params: dict[str, str], max_retries: int) -> list:
+        """Fetch and stream-parse one ListRecords page, retrying flow control and network errors."""
+        url = f"{endpoint}?{urllib.parse.urlencode(params)}"
+        for attempt in range(max_retries + 1):
+            try:
+                request = urllib.request.Request(url, headers={"User-Agent": "academic-search-oai/1.0"})
+                with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+                    return list(parse_list_records(response))
+            except urllib.error.HTTPError as e:
+                if e.code != 503 or attempt == max_retries:
+                    raise
+                retry_after = e.headers.get("Retry-After", "")
+                wait = int(retry_after) if retry_after.isdigit() else 10 * 2 ** attempt
+            except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+                if attempt == max_retries:
+                    raise
+                wait = 10 * 2 ** attempt
+                print(f"Request failed ({e}); retrying", file=sys.stderr)
+            time.sleep(wait)
+        raise RuntimeError("unreachable")
+
+    def search(
+        self,
+        query: str = "",
+        categories: list[str] | None = None,
+        date_from: str | None = None,
+        date_to: str | None = None,
+        sort: str = "relevance",
+        limit: int | None = 10,
+    ) -> list[dict[str, Any]]:
+        """Search the store.
+
+        Parameters
+        ----------
+        query : str
+            Query in arXiv search syntax (see compile_query).
+        categories : list[str] | None
+            Keep papers in any of these categories (an archive such as
+            "cs" matches all of its categories).
+        date_from, date_to : str | None
+            Submission date bounds (YYYY-MM-DD, inclusive).
+        sort : str
+            "relevance" (BM25, title weighted highest) or "submitted"
+            (newest first).
+        limit : int | None
+            Maximum number of papers (None for all).
+
+        Returns:
+            Paper dictionaries in the format of ``arxiv_search.query_arxiv``.
+
+        Raises:
+            ValueError: If the query is not valid.
+        """
+        match, query_condition, query_parameters = compile_query(query)
+        conditions, parameters = [], []
+        select = "SELECT p.arxiv_id, p.title, p.authors, p.abstract, p.categories, p.created FROM papers p"
+        order = "p.created DESC, p.id"
+        if query_condition:
+            # cat: or NOT terms: filter in SQL, rank by the text terms where they match
+            if match and sort == "relevance":
+                select += (" LEFT JOIN (SELECT rowid, bm25(papers_fts, 10.0, 3.0, 1.0) AS score FROM papers_fts"
+                           " WHERE papers_fts MATCH ?) ranked ON ranked.rowid = p.id")
+                parameters.append(match)
+                order = "ranked.score IS NULL, ranked.score, p.id"
+            conditions.append(query_condition)
+            parameters.extend(query_parameters)
+        elif match:
+            select += " JOIN papers_fts ON papers_fts.rowid = p.id"
+            conditions.append("papers_fts MATCH ?")
+            parameters.append(match)
+            if sort == "relevance":
+                order = "bm25(papers_fts, 10.0, 3.0, 1.0), p.id"
+        if categories:
+            clauses = []
+            for category in categories:
+                clause, values = _category_condition(category)
+                clauses.append(clause)
+                parameters.extend(values)
+            conditions.append(f"p.id IN (SELECT paper FROM paper_categories WHERE {' OR '.join(clauses)})")
+        if date_from:
+            conditions.append("p.created >= ?")
+            parameters.append(date_from)
+        if date_to:
+            conditions.append("p.created <= ?")
+            parameters.append(date_to)
+
+        sql = select + (" WHERE " + " AND ".join(conditions) if conditions else "") + f" ORDER BY {order}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            parameters.append(limit)
+        try:
+            rows = self.conn.execute(sql, parameters).fetchall()
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Invalid query {query!r}: {e}")
+
+        return [
+            {
+                "title": title,
+                "authors": authors.split("; ") if authors else [],
+                "published": created or "Unknown",
+                "arxiv_id": arxiv_id,
+                "url": f"https://arxiv.org/abs/{arxiv_id}",
+                "summary": abstract,
+                "categories": category_list.split(),
+                "pdf_url": f"https://arxiv.org/pdf/{arxiv_id}",
+            }
+            for arxiv_id, title, authors, abstract, category_list, created in rows
+        ]
+
+    def stats(self) -> dict[str, Any]:
+        """Get the paper count and the harvest state of every harvested category."""
+        harvests = {}
+        for category, set_spec, through, token, updated in self.conn.execute(
+                "SELECT category, set_spec, harvested_through, resumption_token, updated FROM harvests "
+                "ORDER BY category"):
+            harvests[category] = {
+                "set": set_spec, "papers": self._count(category), "harvested_through": through,
+                "in_progress": bool(token), "updated": updated,
+            }
+        return {"papers": len(self), "path": self.path, "harvests": harvests}
+
+    def _count(self, category: str) -> int:
+        """Count stored papers in a category, archive, or OAI set."""
+        if ":" in category:
+            category = category.split(":")[-1]
+        condition, parameters = _category_condition(category)
+        return self.conn.execute(f"SELECT COUNT(DISTINCT paper) FROM paper_categories WHERE {condition}",
+                                 parameters).fetchone()[0]
+
+
+def _category_condition(category: str) -> tuple[str, list[str]]:
+    """SQL condition on paper_categories.category matching a category or all categories of an archive."""
+    if "." in category:
+        return "category = ?", [category]
+    return "(category = ? OR category LIKE ?)", [category, f"{category}.%"]
+
+
+def _leaf(token: str) -> tuple[str, str]:
+    """Translate one query term to ("cat", category), ("text", FTS5 term) or ("field", column prefix)."""
+    field, colon, term = token.partition(":")
+    field = field.lower()
+    if colon and field == "cat":
+        if not term:
+            raise ValueError("Missing category after cat:")
+        return "cat", term
+    prefix = ""
+    if colon and field in FIELD_COLUMNS:
+        prefix = f"{FIELD_COLUMNS[field]}:" if FIELD_COLUMNS[field] else ""
+    else:
+        term = token
+    if not term:
+        return "field", prefix
+
+    star = "*" if term.endswith("*") else ""
+    term = term.rstrip("*").replace("_", " ")
+    if not re.fullmatch(r"\w+", term):
+        term = '"' + term.replace('"', "") + '"'
+    return "text", f"{prefix}{term}{star}"
+
+
+class _QueryParser:
+    """Parse an arXiv query into a tree, with FTS5 precedence (NOT, then AND, then OR).
+
+    Nodes are ("text", FTS5 expression), ("cat", category), ("and" | "or"
+    | "not", left, right) and ("neg", node) for a NOT without a left side.
+    """
+
+    def __init__(self, query: str):
+        self.tokens = QUERY_TOKEN.findall(query)
+        self.position = 0
+
+    def parse(self) -> tuple | None:
+        if not self.tokens:
+            return None
+        node = self._or()
+        if self.position < len(self.tokens):
+            raise ValueError(f"Unexpected {self.tokens[self.position]!r}")
+        return node
+
+    def _peek(self) -> str | None:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _or(self) -> tuple:
+        node = self._and()
+        while self._peek() == "OR":
+            self.position += 1
+            node = ("or", node, self._and())
+        return node
+
+    def _and(self) -> tuple:
+        node = self._not()
+        while self._peek() not in (None, ")", "OR"):
+            if self._peek() == "AND":
+                self.position += 1
+            right = self._not()
+            node = ("not", node, right[1]) if right[0] == "neg" else ("and", node, right)
+        return node
+
+    def _not(self) -> tuple:
+        node = self._primary()
+        while self._peek() in ("NOT", "ANDNOT"):
+            self.position += 1
+            node = ("not", node, self._primary())
+        return node
+
+    def _primary(self) -> tuple:
+        token = self._peek()
+        self.position += 1
+        if token is None:
+            raise ValueError("Query ends with an operator")
+        if token in ("NOT", "ANDNOT"):
+            return ("neg", self._primary())
+        if token in OPERATORS or token == ")":
+            raise ValueError(f"Unexpected {token!r}")
+        if token == "(":
+            node = self._or()
+            if self._peek() != ")":
+                raise ValueError("Unbalanced parentheses")
+            self.position += 1
+            return node
+
+        kind, value = _leaf(token)
+        if kind != "field":
+            return (kind, value)
+        # A field filter applies to the phrase or group that follows it
+        node = self._primary()
+        if not value:
+            return node
+        if not _pure(node):
+            raise ValueError(f"{token!r} cannot apply to cat: or NOT terms")
+        return ("text", value + _fts(node))
+
+
+def _pure(node: tuple) -> bool:
+    """Whether a query tree is a single FTS5 expression (no cat: terms or unary NOT)."""
+    if node[0] == "text":
+        return True
+    return node[0] in ("and", "or", "not") and _pure(node[1]) and _pure(node[2])
+
+
+def _fts(node: tuple) -> str:
+    """FTS5 expression of a pure query tree."""
+    if node[0] == "text":
+        return node[1]
+    return f"({_fts(node[1])} {node[0].upper()} {_fts(node[2])})"
+
+
+def _sql(node: tuple, parameters: list[str]) -> str:
+    """SQL condition on papers ``p`` for a query tree; FTS5 subtrees become one MATCH each."""
+    if _pure(node):
+        parameters.append(_fts(node))
+        return "p.id IN (SELECT rowid FROM papers_fts WHERE papers_fts MATCH ?)"
+    if node[0] == "cat":
+        condition, values = _category_condition(node[1])
+        parameters.extend(values)
+        return f"p.id IN (SELECT paper FROM paper_categories WHERE {condition})"
+    if node[0] == "neg":
+        return f"NOT {_sql(node[1], parameters)}"
+    left, right = _sql(node[1], parameters), _sql(node[2], parameters)
+    return f"({left} {'AND NOT' if node[0] == 'not' else node[0].upper()} {right})"
+
+
+def _ranking_terms(node: tuple) -> list[str]:
+    """FTS5 expressions of the text terms a result can match (not those under NOT)."""
+    if node[0] == "text":
+        return [node[1]]
+    if node[0] in ("and", "or"):
+        return _ranking_terms(node[1]) + _ranking_terms(node[2])
+    if node[0] == "not":
+        return _ranking_terms(node[1])
+    return []
+
+
+def compile_query(query: str) -> tuple[str, str, list[str]]:
+    """Translate an arXiv API query to an FTS5 expression and SQL condition.
+
+    Supports ti:, au:, abs:, all: and cat: fields, AND/OR/ANDNOT/NOT,
+    parentheses and "exact phrases". cat: terms keep their place in the
+    boolean expression; other terms with punctuation become phrases
+    instead of FTS5 syntax errors.
+
+    Parameters
+    ----------
+    query : str
+        Query, e.g. 'cat:cs.LG au:bengio AND ti:"graph neural"'.
+
+    Returns:
+        Tuple of (FTS5 MATCH expression; SQL condition on papers ``p``;
+        its parameters). When the condition is empty the MATCH expression
+        selects the results by itself; otherwise it only ranks them, and
+        is empty if no text term can match.
+
+    Raises:
+        ValueError: If the query is malformed.
+    """
+    node = _QueryParser(query).parse()
+    if node is None:
+        return "", "", []
+    if _pure(node):
+        return _fts(node), "", []
+    parameters: list[str] = []
+    condition = _sql(node, parameters)
+    return " OR ".join(f"({term})" for term in _ranking_terms(node)), condition, parameters
+
+
+def main() -> None:
+    """Run the OAI-PMH harvester CLI."""
+    parser = argparse.ArgumentParser(
+        description="Mirror arXiv category metadata into a local store via OAI-PMH",
+        epilog="""
+Examples:
+  %(prog)s harvest cs.LG stat.ML
+  %(prog)s harvest hep-th --from 2024-01-01
+  %(prog)s stats
+
+The first harvest of a category downloads all of it; later runs fetch only
+records added or changed since the previous run. Query the store with:
+  arxiv_search.py "cat:cs.LG graph neural network" --local
+        """,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--store", default=DEFAULT_STORE, help=f"Store file (default: {DEFAULT_STORE})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    harvest = commands.add_parser("harvest", help="Harvest new and changed records of categories")
+    harvest.add_argument("categories", nargs="+", help="Categories (cs.LG), archives (cs) or OAI sets")
+    harvest.add_argument("--from", dest="from_date", help="Harvest records changed since this date (YYYY-MM-DD)")
+    harvest.add_argument("--full", action="store_true", help="Ignore previous harvests and download everything")
+    harvest.add_argument("--retries", type=int, default=DEFAULT_MAX_RETRIES,
+                         help=f"Retries per request (default: {DEFAULT_MAX_RETRIES})")
+
+    commands.add_parser("stats", help="Show store contents and harvest state")
+
+    args = parser.parse_args()
+
+    with ArxivStore(args.store) as store:
+        if args.command == "harvest":
+            start = time.perf_counter()
+            try:
+                results = store.harvest(args.categories, args.from_date, args.full, max_retries=args.retries)
+            except (OAIError, OSError, ET.ParseError) as e:
+                print(f"Error harvesting arXiv: {e}\nRerun the same command to resume.", file=sys.stderr)
+                sys.exit(1)
+            for category, counts in results.items():
+                print(f"{category}: {counts['stored']} papers stored, {counts['deleted']} deleted "
+                      f"(since {counts['from'] or 'the beginning'}, through {counts['harvested_through']})")
+            print(f"Store: {len(store)} papers in {store.path} ({time.perf_counter() - start:.1f}s)")
+        else:
+            print(json.dumps(store.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,19 +6,34 @@ mathematics, computer science, quantitative biology, and related fields.
 
 Usage:
     python arxiv_search.py "query" [--max-papers N] [--output-format FORMAT]
+    python arxiv_search.py "query" --harvest OUTPUT.jsonl [--page-size N] [--delay SECONDS]
+    python arxiv_search.py "query" --local [STORE]
 
 Examples:
     python arxiv_search.py "transformer attention mechanism"
     python arxiv_search.py "deep learning drug discovery" --max-papers 5
     python arxiv_search.py "large language model" --output-format json
+    python arxiv_search.py "cat:cs.LG" --harvest cs_lg.jsonl
+    python arxiv_search.py "cat:cs.LG diffusion model" --local
 """
 
 from __future__ import annotations
 
 import argparse
 import json
+import os
+import sys
+import time
+from datetime import datetime
 from typing import Any
 
+from arxiv_oai import DEFAULT_STORE, ArxivStore
+
+# arXiv asks API clients to wait 3 seconds between requests
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_DELAY_SECONDS = 3.0
+DEFAULT_MAX_RETRIES = 5
+
 
 def query_arxiv(
     query: str,
@@ -60,18 +75,7 @@ def query_arxiv(
             sort_by=arxiv.SortCriterion.Relevance,
         )
 
-        papers: list[dict[str, Any]] = []
-        for paper in client.results(search):
-            papers.append({
-                "title": paper.title,
-                "authors": [author.name for author in paper.authors],
-                "published": paper.published.strftime("%Y-%m-%d") if paper.published else "Unknown",
-                "arxiv_id": paper.entry_id.split("/")[-1] if paper.entry_id else "Unknown",
-                "url": paper.entry_id or "",
-                "summary": paper.summary.replace("\n", " ").strip(),
-                "categories": paper.categories,
-                "pdf_url": paper.pdf_url or "",
-            })
+        papers = [paper_record(paper) for paper in client.results(search)]
 
         if not papers:
             return "No papers found on arXiv matching your query."
@@ -82,6 +86,220 @@ def query_arxiv(
         return f"Error querying arXiv: {e}"
 
 
+def query_local(
+    query: str,
+    max_papers: int = 10,
+    output_format: str = "text",
+    store_path: str = DEFAULT_STORE,
+) -> str:
+    """Query the local store of OAI-PMH harvested categories (see arxiv_oai.py).
+
+    Runs offline against the categories harvested into the store, so
+    repeated searches cost no API requests.
+
+    Parameters
+    ----------
+    query : str
+        The search query string, in the same syntax as query_arxiv
+        ("cat:" terms filter by category, "au:"/"ti:"/"abs:" by field).
+    max_papers : int
+        The maximum number of papers to return (default: 10).
+    output_format : str
+        Output format: "text", "json", or "markdown" (default: "text").
+    store_path : str
+        Store file written by ``arxiv_oai.py harvest``.
+
+    Returns:
+        The formatted search results or an error message.
+    """
+    if not os.path.exists(store_path):
+        return (
+            f"Error: no local arXiv store at {store_path}.\n"
+            "Harvest categories first, e.g.: python arxiv_oai.py harvest cs.LG"
+        )
+    try:
+        with ArxivStore(store_path) as store:
+            papers = store.search(query, limit=max_papers)
+    except ValueError as e:
+        return f"Error querying local store: {e}"
+
+    if not papers:
+        return "No papers found in the local arXiv store matching your query."
+
+    return format_output(papers, query, output_format)
+
+
+def paper_record(paper: Any) -> dict[str, Any]:
+    """Convert an ``arxiv.Result`` into a plain paper dictionary.
+
+    Parameters
+    ----------
+    paper : arxiv.Result
+        A result yielded by ``arxiv.Client.results``.
+
+    Returns:
+        Paper dictionary with title, authors, dates, identifiers, summary,
+        categories, and PDF URL.
+    """
+    return {
+        "title": paper.title,
+        "authors": [author.name for author in paper.authors],
+        "published": paper.published.strftime("%Y-%m-%d") if paper.published else "Unknown",
+        "arxiv_id": paper.entry_id.split("/")[-1] if paper.entry_id else "Unknown",
+        "url": paper.entry_id or "",
+        "summary": paper.summary.replace("\n", " ").strip(),
+        "categories": paper.categories,
+        "pdf_url": paper.pdf_url or "",
+    }
+
+
+def _load_checkpoint(checkpoint_path: str) -> dict[str, Any] | None:
+    """Read a harvest checkpoint, or return None if there is none."""
+    try:
+        with open(checkpoint_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _save_checkpoint(checkpoint_path: str, checkpoint: dict[str, Any]) -> None:
+    """Atomically replace the harvest checkpoint."""
+    checkpoint["updated"] = datetime.now().isoformat(timespec="seconds")
+    temp_path = f"{checkpoint_path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(temp_path, checkpoint_path)
+
+
+def harvest_arxiv(
+    query: str,
+    output_path: str,
+    max_papers: int | None = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    delay_seconds: float = DEFAULT_DELAY_SECONDS,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    checkpoint_path: str | None = None,
+) -> dict[str, Any]:
+    """Harvest every paper matching a query to a JSON Lines file, resumably.
+
+    Papers are written one per line as they arrive instead of being
+    collected in memory. After each page the output is flushed and the
+    offset reached is saved to a checkpoint file; rerunning the same
+    harvest resumes from that offset. Results are requested in ascending
+    submission order, so papers submitted during a harvest are appended
+    at the end and do not shift the offsets of pages already written.
+
+    arXiv intermittently returns empty pages in the middle of a result
+    set. The ``arxiv`` client retries those itself; when it gives up, or
+    when the first page of a request comes back empty, the page is
+    requested again from the last written offset with exponential backoff,
+    up to ``max_retries`` consecutive times (once at offset 0, where an
+    empty page may just mean no matches).
+
+    Parameters
+    ----------
+    query : str
+        The search query string (arXiv query syntax).
+    output_path : str
+        JSON Lines file to write papers to.
+    max_papers : int | None
+        Stop after this many papers in total (default: all matches).
+    page_size : int
+        Papers requested per API call (default: 100, arXiv allows up to 2000).
+    delay_seconds : float
+        Minimum seconds between API calls (default: 3, as arXiv requires).
+    max_retries : int
+        Consecutive failed or empty pages tolerated before giving up.
+    checkpoint_path : str | None
+        Checkpoint file (default: ``output_path`` + ".checkpoint.json").
+
+    Returns:
+        Dictionary with the query, output path, papers written, offset
+        reached, whether the harvest is complete, and retries used. A
+        harvest stopped by persistently empty pages is not complete and
+        resumes on the next call.
+
+    Raises:
+        ImportError: If the arxiv package is not installed.
+        ValueError: If the checkpoint belongs to a different query.
+    """
+    import arxiv
+    import requests
+
+    checkpoint_path = checkpoint_path or f"{output_path}.checkpoint.json"
+    checkpoint = _load_checkpoint(checkpoint_path) if os.path.exists(output_path) else None
+    if checkpoint is not None and checkpoint.get("query") != query:
+        raise ValueError(
+            f"Checkpoint {checkpoint_path} belongs to query {checkpoint.get('query')!r}; "
+            "delete it or choose another output file"
+        )
+    if checkpoint is None:
+        checkpoint = {"query": query, "offset": 0, "bytes": 0, "complete": False}
+
+    stats = {"query": query, "output": output_path, "written": 0, "retries": 0}
+    if checkpoint["complete"] or (max_papers is not None and checkpoint["offset"] >= max_papers):
+        return {**stats, "offset": checkpoint["offset"], "complete": checkpoint["complete"]}
+
+    client = arxiv.Client(page_size=page_size, delay_seconds=delay_seconds)
+    search = arxiv.Search(
+        query=query,
+        max_results=max_papers,
+        sort_by=arxiv.SortCriterion.SubmittedDate,
+        sort_order=arxiv.SortOrder.Ascending,
+    )
+
+    # Drop anything written after the last checkpoint (e.g. by a killed run)
+    with open(output_path, "r+b" if checkpoint["offset"] else "wb") as f:
+        f.truncate(checkpoint["bytes"])
+        f.seek(checkpoint["bytes"])
+
+        offset = checkpoint["offset"]
+        failures = 0
+        try:
+            while True:
+                start = offset
+                empty = False
+                try:
+                    for paper in client.results(search, offset=offset):
+                        f.write(json.dumps(paper_record(paper), ensure_ascii=False).encode("utf-8") + b"\n")
+                        offset += 1
+                        if (offset - start) % page_size == 0:
+                            f.flush()
+                            _save_checkpoint(checkpoint_path, {**checkpoint, "offset": offset, "bytes": f.tell()})
+                            print(f"Harvested {offset} papers", file=sys.stderr)
+                except (arxiv.UnexpectedEmptyPageError, arxiv.HTTPError,
+                        requests.exceptions.RequestException) as e:
+                    error: Exception = e
+                else:
+                    if offset > start:
+                        checkpoint["complete"] = max_papers is None or offset < max_papers
+                        break
+                    # An empty first page is usually the same glitch rather
+                    # than the end of the results
+                    empty = True
+                    error = arxiv.UnexpectedEmptyPageError(f"offset {start}", failures, None)
+
+                failures = 0 if offset > start else failures + 1
+                # At offset 0 an empty page may just mean no matches
+                if failures > (min(max_retries, 1) if empty and not offset else max_retries):
+                    if empty:
+                        # Nothing at offset 0 means no matches; further on,
+                        # stop and leave the checkpoint for a later rerun
+                        checkpoint["complete"] = not offset
+                        break
+                    raise error
+                stats["retries"] += 1
+                wait = delay_seconds * 2 ** max(failures - 1, 0)
+                print(f"Retrying from offset {offset} in {wait:.0f}s ({error})", file=sys.stderr)
+                time.sleep(wait)
+        finally:
+            f.flush()
+            _save_checkpoint(checkpoint_path, {**checkpoint, "offset": offset, "bytes": f.tell()})
+            stats["written"] = offset - checkpoint["offset"]
+
+    return {**stats, "offset": offset, "complete": checkpoint["complete"]}
+
+
 def format_output(papers: list[dict[str, Any]], query: str, output_format: str) -> str:
     """Format the search results based on the specified output format.
 
@@ -156,6 +374,8 @@ Examples:
   %(prog)s "deep learning" --max-papers 5
   %(prog)s "cat:cs.LG neural network" --output-format json
   %(prog)s "author:Hinton representation learning" --output-format markdown
+  %(prog)s "cat:cs.LG" --harvest cs_lg.jsonl --max-papers 20000
+  %(prog)s "cat:cs.LG au:bengio diffusion" --local
 
 Query Syntax:
   - Simple keywords: "neural network pruning"
@@ -175,8 +395,8 @@ Query Syntax:
     parser.add_argument(
         "--max-papers",
         type=int,
-        default=10,
-        help="Maximum number of papers to retrieve (default: 10)",
+        default=None,
+        help="Maximum number of papers to retrieve (default: 10, or all matches with --harvest)",
     )
     parser.add_argument(
         "--output-format",
@@ -186,13 +406,78 @@ Query Syntax:
         help="Output format: text, json, or markdown (default: text)",
     )
 
+    parser.add_argument(
+        "--local",
+        nargs="?",
+        const=DEFAULT_STORE,
+        metavar="STORE",
+        help=f"Search the local store of harvested categories instead of the API (default: {DEFAULT_STORE})",
+    )
+    parser.add_argument(
+        "--harvest",
+        metavar="OUTPUT",
+        help="Stream all matches to a JSON Lines file with resumable checkpoints",
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=DEFAULT_PAGE_SIZE,
+        help=f"Papers per API request when harvesting (default: {DEFAULT_PAGE_SIZE})",
+    )
+    parser.add_argument(
+        "--delay",
+        type=float,
+        default=DEFAULT_DELAY_SECONDS,
+        help=f"Seconds between API requests when harvesting (default: {DEFAULT_DELAY_SECONDS:g})",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=DEFAULT_MAX_RETRIES,
+        help=f"Consecutive failed or empty pages to retry when harvesting (default: {DEFAULT_MAX_RETRIES})",
+    )
+
     args = parser.parse_args()
 
-    result = query_arxiv(
-        query=args.query,
-        max_papers=args.max_papers,
-        output_format=args.output_format,
-    )
+    if args.harvest:
+        try:
+            stats = harvest_arxiv(
+                query=args.query,
+                output_path=args.harvest,
+                max_papers=args.max_papers,
+                page_size=args.page_size,
+                delay_seconds=args.delay,
+                max_retries=args.retries,
+            )
+        except ImportError:
+            print("Error: arxiv package not installed.\nInstall with: pip install arxiv")
+            sys.exit(1)
+        except Exception as e:
+            print(f"Error harvesting arXiv: {e}\nRerun the same command to resume.")
+            sys.exit(1)
+        if stats["complete"]:
+            status = "complete"
+        elif args.max_papers is not None and stats["offset"] >= args.max_papers:
+            status = "stopped at --max-papers"
+        else:
+            status = "arXiv kept returning empty pages; rerun to resume"
+        print(f"Harvested {stats['written']} new papers to {stats['output']} "
+              f"({stats['offset']} total, {status}, {stats['retries']} retries)")
+        return
+
+    if args.local:
+        result = query_local(
+            query=args.query,
+            max_papers=args.max_papers or 10,
+            output_format=args.output_format,
+            store_path=args.local,
+        )
+    else:
+        result = query_arxiv(
+            query=args.query,
+            max_papers=args.max_papers or 10,
+            output_format=args.output_format,
+        )
     print(result)
 
 
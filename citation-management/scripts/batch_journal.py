@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Batch Journal
+Append-only JSONL journal of per-identifier outcomes for resumable batch runs,
+plus an incremental writer for BibTeX/JSON output.
+"""
+
+import sys
+import json
+import time
+from typing import Dict, Optional, TextIO
+
+
+class BatchJournal:
+    """Append-only JSONL record of which identifiers have been processed."""
+
+    def __init__(self, path: str, resume: bool = False, style: Optional[str] = None):
+        """
+        Open a journal.
+
+        Args:
+            path: Journal file path
+            resume: Keep existing records (otherwise the journal is truncated)
+            style: Citation style of the output; records of other styles are not reused
+        """
+        self.path = path
+        self.style = style
+        self.records: Dict[str, Dict] = {}
+
+        if resume:
+            self.records = self._load()
+        self._file = open(path, 'a' if resume else 'w', encoding='utf-8')
+
+    def _load(self) -> Dict[str, Dict]:
+        """
+        Load existing records; the last record for an identifier wins.
+
+        A partial last line from an interrupted write is truncated, so the
+        next record starts on a line of its own.
+        """
+        records = {}
+        complete = 0
+        try:
+            with open(self.path, 'rb+') as f:
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+                    complete += len(line)
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    records[record['id']] = record
+                f.truncate(complete)
+        except FileNotFoundError:
+            pass
+        return records
+
+    def completed(self) -> Dict[str, str]:
+        """
+        Get identifiers that completed successfully in this journal's style.
+
+        Returns:
+            Dictionary mapping identifier to its BibTeX entry
+        """
+        return {
+            identifier: record['bibtex']
+            for identifier, record in self.records.items()
+            if record.get('status') == 'ok' and record.get('style') == self.style
+        }
+
+    def record(self, identifier: str, bibtex: Optional[str]) -> None:
+        """
+        Append the outcome for one identifier and flush it to disk.
+
+        Args:
+            identifier: Identifier as given in the input
+            bibtex: BibTeX entry, or None if processing failed
+        """
+        record = {
+            'id': identifier,
+            'status': 'ok' if bibtex else 'failed',
+            'style': self.style,
+            'time': time.time()
+        }
+        if bibtex:
+            record['bibtex'] = bibtex
+
+        self.records[identifier] = record
+        self._file.write(json.dumps(record) + '\n')
+        self._file.flush()
+
+    def close(self) -> None:
+        """Close the journal file."""
+        self._file.close()
+
+
+class EntryWriter:
+    """Write BibTeX entries incrementally as BibTeX or JSON."""
+
+    def __init__(self, output: Optional[str] = None, output_format: str = 'bibtex'):
+        """
+        Open the output.
+
+        Args:
+            output: Output file (None for stdout)
+            output_format: 'bibtex' or 'json'
+        """
+        self.output = output
+        self.output_format = output_format
+        self.count = 0
+        self._file: TextIO = open(output, 'w', encoding='utf-8') if output else sys.stdout
+
+        if output_format == 'json':
+            self._file.write('{\n  "entries": [')
+
+    def write(self, bibtex: str) -> None:
+        """Write one entry and flush it."""
+        if self.output_format == 'json':
+            separator = ',' if self.count else ''
+            self._file.write(f'{separator}\n    {json.dumps(bibtex)}')
+        else:
+            separator = '\n' if self.count else ''
+            self._file.write(f'{separator}{bibtex}\n')
+
+        self.count += 1
+        self._file.flush()
+
+    def close(self) -> None:
+        """Finish the output document."""
+        if self.output_format == 'json':
+            self._file.write(f'\n  ],\n  "count": {self.count}\n}}\n')
+        self._file.flush()
+
+        if self.output:
+            self._file.close()
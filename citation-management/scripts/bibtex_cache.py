@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Parsed BibTeX Cache
+Sidecar pickle cache of parsed BibTeX entries, keyed by path, size, mtime and
+content hash. Warm runs load the pickled rows directly; after an edit only
+entries whose bytes changed are parsed again.
+"""
+
+import gc
+import os
+import sys
+import pickle
+import hashlib
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple
+
+from bibtex_tokenizer import (
+    MONTH_MACROS, BibTeXSyntaxError, iter_bibtex_entries, iter_raw_entries, parse_entry,
+    parse_string_entry
+)
+
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.getenv('CITATION_CACHE_DIR', os.path.expanduser('~/.cache/citation-management')),
+    'bibtex'
+)
+
+# Bump when the cached row layout or the tokenizer's output changes
+CACHE_VERSION = 1
+
+
+def _digest(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+class BibTeXCache:
+    """Load parsed BibTeX entries through a per-file pickle cache."""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        """
+        Initialize cache.
+
+        Args:
+            cache_dir: Directory holding one pickle per BibTeX file
+        """
+        self.cache_dir = cache_dir
+        self.reused = 0
+        self.parsed = 0
+
+    def cache_path(self, filepath: str) -> str:
+        """Get the cache file for a BibTeX file."""
+        name = hashlib.sha1(os.path.abspath(filepath).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f'{name}.pickle')
+
+    def _read_cache(self, filepath: str) -> Optional[Dict]:
+        try:
+            with open(self.cache_path(filepath), 'rb') as f:
+                cached = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+        if not isinstance(cached, dict) or cached.get('version') != CACHE_VERSION:
+            return None
+        return cached
+
+    def _write_cache(self, filepath: str, cached: Dict) -> None:
+        path = self.cache_path(filepath)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(temp_path, 'wb') as f:
+                pickle.dump(cached, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+        except OSError as e:
+            # The cache is an optimization; never fail the caller over it
+            print(f'Warning: could not write BibTeX cache {path}: {e}', file=sys.stderr)
+
+    def load(self, filepath: str) -> List[Dict]:
+        """
+        Parse a BibTeX file, reusing cached entries where possible.
+
+        Args:
+            filepath: Path to BibTeX file
+
+        Returns:
+            List of entry dictionaries, as from the tokenizer
+
+        Raises:
+            OSError: If the file cannot be read
+        """
+        stat = os.stat(filepath)
+        with open(filepath, 'rb') as f:
+            data = f.read()
+
+        # Loading and parsing allocate many small objects that are never cyclic
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            cached = self._read_cache(filepath)
+            if cached and cached['size'] == stat.st_size and cached['mtime'] == stat.st_mtime_ns:
+                # Unchanged size and mtime: trust the cache without hashing the file
+                self.reused += len(cached['rows'])
+                return self._entries(cached, data)
+
+            content_hash = _digest(data)
+            if cached and cached['hash'] == content_hash:
+                # Touched but not modified
+                self.reused += len(cached['rows'])
+            else:
+                cached = self._parse(data, cached)
+                cached['hash'] = content_hash
+
+            cached.update(version=CACHE_VERSION, path=os.path.abspath(filepath),
+                          size=stat.st_size, mtime=stat.st_mtime_ns)
+            self._write_cache(filepath, cached)
+            return self._entries(cached, data)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    @staticmethod
+    def _entries(cached: Dict, data: bytes) -> List[Dict]:
+        """Rebuild entry dictionaries from cached rows; raw text is sliced from the file."""
+        field_names = cached['field_names']
+        return [
+            {
+                'type': entry_type,
+                'key': key,
+                'fields': dict(zip(field_names[names_id], values)),
+                'raw': data[offset:offset + length].decode('utf-8', errors='replace'),
+                'offset': offset,
+                'length': length
+            }
+            for _, entry_type, key, offset, length, names_id, values in cached['rows']
+        ]
+
+    def _parse(self, data: bytes, previous: Optional[Dict]) -> Dict:
+        """
+        Tokenize a file, parsing only entries not found in the previous run.
+
+        An entry is reused when its raw bytes and every @string definition
+        before it are unchanged, since macros can change its fields.
+
+        Returns:
+            Cache record with field_names and rows
+        """
+        field_names: List[Tuple[str, ...]] = []
+        names_ids: Dict[Tuple[str, ...], int] = {}
+        previous_rows = {}
+        if previous:
+            field_names = list(previous['field_names'])
+            names_ids = {names: i for i, names in enumerate(field_names)}
+            previous_rows = {row[0]: row for row in previous['rows']}
+
+        rows = []
+        macros = dict(MONTH_MACROS)
+        macros_hash = b''
+
+        for entry_type, offset, raw_bytes in iter_raw_entries(BytesIO(data)):
+            if entry_type in ('comment', 'preamble'):
+                continue
+
+            if entry_type == 'string':
+                try:
+                    macros.update(parse_string_entry(raw_bytes, macros))
+                except BibTeXSyntaxError as e:
+                    print(f'Warning: skipping malformed entry at byte {offset}: {e}', file=sys.stderr)
+                macros_hash = _digest(macros_hash + raw_bytes)
+                continue
+
+            entry_hash = _digest(macros_hash + raw_bytes)
+            row = previous_rows.get(entry_hash)
+            if row is not None:
+                # Same bytes, possibly at a new position
+                rows.append(row[:3] + (offset,) + row[4:])
+                self.reused += 1
+                continue
+
+            try:
+                entry = parse_entry(entry_type, raw_bytes, offset, macros)
+            except BibTeXSyntaxError as e:
+                print(f'Warning: skipping malformed entry at byte {offset}: {e}', file=sys.stderr)
+                continue
+            self.parsed += 1
+
+            # Field names are stored once per distinct layout
+            names = tuple(entry['fields'])
+            if names not in names_ids:
+                names_ids[names] = len(field_names)
+                field_names.append(names)
+            rows.append((entry_hash, entry['type'], entry['key'], offset, entry['length'],
+                         names_ids[names], tuple(entry['fields'].values())))
+
+        return {'field_names': field_names, 'rows': rows}
+
+
+def load_bibtex(filepath: str, cache_dir: Optional[str] = DEFAULT_CACHE_DIR) -> List[Dict]:
+    """
+    Parse a BibTeX file through the cache.
+
+    Args:
+        filepath: Path to BibTeX file
+        cache_dir: Cache directory (None to parse without caching)
+
+    Returns:
+        List of entry dictionaries
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    if cache_dir is None:
+        with open(filepath, 'rb') as f:
+            return list(iter_bibtex_entries(f))
+    return BibTeXCache(cache_dir).load(filepath)
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Memory-Mapped BibTeX Index
+Lazy index over large BibTeX files: entry positions are kept in compact
+arrays and fields are decoded only when accessed.
+"""
+
+import re
+import sys
+import mmap
+import argparse
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from bibtex_tokenizer import (
+    ENTRY_START, MONTH_MACROS, BibTeXSyntaxError, iter_entry_spans, parse_entry,
+    parse_string_entry, parse_value
+)
+from crossref_bulk import normalize_doi
+
+VALUE_DELIMITERS = re.compile(rb'[{}"]')
+
+
+class BibTeXIndex:
+    """Index of (key, type, offset, length) for each entry of a memory-mapped BibTeX file."""
+
+    def __init__(self, filepath: str):
+        """
+        Map a file and index its entries.
+
+        Args:
+            filepath: Path to BibTeX file
+        """
+        self.filepath = filepath
+        self._file = open(filepath, 'rb')
+        try:
+            self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            self._buf = b''
+
+        self.offsets = array('q')
+        self.lengths = array('l')
+        self.type_ids = array('H')
+        self.types: List[str] = []
+        self.keys: List[str] = []
+        self.macros: Dict[str, str] = dict(MONTH_MACROS)
+
+        self._key_index: Dict[str, int] = {}
+        self._duplicate_keys: Dict[str, List[int]] = {}
+        self._doi_index: Optional[Dict[str, List[int]]] = None
+        self._field_patterns: Dict[str, re.Pattern] = {}
+
+        self._build()
+
+    def _build(self) -> None:
+        """Record entry spans and keys; only @string entries are fully parsed."""
+        type_ids = {}
+        buf = self._buf
+
+        for entry_type, start, end in iter_entry_spans(buf):
+            if entry_type in ('comment', 'preamble'):
+                continue
+            if entry_type == 'string':
+                try:
+                    self.macros.update(parse_string_entry(buf[start:end], self.macros))
+                except BibTeXSyntaxError as e:
+                    print(f'Warning: skipping malformed @string at byte {start}: {e}', file=sys.stderr)
+                continue
+
+            # The key runs from the opening delimiter to the first comma
+            body_start = buf.find(b'{', start, end)
+            paren = buf.find(b'(', start, end)
+            if body_start < 0 or 0 <= paren < body_start:
+                body_start = paren
+            comma = buf.find(b',', body_start, end)
+            key = buf[body_start + 1:comma if comma >= 0 else end - 1].decode('utf-8', errors='replace').strip()
+
+            if entry_type not in type_ids:
+                type_ids[entry_type] = len(self.types)
+                self.types.append(entry_type)
+
+            position = len(self.keys)
+            self.offsets.append(start)
+            self.lengths.append(end - start)
+            self.type_ids.append(type_ids[entry_type])
+            self.keys.append(key)
+
+            if key in self._key_index:
+                self._duplicate_keys.setdefault(key, [self._key_index[key]]).append(position)
+            else:
+                self._key_index[key] = position
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._key_index
+
+    def __iter__(self) -> Iterator[Dict]:
+        for position in range(len(self)):
+            entry = self.entry(position)
+            if entry is not None:
+                yield entry
+
+    def __enter__(self) -> 'BibTeXIndex':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Unmap and close the file."""
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+        self._file.close()
+
+    def entry_type(self, position: int) -> str:
+        """Get the entry type at a position without decoding the entry."""
+        return self.types[self.type_ids[position]]
+
+    def raw(self, position: int) -> bytes:
+        """Get the raw bytes of the entry at a position."""
+        start = self.offsets[position]
+        return self._buf[start:start + self.lengths[position]]
+
+    def entry(self, position: int) -> Optional[Dict]:
+        """
+        Decode the entry at a position.
+
+        Args:
+            position: Entry position in file order
+
+        Returns:
+            Entry dictionary, or None if the entry is malformed
+        """
+        try:
+            return parse_entry(self.entry_type(position), self.raw(position),
+                               self.offsets[position], self.macros)
+        except BibTeXSyntaxError as e:
+            print(f'Warning: skipping malformed entry at byte {self.offsets[position]}: {e}',
+                  file=sys.stderr)
+            return None
+
+    def positions(self, key: str) -> List[int]:
+        """Get the positions of every entry with a citation key."""
+        if key in self._duplicate_keys:
+            return list(self._duplicate_keys[key])
+        return [self._key_index[key]] if key in self._key_index else []
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Look up an entry by citation key.
+
+        Args:
+            key: Citation key
+
+        Returns:
+            First entry with the key, or None
+        """
+        position = self._key_index.get(key)
+        return self.entry(position) if position is not None else None
+
+    def duplicate_keys(self) -> Dict[str, int]:
+        """Get citation keys that appear more than once, with their counts."""
+        return {key: len(positions) for key, positions in self._duplicate_keys.items()}
+
+    def field(self, position: int, name: str) -> Optional[str]:
+        """
+        Decode a single field of an entry, touching only that entry's bytes.
+
+        Entries whose bytes cannot contain the field are skipped without
+        decoding.
+
+        Args:
+            position: Entry position in file order
+            name: Field name (case-insensitive)
+
+        Returns:
+            Field value, or None if the entry has no such field
+        """
+        name = name.lower()
+        pattern = self._field_patterns.get(name)
+        if pattern is None:
+            # Fields always follow a comma
+            pattern = re.compile(rb',\s*' + re.escape(name.encode()) + rb'\s*=\s*', re.IGNORECASE)
+            self._field_patterns[name] = pattern
+
+        start = self.offsets[position]
+        end = start + self.lengths[position]
+        matches = [match for match in pattern.finditer(self._buf, start, end - 1)
+                   if self._between_fields(start, match.start())]
+        if not matches:
+            return None
+
+        if len(matches) == 1:
+            # Decode just the value
+            text = self._buf[matches[0].end():end - 1].decode('utf-8', errors='replace')
+            try:
+                return parse_value(text, 0, self.macros)[0].strip()
+            except BibTeXSyntaxError:
+                pass
+
+        # Repeated or malformed field: let the full parser decide
+        entry = self.entry(position)
+        return entry['fields'].get(name) if entry else None
+
+    def _between_fields(self, start: int, offset: int) -> bool:
+        """Whether an offset in the entry at `start` is outside every field value (brace depth 0, unquoted)."""
+        body = ENTRY_START.match(self._buf, start).end()
+        prefix = self._buf[body:offset]
+        if b'"' not in prefix:
+            return prefix.count(b'{') == prefix.count(b'}')
+        depth, quoted = 0, False
+        for token in VALUE_DELIMITERS.finditer(self._buf, body, offset):
+            if token.group() == b'{':
+                depth += 1
+            elif token.group() == b'}':
+                depth -= 1
+            elif not depth:
+                quoted = not quoted
+        return not depth and not quoted
+
+    def iter_field(self, name: str) -> Iterator[Tuple[int, str]]:
+        """
+        Stream one field across all entries.
+
+        Args:
+            name: Field name (case-insensitive)
+
+        Yields:
+            Tuples of (position, value) for entries that have the field
+        """
+        for position in range(len(self)):
+            value = self.field(position, name)
+            if value is not None:
+                yield position, value
+
+    def doi_index(self) -> Dict[str, List[int]]:
+        """
+        Get the hash index of normalized DOIs to entry positions (built on first use).
+
+        Returns:
+            Dictionary mapping normalized DOI to entry positions
+        """
+        if self._doi_index is None:
+            self._doi_index = {}
+            for position, doi in self.iter_field('doi'):
+                if doi:
+                    self._doi_index.setdefault(normalize_doi(doi), []).append(position)
+        return self._doi_index
+
+    def find_doi(self, doi: str) -> List[Dict]:
+        """
+        Look up entries by DOI.
+
+        Args:
+            doi: DOI, optionally with a resolver prefix
+
+        Returns:
+            Matching entries in file order
+        """
+        positions = self.doi_index().get(normalize_doi(doi), [])
+        return [entry for entry in map(self.entry, positions) if entry is not None]
+
+
+def main():
+    """Command-line interface."""
+    parser = argparse.ArgumentParser(
+        description='Look up entries in large BibTeX files through a memory-mapped index',
+        epilog='Example: python bibtex_index.py library.bib --key smith2020'
+    )
+
+    parser.add_argument(
+        'file',
+        help='BibTeX file to index'
+    )
+
+    parser.add_argument(
+        '--key',
+        action='append',
+        default=[],
+        help='Print the entry with this citation key (repeatable)'
+    )
+
+    parser.add_argument(
+        '--doi',
+        action='append',
+        default=[],
+        help='Print entries with this DOI (repeatable)'
+    )
+
+    parser.add_argument(
+        '--field',
+        help='Print KEY<TAB>VALUE for one field of every entry'
+    )
+
+    args = parser.parse_args()
+
+    try:
+        index = BibTeXIndex(args.file)
+    except OSError as e:
+        print(f'Error reading file: {e}', file=sys.stderr)
+        sys.exit(1)
+
+    with index:
+        print(f'Indexed {len(index)} entries', file=sys.stderr)
+        found = True
+
+        for key in args.key:
+            positions = index.positions(key)
+            if not positions:
+                print(f'Key not found: {key}', file=sys.stderr)
+                found = False
+            for position in positions:
+                print(index.raw(position).decode('utf-8', errors='replace') + '\n')
+
+        for doi in args.doi:
+            positions = index.doi_index().get(normalize_doi(doi), [])
+            if not positions:
+                print(f'DOI not found: {doi}', file=sys.stderr)
+                found = False
+            for position in positions:
+                print(index.raw(position).decode('utf-8', errors='replace') + '\n')
+
+        if args.field:
+            for position, value in index.iter_field(args.field):
+                print(f'{index.keys[position]}\t{value}')
+
+    if not found:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
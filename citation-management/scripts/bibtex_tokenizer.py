@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Streaming BibTeX Tokenizer
+Single-pass, brace-depth-tracking BibTeX parser shared by the citation tools.
+
+Handles nested braces, quoted values, @string macros, # concatenation,
+bare numbers and macro names, parenthesis-delimited entries, and closing
+braces anywhere on a line. Entries are streamed from a binary file object
+together with their byte offsets.
+"""
+
+import re
+import sys
+from typing import Dict, Iterator, Optional, BinaryIO, Tuple
+
+
+# Standard month macros predefined by BibTeX styles
+MONTH_MACROS = {
+    'jan': 'January', 'feb': 'February', 'mar': 'March', 'apr': 'April',
+    'may': 'May', 'jun': 'June', 'jul': 'July', 'aug': 'August',
+    'sep': 'September', 'oct': 'October', 'nov': 'November', 'dec': 'December'
+}
+
+
+def _balanced(levels: int) -> str:
+    """
+    Regex for a brace group nested up to `levels` deep.
+
+    Written as an unrolled loop (text runs between nested groups), so the
+    alternatives never overlap and a failed match cannot backtrack
+    exponentially.
+    """
+    pattern = r'\{[^{}]*\}'
+    for _ in range(levels - 1):
+        pattern = r'\{[^{}]*(?:' + pattern + r'[^{}]*)*\}'
+    return pattern
+
+
+# Fast paths match balanced braces in C; deeper nesting falls back to the depth scanner
+BALANCED = _balanced(5)
+ENTRY_BODY = re.compile(BALANCED.encode())
+ENTRY_START = re.compile(rb'@[ \t\r\n]*([A-Za-z]+)[ \t\r\n]*([{(])')
+BRACES = re.compile(rb'[{}]')
+BRACES_PARENS = re.compile(rb'[{}()]')
+
+FIELD_NAME = re.compile(r'\s*([^\s=,{}"#()]+)\s*=\s*')
+SIMPLE_FIELD = re.compile(
+    r'\s*([^\s=,{}"#()]+)\s*=\s*(?:(' + BALANCED + r')|"([^"{}]*(?:' + BALANCED + r'[^"{}]*)*)"|(\d+))'
+    r'\s*(?:,|$)'
+)
+BARE_VALUE = re.compile(r'[^\s,#{}"()]+')
+WHITESPACE = re.compile(r'\s*')
+VALUE_BRACES = re.compile(r'[{}]')
+QUOTE_OR_BRACES = re.compile(r'[{}"]')
+
+CHUNK_SIZE = 1 << 20
+
+
+class BibTeXSyntaxError(ValueError):
+    """Raised for entries that cannot be tokenized."""
+
+
+def _scan_entry_end(buf, scan: int, opener: bytes, depth: int) -> Tuple[Optional[int], int]:
+    """
+    Scan for the delimiter closing an entry.
+
+    Args:
+        buf: Bytes-like buffer (bytes or mmap)
+        scan: Position to resume scanning from
+        opener: b'{' or b'('
+        depth: Brace depth at scan
+
+    Returns:
+        Tuple of (end position or None if not found in buf, brace depth reached)
+    """
+    scanner = BRACES if opener == b'{' else BRACES_PARENS
+    for token in scanner.finditer(buf, scan):
+        char = token.group()
+        if char == b'{':
+            depth += 1
+        elif char == b'}':
+            depth -= 1
+            if depth == 0 and opener == b'{':
+                return token.end(), depth
+        elif char == b')' and depth == 0:
+            return token.end(), depth
+    return None, depth
+
+
+def iter_entry_spans(buf) -> Iterator[Tuple[str, int, int]]:
+    """
+    Locate entries in a buffer holding a whole file, without copying it.
+
+    Args:
+        buf: Bytes-like buffer (bytes or mmap)
+
+    Yields:
+        Tuples of (lowercased entry type, start offset, end offset)
+    """
+    pos = 0
+    while True:
+        at = buf.find(b'@', pos)
+        if at < 0:
+            return
+        match = ENTRY_START.match(buf, at)
+        if match is None:
+            pos = at + 1
+            continue
+
+        entry_type = match.group(1).decode('ascii').lower()
+        opener = match.group(2)
+        body = ENTRY_BODY.match(buf, match.end() - 1) if opener == b'{' else None
+        if body:
+            end = body.end()
+        else:
+            end, _ = _scan_entry_end(buf, match.end(), opener, 1 if opener == b'{' else 0)
+            if end is None:
+                print(f'Warning: unterminated @{entry_type} entry at byte {at}', file=sys.stderr)
+                return
+
+        yield entry_type, at, end
+        pos = end
+
+
+def iter_raw_entries(fileobj: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, int, bytes]]:
+    """
+    Stream raw entries from a binary file object in one linear pass.
+
+    Text outside entries is ignored, as BibTeX treats it as a comment.
+
+    Args:
+        fileobj: File opened in binary mode
+        chunk_size: Bytes read per chunk
+
+    Yields:
+        Tuples of (lowercased entry type, byte offset, raw entry bytes)
+    """
+    buf = b''
+    base = 0        # File offset of buf[0]
+    pos = 0         # Scan position in buf
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buf, base, pos, eof
+        if eof:
+            return False
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        # Drop consumed bytes only when reading more, so each byte is copied O(1) times
+        buf = buf[pos:] + chunk
+        base += pos
+        pos = 0
+        return True
+
+    fill()
+    while True:
+        at = buf.find(b'@', pos)
+        if at < 0:
+            pos = len(buf)
+            if not fill():
+                return
+            continue
+
+        pos = at
+        match = ENTRY_START.match(buf, at)
+        # The header may straddle a chunk boundary
+        while match is None and len(buf) - at < 256 and fill():
+            at = pos
+            match = ENTRY_START.match(buf, at)
+        if match is None:
+            pos = at + 1
+            continue
+
+        entry_type = match.group(1).decode('ascii').lower()
+        opener = match.group(2)
+
+        if opener == b'{':
+            body = ENTRY_BODY.match(buf, match.end() - 1)
+            if body:
+                yield entry_type, base + pos, buf[pos:body.end()]
+                pos = body.end()
+                continue
+
+        depth = 1 if opener == b'{' else 0
+        scan = match.end()
+        end, depth = _scan_entry_end(buf, scan, opener, depth)
+
+        while end is None:
+            scan = len(buf)
+            start_offset = pos
+            if not fill():
+                print(f'Warning: unterminated @{entry_type} entry at byte {base + start_offset}',
+                      file=sys.stderr)
+                return
+            # fill() rebased the buffer at the entry start
+            scan -= start_offset
+            end, depth = _scan_entry_end(buf, scan, opener, depth)
+
+        yield entry_type, base + pos, buf[pos:end]
+        pos = end
+
+
+def parse_value(text: str, pos: int, macros: Dict[str, str]) -> Tuple[str, int]:
+    """
+    Parse a field value (with # concatenation) starting at pos.
+
+    Args:
+        text: Entry body
+        pos: Position of the first character of the value
+        macros: @string macros (lowercase names)
+
+    Returns:
+        Tuple of (value, position after the value)
+    """
+    parts = []
+    while True:
+        pos = WHITESPACE.match(text, pos).end()
+        if pos >= len(text):
+            break
+
+        char = text[pos]
+        if char == '{':
+            depth = 0
+            for token in VALUE_BRACES.finditer(text, pos):
+                depth += 1 if token.group() == '{' else -1
+                if depth == 0:
+                    parts.append(text[pos + 1:token.start()])
+                    pos = token.end()
+                    break
+            else:
+                raise BibTeXSyntaxError('unbalanced braces in value')
+        elif char == '"':
+            depth = 0
+            for token in QUOTE_OR_BRACES.finditer(text, pos + 1):
+                token_char = token.group()
+                if token_char == '{':
+                    depth += 1
+                elif token_char == '}':
+                    depth -= 1
+                elif depth == 0:
+                    parts.append(text[pos + 1:token.start()])
+                    pos = token.end()
+                    break
+            else:
+                raise BibTeXSyntaxError('unterminated quoted value')
+        else:
+            match = BARE_VALUE.match(text, pos)
+            if not match:
+                break
+            word = match.group()
+            # Numbers are literal; names are macro references
+            parts.append(word if word.isdigit() else macros.get(word.lower(), word))
+            pos = match.end()
+
+        pos = WHITESPACE.match(text, pos).end()
+        if pos < len(text) and text[pos] == '#':
+            pos += 1
+            continue
+        break
+
+    return ''.join(parts), pos
+
+
+def parse_fields(body: str, pos: int, macros: Dict[str, str]) -> Dict[str, str]:
+    """
+    Parse `name = value` pairs from an entry body.
+
+    Args:
+        body: Entry body (without the outer delimiters)
+        pos: Position of the first field
+        macros: @string macros (lowercase names)
+
+    Returns:
+        Dictionary of lowercase field names to values (last duplicate wins)
+    """
+    fields = {}
+    while pos < len(body):
+        # Fast path: a single braced, quoted or numeric value
+        match = SIMPLE_FIELD.match(body, pos)
+        if match:
+            braced, quoted, number = match.group(2, 3, 4)
+            value = braced[1:-1] if braced is not None else quoted if quoted is not None else number
+            fields[match.group(1).lower()] = value.strip()
+            pos = match.end()
+            continue
+
+        match = FIELD_NAME.match(body, pos)
+        if not match:
+            # Skip separators and junk up to the next comma
+            comma = body.find(',', pos)
+            if comma < 0:
+                break
+            pos = comma + 1
+            continue
+        value, pos = parse_value(body, match.end(), macros)
+        fields[match.group(1).lower()] = value.strip()
+    return fields
+
+
+def _entry_body(raw: str) -> str:
+    """Strip the @type header and outer delimiters from a decoded entry."""
+    body_start = min(i for i in (raw.find('{'), raw.find('(')) if i >= 0) + 1
+    return raw[body_start:-1]
+
+
+def parse_string_entry(raw_bytes: bytes, macros: Dict[str, str]) -> Dict[str, str]:
+    """
+    Parse the definitions of an @string entry.
+
+    Args:
+        raw_bytes: Raw entry bytes
+        macros: Macros defined so far (lowercase names)
+
+    Returns:
+        Dictionary of new macro names to values
+    """
+    return parse_fields(_entry_body(raw_bytes.decode('utf-8', errors='replace')), 0, macros)
+
+
+def parse_entry(entry_type: str, raw_bytes: bytes, offset: int, macros: Dict[str, str]) -> Dict:
+    """
+    Parse one raw entry into an entry dictionary.
+
+    Args:
+        entry_type: Lowercased entry type
+        raw_bytes: Raw entry bytes
+        offset: Byte offset of the entry in its file
+        macros: @string macros (lowercase names)
+
+    Returns:
+        Entry dictionary with type, key, fields, raw, offset and length
+
+    Raises:
+        BibTeXSyntaxError: If a field value is malformed
+    """
+    raw = raw_bytes.decode('utf-8', errors='replace')
+    body = _entry_body(raw)
+    comma = body.find(',')
+    key = (body if comma < 0 else body[:comma]).strip()
+    fields = parse_fields(body, comma + 1, macros) if comma >= 0 else {}
+
+    return {
+        'type': entry_type,
+        'key': key,
+        'fields': fields,
+        'raw': raw,
+        'offset': offset,
+        'length': len(raw_bytes)
+    }
+
+
+def iter_bibtex_entries(fileobj: BinaryIO, macros: Optional[Dict[str, str]] = None,
+                        chunk_size: int = CHUNK_SIZE) -> Iterator[Dict]:
+    """
+    Stream parsed BibTeX entries from a binary file object.
+
+    @string definitions are expanded in later entries; @comment and
+    @preamble blocks are skipped.
+
+    Args:
+        fileobj: File opened in binary mode
+        macros: Initial macro definitions (month names are predefined)
+        chunk_size: Bytes read per chunk
+
+    Yields:
+        Entry dictionaries with type, key, fields, raw, offset and length
+    """
+    all_macros = dict(MONTH_MACROS)
+    if macros:
+        all_macros.update({k.lower(): v for k, v in macros.items()})
+
+    for entry_type, offset, raw_bytes in iter_raw_entries(fileobj, chunk_size):
+        if entry_type in ('comment', 'preamble'):
+            continue
+
+        try:
+            if entry_type == 'string':
+                all_macros.update(parse_string_entry(raw_bytes, all_macros))
+                continue
+            entry = parse_entry(entry_type, raw_bytes, offset, all_macros)
+        except BibTeXSyntaxError as e:
+            print(f'Warning: skipping malformed entry at byte {offset}: {e}', file=sys.stderr)
+            continue
+
+        yield entry
+
+
+def parse_bibtex_file(filepath: str) -> list:
+    """
+    Parse a BibTeX file into a list of entry dictionaries.
+
+    Args:
+        filepath: Path to BibTeX file
+
+    Returns:
+        List of entry dictionaries (empty if the file cannot be read)
+    """
+    try:
+        with open(filepath, 'rb') as f:
+            return list(iter_bibtex_entries(f))
+    except Exception as e:
+        print(f'Error reading file: {e}', file=sys.stderr)
+        return []
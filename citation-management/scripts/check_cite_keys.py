@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+LaTeX Citation Key Cross-Reference Checker
+Find \\cite keys missing from the bibliography and bibliography entries that
+are never cited, across a multi-file LaTeX project.
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+
+from bibtex_index import BibTeXIndex
+from bibtex_cache import DEFAULT_CACHE_DIR
+
+
+# One scanner per file: comments, input/include commands, bibliography
+# declarations and every natbib/biblatex \...cite... variant
+TEX_SCANNER = re.compile(
+    r'(?P<comment>(?<!\\)%[^\n]*)'
+    r'|\\(?P<include>input|include|subfile|subimport\*?\s*\{[^}]*\}|import\*?\s*\{[^}]*\})\s*\{(?P<target>[^}]+)\}'
+    r'|\\(?:bibliography|addbibresource(?:\s*\[[^\]]*\])?)\s*\{(?P<bib>[^}]+)\}'
+    r'|\\(?P<command>[A-Za-z]*cite[A-Za-z]*\*?)\s*(?:\[[^\]]*\]\s*){0,2}\{(?P<keys>[^}]*)\}'
+)
+
+TEX_CACHE = os.path.join(os.path.dirname(DEFAULT_CACHE_DIR), 'texkeys')
+
+# Process pool only pays off for many cold files
+PARALLEL_THRESHOLD = 32
+
+
+def scan_tex(path: str, root: str) -> Dict:
+    """
+    Scan one .tex file for citation keys, included files and bibliographies.
+
+    Args:
+        path: Path to .tex file
+        root: Project directory (where LaTeX runs)
+
+    Returns:
+        Dictionary with cites [(key, line)], includes [path] and bibs [path].
+        As in LaTeX, \\input, \\include and bibliography paths are relative
+        to the project directory, \\subfile and \\subimport to the current file.
+    """
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        text = f.read()
+
+    here = os.path.dirname(path)
+    cites, includes, bibs = [], [], []
+    line, last = 1, 0
+
+    for match in TEX_SCANNER.finditer(text):
+        if match.group('comment') is not None:
+            continue
+        line += text.count('\n', last, match.start())
+        last = match.start()
+
+        if match.group('keys') is not None:
+            for key in match.group('keys').split(','):
+                key = key.strip()
+                if key:
+                    cites.append((key, line))
+        elif match.group('include') is not None:
+            command = match.group('include')
+            directory = here if command == 'subfile' else root
+            if command.startswith(('import', 'subimport')):
+                parent = here if command.startswith('subimport') else root
+                directory = os.path.join(parent, command[command.index('{') + 1:-1].strip())
+            target = os.path.join(directory, match.group('target').strip())
+            includes.append(target if target.endswith('.tex') else f'{target}.tex')
+        else:
+            for bib in match.group('bib').split(','):
+                bib = os.path.join(root, bib.strip())
+                bibs.append(bib if bib.endswith('.bib') else f'{bib}.bib')
+
+    return {'cites': cites, 'includes': includes, 'bibs': bibs}
+
+
+class CiteKeyChecker:
+    """Cross-reference citation keys in a LaTeX project against .bib files."""
+
+    def __init__(self, cache_dir: Optional[str] = TEX_CACHE, jobs: int = 0):
+        """
+        Initialize checker.
+
+        Args:
+            cache_dir: Directory for per-project scan caches (None to disable)
+            jobs: Worker processes for cold scans (0 for all CPUs)
+        """
+        self.cache_dir = cache_dir
+        self.jobs = jobs or os.cpu_count() or 1
+        self.scanned = 0
+        self.cached = 0
+
+    def _cache_path(self, main_tex: str) -> Optional[str]:
+        if self.cache_dir is None:
+            return None
+        name = hashlib.sha1(os.path.abspath(main_tex).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f'{name}.json')
+
+    def _load_cache(self, main_tex: str) -> Dict:
+        path = self._cache_path(main_tex)
+        if not path:
+            return {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _save_cache(self, main_tex: str, cache: Dict) -> None:
+        path = self._cache_path(main_tex)
+        if not path:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = f'{path}.{os.getpid()}.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f'Warning: could not write scan cache {path}: {e}', file=sys.stderr)
+
+    def scan_project(self, main_tex: str) -> Dict[str, Dict]:
+        """
+        Scan the \\input/\\include tree rooted at a main .tex file.
+
+        Files whose size and mtime match the cache are not re-read; the
+        remaining files of each include level are scanned in parallel.
+
+        Args:
+            main_tex: Main .tex file
+
+        Returns:
+            Dictionary mapping each reachable file to its scan result
+        """
+        cache = self._load_cache(main_tex)
+        root = os.path.dirname(os.path.normpath(main_tex))
+        results = {}
+        level = [os.path.normpath(main_tex)]
+
+        with ProcessPoolExecutor(max_workers=self.jobs) if self.jobs > 1 else _Serial() as executor:
+            while level:
+                stale = []
+                for path in level:
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        print(f'Warning: included file not found: {path}', file=sys.stderr)
+                        continue
+                    signature = [stat.st_size, stat.st_mtime_ns]
+                    entry = cache.get(path)
+                    if entry and entry['stat'] == signature:
+                        results[path] = entry
+                        self.cached += 1
+                    else:
+                        stale.append((path, signature))
+
+                if len(stale) >= PARALLEL_THRESHOLD:
+                    scans = executor.map(scan_tex, [path for path, _ in stale], [root] * len(stale), chunksize=8)
+                else:
+                    scans = (scan_tex(path, root) for path, _ in stale)
+                for (path, signature), scan in zip(stale, scans):
+                    scan['stat'] = signature
+                    results[path] = cache[path] = scan
+                    self.scanned += 1
+
+                next_level = []
+                for path in level:
+                    for include in results.get(path, {}).get('includes', []):
+                        include = os.path.normpath(include)
+                        if include not in results and include not in next_level:
+                            next_level.append(include)
+                level = next_level
+
+        # Forget files no longer reachable
+        if self.scanned or len(results) != len(cache):
+            self._save_cache(main_tex, {path: cache[path] for path in results})
+        return results
+
+    def check(self, main_tex: str, bib_files: Optional[List[str]] = None) -> Dict:
+        """
+        Cross-reference cited keys against bibliography entries.
+
+        Args:
+            main_tex: Main .tex file
+            bib_files: .bib files (default: those named by \\bibliography or
+                \\addbibresource in the project)
+
+        Returns:
+            Report with missing keys (and where they are cited), unused
+            entries and counts
+        """
+        files = self.scan_project(main_tex)
+
+        cited: Dict[str, List[Tuple[str, int]]] = {}
+        declared_bibs = []
+        for path, scan in files.items():
+            for key, line in scan['cites']:
+                cited.setdefault(key, []).append((path, line))
+            declared_bibs.extend(bib for bib in scan['bibs'] if bib not in declared_bibs)
+
+        bib_keys: Set[str] = set()
+        for bib in bib_files or declared_bibs:
+            try:
+                with BibTeXIndex(bib) as index:
+                    bib_keys.update(index.keys)
+            except OSError as e:
+                print(f'Error reading bibliography: {e}', file=sys.stderr)
+
+        cite_all = '*' in cited
+        cited.pop('*', None)
+        missing = {key: locations for key, locations in cited.items() if key not in bib_keys}
+        unused = [] if cite_all else sorted(bib_keys.difference(cited))
+
+        return {
+            'files': len(files),
+            'bibliographies': bib_files or declared_bibs,
+            'cited_keys': len(cited),
+            'bib_entries': len(bib_keys),
+            'missing': missing,
+            'unused': unused
+        }
+
+
+class _Serial:
+    """Stand-in for a process pool when running single-process."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def map(self, function, *iterables, chunksize=1):
+        return map(function, *iterables)
+
+
+def main():
+    """Command-line interface."""
+    parser = argparse.ArgumentParser(
+        description='Find \\cite keys missing from .bib files and .bib entries never cited',
+        epilog='Example: python check_cite_keys.py thesis.tex --bib references.bib'
+    )
+
+    parser.add_argument(
+        'tex',
+        help='Main .tex file of the project'
+    )
+
+    parser.add_argument(
+        '--bib',
+        action='append',
+        help='Bibliography file (repeatable; default: files named in \\bibliography/\\addbibresource)'
+    )
+
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=0,
+        help='Worker processes for scanning changed files (0 for all CPUs)'
+    )
+
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Re-scan every file instead of using the per-file key cache'
+    )
+
+    parser.add_argument(
+        '--report',
+        help='Output file for JSON report'
+    )
+
+    parser.add_argument(
+        '--show-unused',
+        action='store_true',
+        help='List every uncited bibliography entry'
+    )
+
+    args = parser.parse_args()
+
+    checker = CiteKeyChecker(cache_dir=None if args.no_cache else TEX_CACHE, jobs=args.jobs)
+    report = checker.check(args.tex, args.bib)
+
+    print(f'Scanned {report["files"]} files ({checker.scanned} changed, {checker.cached} cached)',
+          file=sys.stderr)
+    print(f'Cited keys: {report["cited_keys"]}')
+    print(f'Bibliography entries: {report["bib_entries"]}')
+    print(f'Missing from bibliography: {len(report["missing"])}')
+    print(f'Never cited: {len(report["unused"])}')
+
+    if report['missing']:
+        print('\nMISSING KEYS:')
+        for key, locations in sorted(report['missing'].items()):
+            path, line = locations[0]
+            more = f' (+{len(locations) - 1} more)' if len(locations) > 1 else ''
+            print(f'  {key}  {path}:{line}{more}')
+
+    if report['unused'] and args.show_unused:
+        print('\nNEVER CITED:')
+        for key in report['unused']:
+            print(f'  {key}')
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f'\nDetailed report saved to: {args.report}')
+
+    if report['missing']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
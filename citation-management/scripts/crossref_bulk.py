@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+CrossRef Bulk Resolver
+Resolve many DOIs per request using the CrossRef /works filter endpoint.
+"""
+
+import sys
+import time
+import json
+import argparse
+import requests
+from typing import Dict, List, Optional, Iterator
+from urllib.parse import urlencode
+
+
+def normalize_doi(doi: str) -> str:
+    """
+    Normalize a DOI for comparison (strip URL/doi: prefixes, lowercase).
+
+    Args:
+        doi: DOI string, optionally prefixed with a resolver URL
+
+    Returns:
+        Normalized DOI
+    """
+    doi = doi.strip()
+    for prefix in ('https://doi.org/', 'http://doi.org/', 'https://dx.doi.org/',
+                   'http://dx.doi.org/', 'doi:'):
+        if doi.lower().startswith(prefix):
+            doi = doi[len(prefix):]
+            break
+    return doi.strip().lower()
+
+
+class CrossRefBulkResolver:
+    """Resolve DOIs to CrossRef work records, many DOIs per request."""
+
+    API_URL = 'https://api.crossref.org/works'
+
+    # Fields needed by the citation tools; keeps responses small
+    SELECT_FIELDS = [
+        'DOI', 'type', 'title', 'author', 'container-title', 'volume',
+        'issue', 'page', 'publisher', 'published-print', 'published-online',
+        'issued', 'URL'
+    ]
+
+    # CrossRef caps rows at 1000; URLs much past ~4 KB get rejected by proxies
+    MAX_ROWS = 1000
+    MAX_URL_LENGTH = 4000
+
+    def __init__(self, session: Optional[requests.Session] = None,
+                 mailto: Optional[str] = None, max_url_length: int = MAX_URL_LENGTH,
+                 delay: float = 0.1, max_retries: int = 4):
+        """
+        Initialize resolver.
+
+        Args:
+            session: Existing requests session to reuse (headers are kept)
+            mailto: Contact email for the CrossRef polite pool
+            max_url_length: Maximum request URL length before splitting a batch
+            delay: Delay between requests (seconds) for rate limiting
+            max_retries: Retry attempts for rate limiting and server errors
+        """
+        if session is None:
+            session = requests.Session()
+            session.headers.update({
+                'User-Agent': 'CrossRefBulkResolver/1.0 (Citation Management Tool)'
+            })
+        self.session = session
+        self.mailto = mailto
+        self.max_url_length = max_url_length
+        self.delay = delay
+        self.max_retries = max_retries
+        self.request_count = 0
+        self._last_request_time = 0.0
+
+    def resolve(self, dois: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Resolve DOIs to CrossRef work records.
+
+        DOIs are packed into `filter=doi:...,doi:...` requests split on URL
+        length. DOIs missing from the bulk responses are retried one at a
+        time via `/works/{doi}`.
+
+        Args:
+            dois: List of DOIs (duplicates and URL prefixes are fine)
+
+        Returns:
+            Dictionary mapping normalized DOI to CrossRef message (None if not found)
+        """
+        wanted = []
+        seen = set()
+        for doi in dois:
+            norm = normalize_doi(doi)
+            if norm and norm not in seen:
+                seen.add(norm)
+                wanted.append(norm)
+
+        results: Dict[str, Optional[Dict]] = {}
+
+        # Commas separate filter clauses, so such DOIs can only go per-DOI
+        bulk = [d for d in wanted if ',' not in d]
+
+        for batch in self._batches(bulk):
+            print(f'CrossRef bulk lookup: {len(batch)} DOIs', file=sys.stderr)
+            for message in self._fetch_batch(batch):
+                norm = normalize_doi(message.get('DOI', ''))
+                if norm in seen:
+                    results[norm] = message
+
+        misses = [d for d in wanted if d not in results]
+        if misses:
+            print(f'CrossRef fallback: {len(misses)} DOIs looked up individually', file=sys.stderr)
+        for doi in misses:
+            results[doi] = self._fetch_single(doi)
+
+        return results
+
+    def _batches(self, dois: List[str]) -> Iterator[List[str]]:
+        """Split DOIs into batches whose request URL stays under the limit."""
+        base_length = len(self._build_url([]))
+        batch: List[str] = []
+        length = base_length
+
+        for doi in dois:
+            # Each DOI adds ",doi:<doi>" percent-encoded to the filter value
+            clause_length = len(urlencode({'f': f',doi:{doi}'})) - 2
+            if batch and (length + clause_length > self.max_url_length or len(batch) >= self.MAX_ROWS):
+                yield batch
+                batch = []
+                length = base_length
+            batch.append(doi)
+            length += clause_length
+
+        if batch:
+            yield batch
+
+    def _build_url(self, dois: List[str]) -> str:
+        """Build the bulk filter URL for a batch of DOIs."""
+        params = {
+            'filter': ','.join(f'doi:{doi}' for doi in dois),
+            'select': ','.join(self.SELECT_FIELDS),
+            'rows': self.MAX_ROWS
+        }
+        if self.mailto:
+            params['mailto'] = self.mailto
+        return f'{self.API_URL}?{urlencode(params)}'
+
+    def _fetch_batch(self, dois: List[str]) -> List[Dict]:
+        """Fetch one bulk filter request; returns the list of work messages."""
+        data = self._get(self._build_url(dois))
+        if not data:
+            return []
+        return data.get('message', {}).get('items', [])
+
+    def _fetch_single(self, doi: str) -> Optional[Dict]:
+        """Fetch a single DOI via /works/{doi}."""
+        url = f'{self.API_URL}/{doi}'
+        if self.mailto:
+            url += f'?{urlencode({"mailto": self.mailto})}'
+        data = self._get(url)
+        if not data:
+            return None
+        return data.get('message')
+
+    def _get(self, url: str) -> Optional[Dict]:
+        """GET with rate limiting and retry on 429/5xx; returns parsed JSON or None."""
+        for attempt in range(self.max_retries):
+            elapsed = time.time() - self._last_request_time
+            if elapsed < self.delay:
+                time.sleep(self.delay - elapsed)
+            self._last_request_time = time.time()
+            self.request_count += 1
+
+            try:
+                response = self.session.get(url, timeout=30)
+            except requests.exceptions.RequestException as e:
+                print(f'Error: CrossRef request failed: {e}', file=sys.stderr)
+                time.sleep(2 ** attempt)
+                continue
+
+            if response.status_code == 200:
+                return response.json()
+            elif response.status_code == 404:
+                return None
+            elif response.status_code == 429 or response.status_code >= 500:
+                wait_time = 2 ** attempt
+                print(f'CrossRef returned {response.status_code}. Waiting {wait_time}s before retry...', file=sys.stderr)
+                time.sleep(wait_time)
+            else:
+                print(f'Error: CrossRef API returned status {response.status_code}', file=sys.stderr)
+                return None
+
+        return None
+
+
+def main():
+    """Command-line interface."""
+    parser = argparse.ArgumentParser(
+        description='Resolve many DOIs to CrossRef metadata with bulk filter requests',
+        epilog='Example: python crossref_bulk.py -i dois.txt -o crossref.json'
+    )
+
+    parser.add_argument('dois', nargs='*', help='DOI(s) to resolve')
+    parser.add_argument('-i', '--input', help='Input file with DOIs (one per line)')
+    parser.add_argument('-o', '--output', help='Output JSON file (default: stdout)')
+    parser.add_argument('--email', help='Email for the CrossRef polite pool')
+
+    args = parser.parse_args()
+
+    dois = list(args.dois)
+    if args.input:
+        try:
+            with open(args.input, 'r', encoding='utf-8') as f:
+                dois.extend(line.strip() for line in f if line.strip())
+        except Exception as e:
+            print(f'Error reading input file: {e}', file=sys.stderr)
+            sys.exit(1)
+
+    if not dois:
+        parser.print_help()
+        sys.exit(1)
+
+    resolver = CrossRefBulkResolver(mailto=args.email)
+    results = resolver.resolve(dois)
+    found = sum(1 for message in results.values() if message)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f'Wrote {len(results)} records to {args.output}', file=sys.stderr)
+    else:
+        print(output)
+
+    print(f'\nResolved {found}/{len(results)} DOIs in {resolver.request_count} requests', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,489 @@
+#!/usr/bin/env python3
+"""
+CSL-JSON Citation Renderer
+Fetch CSL-JSON once per DOI, cache it locally, and render BibTeX, APA,
+Nature, IEEE and RIS from the cached record without further network calls.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import requests
+from string import Formatter
+from typing import Dict, List, Optional, Tuple
+
+from crossref_bulk import CrossRefBulkResolver, normalize_doi
+
+
+DEFAULT_CACHE = os.path.join(
+    os.getenv('CITATION_CACHE_DIR', os.path.expanduser('~/.cache/citation-management')),
+    'csl.sqlite'
+)
+
+# CrossRef work types to CSL types
+CROSSREF_TO_CSL_TYPE = {
+    'journal-article': 'article-journal',
+    'book': 'book',
+    'monograph': 'book',
+    'book-chapter': 'chapter',
+    'proceedings-article': 'paper-conference',
+    'posted-content': 'article',
+    'dataset': 'dataset',
+    'report': 'report',
+    'dissertation': 'thesis'
+}
+
+CSL_TO_BIBTEX_TYPE = {
+    'article-journal': 'article',
+    'book': 'book',
+    'chapter': 'incollection',
+    'paper-conference': 'inproceedings',
+    'report': 'techreport',
+    'thesis': 'phdthesis'
+}
+
+BIBTEX_TO_CSL_TYPE = {bibtex: csl for csl, bibtex in CSL_TO_BIBTEX_TYPE.items()}
+
+CSL_TO_RIS_TYPE = {
+    'article-journal': 'JOUR',
+    'book': 'BOOK',
+    'chapter': 'CHAP',
+    'paper-conference': 'CONF',
+    'report': 'RPRT',
+    'thesis': 'THES',
+    'dataset': 'DATA',
+    'article': 'UNPB'
+}
+
+# Acronyms and proper nouns protected from BibTeX case changes
+PROTECTED_WORDS = [
+    'DNA', 'RNA', 'CRISPR', 'COVID', 'HIV', 'AIDS', 'AlphaFold',
+    'Python', 'AI', 'ML', 'GPU', 'CPU', 'USA', 'UK', 'EU'
+]
+PROTECTED_PATTERN = re.compile(r'\b(' + '|'.join(PROTECTED_WORDS) + r')\b', re.IGNORECASE)
+PROTECTED_CASE = {word.lower(): word for word in PROTECTED_WORDS}
+
+# Style templates: a segment is emitted only if every variable it uses is non-empty.
+# Line-based styles (bibtex, ris) treat each segment as one line.
+STYLE_TEMPLATES = {
+    'apa': [
+        '{authors_apa} ', '({year_or_nd}). ', '{title}. ', '*{container}*',
+        ', *{volume}*', '({issue})', ', {pages_range}', '. https://doi.org/{doi}'
+    ],
+    'nature': [
+        '{authors_nature} ', '{title}. ', '*{container}* ', '**{volume}**, ',
+        '{pages_range} ', '({year})'
+    ],
+    'ieee': [
+        '{authors_ieee}, ', '"{title}," ', '*{container}*, ', 'vol. {volume}, ',
+        'no. {issue}, ', 'pp. {pages_range}, ', '{year}', ', doi: {doi}', '.'
+    ],
+    'bibtex': [
+        '@{bibtex_type}{{{key},',
+        '  author  = {{{authors_bibtex}}},',
+        '  title   = {{{title_bibtex}}},',
+        '  journal = {{{journal}}},',
+        '  howpublished = {{{howpublished}}},',
+        '  year    = {{{year}}},',
+        '  volume  = {{{volume}}},',
+        '  number  = {{{issue}}},',
+        '  pages   = {{{pages_bibtex}}},',
+        '  doi     = {{{doi}}},',
+        '  url     = {{{url_bibtex}}},',
+        '  note    = {{PMID: {pmid}}},',
+        '  note    = {{{preprint_note}}},'
+    ],
+    'ris': [
+        'TY  - {ris_type}', '{ris_authors}', 'TI  - {title}', 'JO  - {container}',
+        'VL  - {volume}', 'IS  - {issue}', 'SP  - {page_start}', 'EP  - {page_end}',
+        'PY  - {year}', 'PB  - {publisher}', 'DO  - {doi}', 'UR  - {url}', 'ER  - '
+    ]
+}
+
+LINE_STYLES = {'bibtex', 'ris'}
+
+
+def _compile(template: List[str]) -> List[Tuple[Tuple[str, ...], str]]:
+    """Pre-parse template segments into (required variables, format string)."""
+    formatter = Formatter()
+    return [
+        (tuple(name for _, name, _, _ in formatter.parse(segment) if name), segment)
+        for segment in template
+    ]
+
+
+COMPILED_STYLES = {style: _compile(template) for style, template in STYLE_TEMPLATES.items()}
+STYLES = list(COMPILED_STYLES)
+
+
+def _first(value) -> str:
+    """Return the first element of a CrossRef list field, or the value itself."""
+    if isinstance(value, list):
+        return str(value[0]) if value else ''
+    return str(value) if value else ''
+
+
+def csl_year(csl: Dict) -> str:
+    """Extract the publication year from a CSL-JSON record."""
+    for date_field in ('issued', 'published-print', 'published-online'):
+        date_parts = csl.get(date_field, {}).get('date-parts', [[]])
+        if date_parts and date_parts[0] and date_parts[0][0]:
+            return str(date_parts[0][0])
+    return ''
+
+
+def crossref_to_csl(message: Dict) -> Dict:
+    """
+    Convert a CrossRef work message to a CSL-JSON record.
+
+    Args:
+        message: CrossRef /works message
+
+    Returns:
+        CSL-JSON dictionary
+    """
+    doi = message.get('DOI', '')
+    authors = []
+    for author in message.get('author', []):
+        if author.get('family'):
+            authors.append({'family': author['family'], 'given': author.get('given', '')})
+        elif author.get('name'):
+            authors.append({'literal': author['name']})
+
+    # Same date precedence as the rest of the tools: print, then online, then issued
+    issued = None
+    for date_field in ('published-print', 'published-online', 'issued'):
+        date_parts = message.get(date_field, {}).get('date-parts', [[]])
+        if date_parts and date_parts[0] and date_parts[0][0]:
+            issued = {'date-parts': [date_parts[0]]}
+            break
+
+    csl = {
+        'id': normalize_doi(doi),
+        'type': CROSSREF_TO_CSL_TYPE.get(message.get('type'), 'document'),
+        'DOI': doi,
+        'title': _first(message.get('title')),
+        'container-title': _first(message.get('container-title')),
+        'volume': _first(message.get('volume')),
+        'issue': _first(message.get('issue')),
+        'page': _first(message.get('page')),
+        'publisher': _first(message.get('publisher')),
+        'URL': message.get('URL') or (f'https://doi.org/{doi}' if doi else ''),
+        'author': authors
+    }
+    if issued:
+        csl['issued'] = issued
+
+    return {k: v for k, v in csl.items() if v}
+
+
+class CSLStore:
+    """SQLite-backed cache of CSL-JSON records keyed by normalized DOI."""
+
+    def __init__(self, cache_path: str = DEFAULT_CACHE, session: Optional[requests.Session] = None):
+        """
+        Open (or create) the cache.
+
+        Args:
+            cache_path: SQLite cache file (':memory:' for no persistence)
+            session: Existing requests session to reuse
+        """
+        if cache_path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+        self.conn = sqlite3.connect(cache_path)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS csl (doi TEXT PRIMARY KEY, record TEXT NOT NULL, fetched REAL)'
+        )
+
+        if session is None:
+            session = requests.Session()
+            session.headers.update({
+                'User-Agent': 'CSLStore/1.0 (Citation Management Tool)'
+            })
+        self.session = session
+
+    def put_many(self, records: List[Dict]) -> None:
+        """Store CSL-JSON records (keyed by their DOI)."""
+        now = time.time()
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO csl (doi, record, fetched) VALUES (?, ?, ?)',
+            [(normalize_doi(r['DOI']), json.dumps(r), now) for r in records if r.get('DOI')]
+        )
+        self.conn.commit()
+
+    def get(self, doi: str) -> Optional[Dict]:
+        """Get the CSL-JSON record for one DOI, fetching it if not cached."""
+        return self.get_many([doi]).get(normalize_doi(doi))
+
+    def get_many(self, dois: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Get CSL-JSON records for many DOIs.
+
+        Cached records are returned directly. Misses are resolved with bulk
+        CrossRef requests, then doi.org content negotiation for DOIs CrossRef
+        does not know (e.g. DataCite). Fetched records are cached.
+
+        Args:
+            dois: List of DOIs
+
+        Returns:
+            Dictionary mapping normalized DOI to CSL-JSON record (None if not found)
+        """
+        wanted = list(dict.fromkeys(normalize_doi(doi) for doi in dois if doi.strip()))
+        results: Dict[str, Optional[Dict]] = {}
+
+        # SQLite limits bound parameters per statement
+        for i in range(0, len(wanted), 500):
+            batch = wanted[i:i+500]
+            placeholders = ','.join('?' * len(batch))
+            for doi, record in self.conn.execute(
+                    f'SELECT doi, record FROM csl WHERE doi IN ({placeholders})', batch):
+                results[doi] = json.loads(record)
+
+        misses = [doi for doi in wanted if doi not in results]
+        if not misses:
+            return results
+
+        print(f'Fetching CSL-JSON for {len(misses)} uncached DOIs', file=sys.stderr)
+        messages = CrossRefBulkResolver(session=self.session).resolve(misses)
+        fetched = [crossref_to_csl(message) for message in messages.values() if message]
+
+        for doi in misses:
+            if not messages.get(doi):
+                record = self._fetch_csl(doi)
+                if record:
+                    fetched.append(record)
+
+        self.put_many(fetched)
+        for record in fetched:
+            results[normalize_doi(record['DOI'])] = record
+        for doi in misses:
+            results.setdefault(doi, None)
+
+        return results
+
+    def _fetch_csl(self, doi: str) -> Optional[Dict]:
+        """Fetch CSL-JSON for one DOI via doi.org content negotiation."""
+        try:
+            response = self.session.get(
+                f'https://doi.org/{doi}',
+                headers={'Accept': 'application/vnd.citationstyles.csl+json'},
+                timeout=15
+            )
+            if response.status_code == 200:
+                record = response.json()
+                record.setdefault('DOI', doi)
+                return record
+            print(f'Error: No CSL-JSON for DOI {doi} (status {response.status_code})', file=sys.stderr)
+        except Exception as e:
+            print(f'Error: CSL-JSON request failed for {doi}: {e}', file=sys.stderr)
+        return None
+
+
+class CitationRenderer:
+    """Render CSL-JSON records locally in several citation styles."""
+
+    def render(self, csl: Dict, style: str = 'bibtex', citation_key: Optional[str] = None) -> str:
+        """
+        Render one CSL-JSON record.
+
+        Args:
+            csl: CSL-JSON record
+            style: One of STYLES ('bibtex', 'apa', 'nature', 'ieee', 'ris')
+            citation_key: Custom BibTeX citation key
+
+        Returns:
+            Formatted citation string
+        """
+        variables = self._variables(csl)
+        if citation_key:
+            variables['key'] = citation_key
+        return self._render_variables(variables, style)
+
+    def render_many(self, records: List[Dict], styles: List[str]) -> Dict[str, List[str]]:
+        """
+        Render many CSL-JSON records in one or more styles.
+
+        Template variables are computed once per record and shared by all styles.
+
+        Args:
+            records: CSL-JSON records
+            styles: Styles to render
+
+        Returns:
+            Dictionary mapping style to rendered citations (in record order)
+        """
+        rendered = {style: [] for style in styles}
+        for record in records:
+            variables = self._variables(record)
+            for style in styles:
+                rendered[style].append(self._render_variables(variables, style))
+        return rendered
+
+    def _render_variables(self, variables: Dict[str, str], style: str) -> str:
+        """Fill a compiled style template from precomputed variables."""
+        if style not in COMPILED_STYLES:
+            raise ValueError(f'Unknown style: {style}')
+
+        parts = [
+            fmt.format_map(variables)
+            for names, fmt in COMPILED_STYLES[style]
+            if all(variables[name] for name in names)
+        ]
+
+        if style not in LINE_STYLES:
+            return ''.join(parts).strip()
+
+        if style == 'bibtex':
+            # Remove trailing comma from last field
+            if parts[-1].endswith(','):
+                parts[-1] = parts[-1][:-1]
+            parts.append('}')
+
+        return '\n'.join(parts)
+
+    def citation_key(self, csl: Dict) -> str:
+        """Generate a citation key: first author surname, year, first title word."""
+        authors = csl.get('author', [])
+        if authors:
+            first = authors[0]
+            last_name = first.get('family') or (first.get('literal', '').split() or ['Unknown'])[-1]
+        else:
+            last_name = 'Unknown'
+
+        year = csl_year(csl) or 'XXXX'
+
+        # Clean last name (remove special characters)
+        last_name = re.sub(r'[^a-zA-Z]', '', last_name)
+
+        # Get keyword from title
+        words = re.findall(r'\b[a-zA-Z]{4,}\b', csl.get('title', ''))
+        keyword = words[0].lower() if words else 'paper'
+
+        return f'{last_name}{year}{keyword}'
+
+    def _variables(self, csl: Dict) -> Dict[str, str]:
+        """Compute every template variable for a record once."""
+        csl_type = csl.get('type', 'document')
+        authors = csl.get('author', [])
+        year = csl_year(csl)
+        title = ' '.join(_first(csl.get('title')).split())
+        container = _first(csl.get('container-title'))
+        pages = _first(csl.get('page'))
+        page_start, _, page_end = pages.partition('-')
+        doi = csl.get('DOI', '')
+        url = csl.get('URL', '')
+        is_arxiv = csl.get('archive') == 'arXiv'
+        bibtex_type = CSL_TO_BIBTEX_TYPE.get(csl_type, 'misc')
+
+        return {
+            'key': self.citation_key(csl),
+            'bibtex_type': bibtex_type,
+            'ris_type': CSL_TO_RIS_TYPE.get(csl_type, 'GEN'),
+            'title': title,
+            'title_bibtex': PROTECTED_PATTERN.sub(lambda m: '{' + PROTECTED_CASE[m.group(1).lower()] + '}', title),
+            'container': container,
+            'journal': container if bibtex_type == 'article' else '',
+            'howpublished': 'arXiv' if is_arxiv and bibtex_type == 'misc' else '',
+            'preprint_note': 'Preprint' if is_arxiv and not doi else '',
+            'volume': _first(csl.get('volume')),
+            'issue': _first(csl.get('issue')),
+            'pages_range': re.sub(r'-+', '–', pages),
+            'pages_bibtex': re.sub(r'-+', '--', pages),
+            'page_start': page_start.strip(),
+            'page_end': page_end.strip('-').strip(),
+            'year': year,
+            'year_or_nd': year or 'n.d.',
+            'publisher': _first(csl.get('publisher')),
+            'doi': doi,
+            'url': url,
+            'url_bibtex': '' if doi else url,
+            'pmid': csl.get('PMID', ''),
+            'authors_bibtex': ' and '.join(self._name(a, 'family-given') for a in authors),
+            'authors_apa': self._join_names([self._name(a, 'family-initials') for a in authors[:20]], ', ', ', & '),
+            'authors_nature': self._join_names(
+                [self._name(a, 'family-initials') for a in authors] if len(authors) <= 5
+                else [self._name(authors[0], 'family-initials') + ' et al.'],
+                ', ', ' & '
+            ),
+            'authors_ieee': self._join_names(
+                [self._name(a, 'initials-family') for a in authors] if len(authors) <= 6
+                else [self._name(authors[0], 'initials-family') + ' et al.'],
+                ', ', ', and '
+            ),
+            'ris_authors': '\n'.join(f'AU  - {self._name(a, "family-given")}' for a in authors)
+        }
+
+    def _name(self, author: Dict, form: str) -> str:
+        """Format one CSL name ('family-given', 'family-initials' or 'initials-family')."""
+        family = author.get('family', '')
+        if not family:
+            return author.get('literal', '')
+
+        given = author.get('given', '')
+        if form == 'family-given':
+            return f'{family}, {given}' if given else family
+
+        initials = ' '.join(f'{part[0]}.' for part in re.split(r'[\s.]+', given) if part)
+        if form == 'family-initials':
+            return f'{family}, {initials}' if initials else family
+        return f'{initials} {family}' if initials else family
+
+    def _join_names(self, names: List[str], separator: str, last_separator: str) -> str:
+        """Join names with a different separator before the last one."""
+        names = [name for name in names if name]
+        if len(names) <= 1:
+            return ''.join(names)
+        return separator.join(names[:-1]) + last_separator + names[-1]
+
+
+def main():
+    """Command-line interface."""
+    parser = argparse.ArgumentParser(
+        description='Render DOIs in BibTeX, APA, Nature, IEEE or RIS from cached CSL-JSON',
+        epilog='Example: python csl_render.py -i dois.txt --style apa'
+    )
+
+    parser.add_argument('dois', nargs='*', help='DOI(s) to render')
+    parser.add_argument('-i', '--input', help='Input file with DOIs (one per line)')
+    parser.add_argument('-o', '--output', help='Output file (default: stdout)')
+    parser.add_argument('--style', choices=STYLES, default='bibtex', help='Citation style (default: bibtex)')
+    parser.add_argument('--cache', default=DEFAULT_CACHE, help=f'CSL-JSON cache file (default: {DEFAULT_CACHE})')
+
+    args = parser.parse_args()
+
+    dois = list(args.dois)
+    if args.input:
+        try:
+            with open(args.input, 'r', encoding='utf-8') as f:
+                dois.extend(line.strip() for line in f if line.strip())
+        except Exception as e:
+            print(f'Error reading input file: {e}', file=sys.stderr)
+            sys.exit(1)
+
+    if not dois:
+        parser.print_help()
+        sys.exit(1)
+
+    records = CSLStore(args.cache).get_many(dois)
+    renderer = CitationRenderer()
+    rendered = [
+        renderer.render(records[normalize_doi(doi)], args.style)
+        for doi in dois if records.get(normalize_doi(doi))
+    ]
+
+    output = '\n\n'.join(rendered) + '\n'
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f'Wrote {len(rendered)} citations to {args.output}', file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
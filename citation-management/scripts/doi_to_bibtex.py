@@ -8,66 +8,49 @@ import sys
 import requests
 import argparse
 import time
-import json
-from typing import Optional, List
+from typing import Optional, List, Iterator, Tuple
+
+from batch_journal import BatchJournal, EntryWriter
+from crossref_bulk import normalize_doi
+from csl_render import CSLStore, CitationRenderer, DEFAULT_CACHE, STYLES
 
 class DOIConverter:
     """Convert DOIs to BibTeX entries using CrossRef API."""
     
-    def __init__(self):
+    def __init__(self, cache_path: str = DEFAULT_CACHE, style: str = 'bibtex'):
+        """
+        Initialize converter.
+        
+        Args:
+            cache_path: CSL-JSON cache file
+            style: Citation style (bibtex, apa, nature, ieee, ris)
+        """
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'DOIConverter/1.0 (Citation Management Tool; mailto:support@example.com)'
         })
+        self.csl_store = CSLStore(cache_path, session=self.session)
+        self.renderer = CitationRenderer()
+        self.style = style
     
     def doi_to_bibtex(self, doi: str) -> Optional[str]:
         """
         Convert a single DOI to BibTeX format.
         
+        The DOI's CSL-JSON record is fetched once, cached, and rendered
+        locally in the converter's style.
+        
         Args:
             doi: Digital Object Identifier
             
         Returns:
             BibTeX string or None if conversion fails
         """
-        # Clean DOI (remove URL prefix if present)
-        doi = doi.strip()
-        if doi.startswith('https://doi.org/'):
-            doi = doi.replace('https://doi.org/', '')
-        elif doi.startswith('http://doi.org/'):
-            doi = doi.replace('http://doi.org/', '')
-        elif doi.startswith('doi:'):
-            doi = doi.replace('doi:', '')
-        
-        # Request BibTeX from CrossRef content negotiation
-        url = f'https://doi.org/{doi}'
-        headers = {
-            'Accept': 'application/x-bibtex',
-            'User-Agent': 'DOIConverter/1.0 (Citation Management Tool)'
-        }
-        
-        try:
-            response = self.session.get(url, headers=headers, timeout=15)
-            
-            if response.status_code == 200:
-                bibtex = response.text.strip()
-                # CrossRef sometimes returns entries with @data type, convert to @misc
-                if bibtex.startswith('@data{'):
-                    bibtex = bibtex.replace('@data{', '@misc{', 1)
-                return bibtex
-            elif response.status_code == 404:
-                print(f'Error: DOI not found: {doi}', file=sys.stderr)
-                return None
-            else:
-                print(f'Error: Failed to retrieve BibTeX for {doi} (status {response.status_code})', file=sys.stderr)
-                return None
-                
-        except requests.exceptions.Timeout:
-            print(f'Error: Request timeout for DOI: {doi}', file=sys.stderr)
-            return None
-        except requests.exceptions.RequestException as e:
-            print(f'Error: Request failed for {doi}: {e}', file=sys.stderr)
+        csl = self.csl_store.get(doi)
+        if not csl:
+            print(f'Error: DOI not found: {doi.strip()}', file=sys.stderr)
             return None
+        return self.renderer.render(csl, self.style)
     
     def convert_multiple(self, dois: List[str], delay: float = 0.5) -> List[str]:
         """
@@ -80,20 +63,38 @@ class DOIConverter:
         Returns:
             List of BibTeX entries (excludes failed conversions)
         """
-        bibtex_entries = []
+        return [bibtex for _, bibtex in self.iter_convert(dois, delay=delay) if bibtex]
+    
+    def iter_convert(self, dois: List[str], delay: float = 0.5,
+                     chunk_size: int = 500) -> Iterator[Tuple[str, Optional[str]]]:
+        """
+        Convert DOIs to BibTeX in chunks, yielding each outcome as it completes.
+        
+        Each chunk's CSL-JSON records come from the cache or one round of
+        bulk CrossRef requests.
         
-        for i, doi in enumerate(dois):
-            print(f'Converting DOI {i+1}/{len(dois)}: {doi}', file=sys.stderr)
-            bibtex = self.doi_to_bibtex(doi)
+        Args:
+            dois: List of DOIs
+            delay: Delay between chunks (seconds) for rate limiting
+            chunk_size: DOIs fetched per chunk
             
-            if bibtex:
-                bibtex_entries.append(bibtex)
+        Yields:
+            Tuples of (doi, BibTeX string or None)
+        """
+        for start in range(0, len(dois), chunk_size):
+            chunk = dois[start:start + chunk_size]
+            print(f'Converting DOIs {start+1}-{start+len(chunk)}/{len(dois)}', file=sys.stderr)
+            records = self.csl_store.get_many(chunk)
+            
+            for doi in chunk:
+                csl = records.get(normalize_doi(doi))
+                if not csl:
+                    print(f'Error: DOI not found: {doi}', file=sys.stderr)
+                yield doi, self.renderer.render(csl, self.style) if csl else None
             
             # Rate limiting
-            if i < len(dois) - 1:  # Don't delay after last request
+            if start + chunk_size < len(dois):  # Don't delay after last batch
                 time.sleep(delay)
-        
-        return bibtex_entries
 
 
 def main():
@@ -123,7 +124,20 @@ def main():
         '--delay',
         type=float,
         default=0.5,
-        help='Delay between requests in seconds (default: 0.5)'
+        help='Delay between batch requests in seconds (default: 0.5)'
+    )
+    
+    parser.add_argument(
+        '--style',
+        choices=STYLES,
+        default='bibtex',
+        help='Citation style, rendered locally from cached CSL-JSON (default: bibtex)'
+    )
+    
+    parser.add_argument(
+        '--csl-cache',
+        default=DEFAULT_CACHE,
+        help='CSL-JSON cache file'
     )
     
     parser.add_argument(
@@ -133,6 +147,17 @@ def main():
         help='Output format (default: bibtex)'
     )
     
+    parser.add_argument(
+        '--journal',
+        help='Progress journal (default: OUTPUT.journal.jsonl when -o is given)'
+    )
+    
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Skip DOIs already completed in the journal'
+    )
+    
     args = parser.parse_args()
     
     # Collect DOIs from command line and/or file
@@ -157,47 +182,54 @@ def main():
         parser.print_help()
         sys.exit(1)
     
-    # Convert DOIs
-    converter = DOIConverter()
+    journal_path = args.journal or (f'{args.output}.journal.jsonl' if args.output else None)
+    if args.resume and not journal_path:
+        print('Error: --resume needs --journal or --output', file=sys.stderr)
+        sys.exit(1)
     
-    if len(dois) == 1:
-        bibtex = converter.doi_to_bibtex(dois[0])
-        if bibtex:
-            bibtex_entries = [bibtex]
-        else:
-            sys.exit(1)
-    else:
-        bibtex_entries = converter.convert_multiple(dois, delay=args.delay)
+    # Convert DOIs
+    converter = DOIConverter(cache_path=args.csl_cache, style=args.style)
+    journal = BatchJournal(journal_path, resume=args.resume, style=args.style) if journal_path else None
+    completed = journal.completed() if journal else {}
+    if completed:
+        print(f'Resuming: {len(completed)} DOIs already completed', file=sys.stderr)
+    
+    pending = [doi for doi in dict.fromkeys(dois) if doi not in completed]
+    converted = converter.iter_convert(pending, delay=args.delay)
+    
+    # Entries are journaled and written as they complete, in input order
+    writer = EntryWriter(args.output, args.format)
+    
+    try:
+        for doi in dois:
+            if doi not in completed:
+                for done_doi, bibtex in converted:
+                    completed[done_doi] = bibtex
+                    if journal:
+                        journal.record(done_doi, bibtex)
+                    if done_doi == doi:
+                        break
+            if completed.get(doi):
+                writer.write(completed[doi])
+    except Exception as e:
+        print(f'Error writing output: {e}', file=sys.stderr)
+        sys.exit(1)
+    finally:
+        writer.close()
+        if journal:
+            journal.close()
     
-    if not bibtex_entries:
+    if not writer.count:
         print('Error: No successful conversions', file=sys.stderr)
         sys.exit(1)
     
-    # Format output
-    if args.format == 'bibtex':
-        output = '\n\n'.join(bibtex_entries) + '\n'
-    else:  # json
-        output = json.dumps({
-            'count': len(bibtex_entries),
-            'entries': bibtex_entries
-        }, indent=2)
-    
-    # Write output
     if args.output:
-        try:
-            with open(args.output, 'w', encoding='utf-8') as f:
-                f.write(output)
-            print(f'Successfully wrote {len(bibtex_entries)} entries to {args.output}', file=sys.stderr)
-        except Exception as e:
-            print(f'Error writing output file: {e}', file=sys.stderr)
-            sys.exit(1)
-    else:
-        print(output)
+        print(f'Successfully wrote {writer.count} entries to {args.output}', file=sys.stderr)
     
     # Summary
     if len(dois) > 1:
-        success_rate = len(bibtex_entries) / len(dois) * 100
-        print(f'\nConverted {len(bibtex_entries)}/{len(dois)} DOIs ({success_rate:.1f}%)', file=sys.stderr)
+        success_rate = writer.count / len(dois) * 100
+        print(f'\nConverted {writer.count}/{len(dois)} DOIs ({success_rate:.1f}%)', file=sys.stderr)
 
 
 if __name__ == '__main__':
@@ -10,26 +10,41 @@ import requests
 import argparse
 import time
 import re
-import json
 import xml.etree.ElementTree as ET
 from typing import Optional, Dict, List, Tuple
 from urllib.parse import urlparse
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from crossref_bulk import normalize_doi
+from csl_render import CSLStore, CitationRenderer, CSL_TO_BIBTEX_TYPE, BIBTEX_TO_CSL_TYPE, DEFAULT_CACHE, STYLES, csl_year
+from batch_journal import BatchJournal, EntryWriter
 
 class MetadataExtractor:
     """Extract metadata from various sources and generate BibTeX."""
     
-    def __init__(self, email: Optional[str] = None):
+    ARXIV_API_URL = 'http://export.arxiv.org/api/query'
+    ARXIV_NS = {'atom': 'http://www.w3.org/2005/Atom', 'arxiv': 'http://arxiv.org/schemas/atom'}
+    ARXIV_DELAY = 3.0
+    # New-style (2101.00001v2) and old-style (hep-th/9901001v1) identifiers
+    ARXIV_ID_PATTERN = re.compile(r'^(\d{4}\.\d{4,5}|[a-z\-]+(\.[A-Z]{2})?/\d{7})(v\d+)?$')
+    
+    def __init__(self, email: Optional[str] = None, cache_path: str = DEFAULT_CACHE):
         """
         Initialize extractor.
         
         Args:
             email: Email for Entrez API (recommended for PubMed)
+            cache_path: CSL-JSON cache file for DOI metadata
         """
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'MetadataExtractor/1.0 (Citation Management Tool)'
         })
         self.email = email or os.getenv('NCBI_EMAIL', '')
+        self._last_arxiv_request = 0.0
+        self.csl_store = CSLStore(cache_path, session=self.session)
+        self.renderer = CitationRenderer()
     
     def identify_type(self, identifier: str) -> Tuple[str, str]:
         """
@@ -84,7 +99,7 @@ class MetadataExtractor:
         
         # arXiv URLs
         if 'arxiv.org' in parsed.netloc:
-            arxiv_id = re.search(r'/abs/(\d{4}\.\d{4,5})', parsed.path)
+            arxiv_id = re.search(r'/abs/(\d{4}\.\d{4,5}(?:v\d+)?)', parsed.path)
             if arxiv_id:
                 return ('arxiv', arxiv_id.group(1))
         
@@ -105,38 +120,58 @@ class MetadataExtractor:
         Returns:
             Metadata dictionary or None
         """
-        url = f'https://api.crossref.org/works/{doi}'
+        return self.extract_from_doi_batch([doi]).get(doi)
+    
+    def extract_from_doi_batch(self, dois: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Extract metadata for many DOIs from cached CSL-JSON records.
         
-        try:
-            response = self.session.get(url, timeout=15)
+        Uncached DOIs are fetched with CrossRef bulk filter requests (and
+        doi.org content negotiation for non-CrossRef DOIs), then cached.
+        
+        Args:
+            dois: List of Digital Object Identifiers
             
-            if response.status_code == 200:
-                data = response.json()
-                message = data.get('message', {})
-                
-                metadata = {
-                    'type': 'doi',
-                    'entry_type': self._crossref_type_to_bibtex(message.get('type')),
-                    'doi': doi,
-                    'title': message.get('title', [''])[0],
-                    'authors': self._format_authors_crossref(message.get('author', [])),
-                    'year': self._extract_year_crossref(message),
-                    'journal': message.get('container-title', [''])[0] if message.get('container-title') else '',
-                    'volume': str(message.get('volume', '')) if message.get('volume') else '',
-                    'issue': str(message.get('issue', '')) if message.get('issue') else '',
-                    'pages': message.get('page', ''),
-                    'publisher': message.get('publisher', ''),
-                    'url': f'https://doi.org/{doi}'
-                }
-                
-                return metadata
+        Returns:
+            Dictionary mapping each DOI (as given) to metadata or None
+        """
+        records = self.csl_store.get_many(dois)
+        
+        results = {}
+        for doi in dois:
+            csl = records.get(normalize_doi(doi))
+            if csl:
+                results[doi] = self._metadata_from_csl(doi, csl)
             else:
-                print(f'Error: CrossRef API returned status {response.status_code} for DOI: {doi}', file=sys.stderr)
-                return None
-                
-        except Exception as e:
-            print(f'Error extracting metadata from DOI {doi}: {e}', file=sys.stderr)
-            return None
+                print(f'Error: No metadata found for DOI: {doi}', file=sys.stderr)
+                results[doi] = None
+        
+        return results
+    
+    def _metadata_from_csl(self, doi: str, csl: Dict) -> Dict:
+        """Build a metadata dictionary from a CSL-JSON record."""
+        authors = []
+        for author in csl.get('author', []):
+            if author.get('family'):
+                given = author.get('given', '')
+                authors.append(f'{author["family"]}, {given}' if given else author['family'])
+            elif author.get('literal'):
+                authors.append(author['literal'])
+        
+        return {
+            'type': 'doi',
+            'entry_type': CSL_TO_BIBTEX_TYPE.get(csl.get('type'), 'misc'),
+            'doi': doi,
+            'title': csl.get('title', ''),
+            'authors': ' and '.join(authors),
+            'year': csl_year(csl),
+            'journal': csl.get('container-title', ''),
+            'volume': str(csl.get('volume', '')),
+            'issue': str(csl.get('issue', '')),
+            'pages': csl.get('page', ''),
+            'publisher': csl.get('publisher', ''),
+            'url': f'https://doi.org/{doi}'
+        }
     
     def extract_from_pmid(self, pmid: str) -> Optional[Dict]:
         """
@@ -149,19 +184,7 @@ class MetadataExtractor:
             Metadata dictionary or None
         """
         url = f'https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi'
-        params = {
-            'db': 'pubmed',
-            'id': pmid,
-            'retmode': 'xml',
-            'rettype': 'abstract'
-        }
-        
-        if self.email:
-            params['email'] = self.email
-        
-        api_key = os.getenv('NCBI_API_KEY')
-        if api_key:
-            params['api_key'] = api_key
+        params = self._efetch_params(pmid)
         
         try:
             response = self.session.get(url, params=params, timeout=15)
@@ -174,34 +197,7 @@ class MetadataExtractor:
                     print(f'Error: No article found for PMID: {pmid}', file=sys.stderr)
                     return None
                 
-                # Extract metadata from XML
-                medline_citation = article.find('.//MedlineCitation')
-                article_elem = medline_citation.find('.//Article')
-                journal = article_elem.find('.//Journal')
-                
-                # Get DOI if available
-                doi = None
-                article_ids = article.findall('.//ArticleId')
-                for article_id in article_ids:
-                    if article_id.get('IdType') == 'doi':
-                        doi = article_id.text
-                        break
-                
-                metadata = {
-                    'type': 'pmid',
-                    'entry_type': 'article',
-                    'pmid': pmid,
-                    'title': article_elem.findtext('.//ArticleTitle', ''),
-                    'authors': self._format_authors_pubmed(article_elem.findall('.//Author')),
-                    'year': self._extract_year_pubmed(article_elem),
-                    'journal': journal.findtext('.//Title', ''),
-                    'volume': journal.findtext('.//JournalIssue/Volume', ''),
-                    'issue': journal.findtext('.//JournalIssue/Issue', ''),
-                    'pages': article_elem.findtext('.//Pagination/MedlinePgn', ''),
-                    'doi': doi
-                }
-                
-                return metadata
+                return self._metadata_from_pubmed(pmid, article)
             else:
                 print(f'Error: PubMed API returned status {response.status_code} for PMID: {pmid}', file=sys.stderr)
                 return None
@@ -210,6 +206,98 @@ class MetadataExtractor:
             print(f'Error extracting metadata from PMID {pmid}: {e}', file=sys.stderr)
             return None
     
+    def extract_from_pmid_batch(self, pmids: List[str], batch_size: int = 200) -> Dict[str, Optional[Dict]]:
+        """
+        Extract metadata for many PMIDs with one EFetch request per batch.
+        
+        Args:
+            pmids: List of PubMed IDs
+            batch_size: PMIDs per EFetch request
+            
+        Returns:
+            Dictionary mapping each PMID to metadata or None
+        """
+        url = 'https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi'
+        # NCBI allows 3 requests/second without an API key, 10 with one
+        delay = 0.1 if os.getenv('NCBI_API_KEY') else 0.34
+        results = {pmid: None for pmid in pmids}
+        unique = list(results)
+        
+        for i in range(0, len(unique), batch_size):
+            batch = unique[i:i+batch_size]
+            print(f'PubMed EFetch: {len(batch)} PMIDs', file=sys.stderr)
+            
+            try:
+                # POST keeps long ID lists out of the URL
+                response = self.session.post(url, data=self._efetch_params(','.join(batch)), timeout=60)
+                
+                if response.status_code == 200:
+                    root = ET.fromstring(response.content)
+                    for article in root.iter('PubmedArticle'):
+                        pmid = article.findtext('.//MedlineCitation/PMID', '')
+                        if pmid in results:
+                            results[pmid] = self._metadata_from_pubmed(pmid, article)
+                else:
+                    print(f'Error: PubMed API returned status {response.status_code} for batch', file=sys.stderr)
+                    
+            except Exception as e:
+                print(f'Error extracting metadata from PubMed batch: {e}', file=sys.stderr)
+            
+            if i + batch_size < len(unique):
+                time.sleep(delay)
+        
+        for pmid, metadata in results.items():
+            if metadata is None:
+                print(f'Error: No article found for PMID: {pmid}', file=sys.stderr)
+        
+        return results
+    
+    def _efetch_params(self, ids: str) -> Dict:
+        """Build EFetch parameters for one or more comma-separated PMIDs."""
+        params = {
+            'db': 'pubmed',
+            'id': ids,
+            'retmode': 'xml',
+            'rettype': 'abstract'
+        }
+        
+        if self.email:
+            params['email'] = self.email
+        
+        api_key = os.getenv('NCBI_API_KEY')
+        if api_key:
+            params['api_key'] = api_key
+        
+        return params
+    
+    def _metadata_from_pubmed(self, pmid: str, article: ET.Element) -> Dict:
+        """Build a metadata dictionary from a PubmedArticle element."""
+        medline_citation = article.find('.//MedlineCitation')
+        article_elem = medline_citation.find('.//Article')
+        journal = article_elem.find('.//Journal')
+        
+        # Get DOI if available
+        doi = None
+        article_ids = article.findall('.//ArticleId')
+        for article_id in article_ids:
+            if article_id.get('IdType') == 'doi':
+                doi = article_id.text
+                break
+        
+        return {
+            'type': 'pmid',
+            'entry_type': 'article',
+            'pmid': pmid,
+            'title': article_elem.findtext('.//ArticleTitle', ''),
+            'authors': self._format_authors_pubmed(article_elem.findall('.//Author')),
+            'year': self._extract_year_pubmed(article_elem),
+            'journal': journal.findtext('.//Title', ''),
+            'volume': journal.findtext('.//JournalIssue/Volume', ''),
+            'issue': journal.findtext('.//JournalIssue/Issue', ''),
+            'pages': article_elem.findtext('.//Pagination/MedlinePgn', ''),
+            'doi': doi
+        }
+    
     def extract_from_arxiv(self, arxiv_id: str) -> Optional[Dict]:
         """
         Extract metadata from arXiv ID using arXiv API.
@@ -220,65 +308,141 @@ class MetadataExtractor:
         Returns:
             Metadata dictionary or None
         """
-        url = 'http://export.arxiv.org/api/query'
-        params = {
-            'id_list': arxiv_id,
-            'max_results': 1
-        }
+        return self.extract_from_arxiv_batch([arxiv_id]).get(arxiv_id)
+    
+    def extract_from_arxiv_batch(self, arxiv_ids: List[str], batch_size: int = 400,
+                                 page_size: int = 100) -> Dict[str, Optional[Dict]]:
+        """
+        Extract metadata for many arXiv IDs with paged id_list queries.
         
-        try:
-            response = self.session.get(url, params=params, timeout=15)
+        Each request carries up to `batch_size` IDs and is paged with
+        start/max_results. The Atom feed is stream-parsed entry by entry.
+        Unversioned IDs resolve to the latest version; versioned IDs
+        (2101.00001v2) resolve to that exact version.
+        
+        Args:
+            arxiv_ids: List of arXiv identifiers
+            batch_size: IDs per id_list query
+            page_size: Entries per result page
             
-            if response.status_code == 200:
-                # Parse Atom XML
-                root = ET.fromstring(response.content)
-                ns = {'atom': 'http://www.w3.org/2005/Atom', 'arxiv': 'http://arxiv.org/schemas/atom'}
-                
-                entry = root.find('atom:entry', ns)
-                if entry is None:
-                    print(f'Error: No entry found for arXiv ID: {arxiv_id}', file=sys.stderr)
-                    return None
-                
-                # Extract DOI if published
-                doi_elem = entry.find('arxiv:doi', ns)
-                doi = doi_elem.text if doi_elem is not None else None
-                
-                # Extract journal reference if published
-                journal_ref_elem = entry.find('arxiv:journal_ref', ns)
-                journal_ref = journal_ref_elem.text if journal_ref_elem is not None else None
-                
-                # Get publication date
-                published = entry.findtext('atom:published', '', ns)
-                year = published[:4] if published else ''
-                
-                # Get authors
-                authors = []
-                for author in entry.findall('atom:author', ns):
-                    name = author.findtext('atom:name', '', ns)
-                    if name:
-                        authors.append(name)
-                
-                metadata = {
-                    'type': 'arxiv',
-                    'entry_type': 'misc' if not doi else 'article',
-                    'arxiv_id': arxiv_id,
-                    'title': entry.findtext('atom:title', '', ns).strip().replace('\n', ' '),
-                    'authors': ' and '.join(authors),
-                    'year': year,
-                    'doi': doi,
-                    'journal_ref': journal_ref,
-                    'abstract': entry.findtext('atom:summary', '', ns).strip().replace('\n', ' '),
-                    'url': f'https://arxiv.org/abs/{arxiv_id}'
-                }
-                
-                return metadata
+        Returns:
+            Dictionary mapping each arXiv ID to metadata or None
+        """
+        results = {arxiv_id: None for arxiv_id in arxiv_ids}
+        
+        # A single malformed ID makes arXiv reject the whole query
+        valid = []
+        for arxiv_id in results:
+            if self.ARXIV_ID_PATTERN.match(arxiv_id):
+                valid.append(arxiv_id)
             else:
-                print(f'Error: arXiv API returned status {response.status_code} for ID: {arxiv_id}', file=sys.stderr)
-                return None
+                print(f'Error: Invalid arXiv ID: {arxiv_id}', file=sys.stderr)
+        
+        for i in range(0, len(valid), batch_size):
+            batch = valid[i:i+batch_size]
+            print(f'arXiv id_list query: {len(batch)} IDs', file=sys.stderr)
+            
+            start = 0
+            while start < len(batch):
+                try:
+                    count = 0
+                    for entry_id, metadata in self._fetch_arxiv_page(batch, start, page_size):
+                        count += 1
+                        base_id = re.sub(r'v\d+$', '', entry_id)
+                        for candidate in (entry_id, base_id):
+                            if candidate in results and results[candidate] is None:
+                                metadata = dict(metadata, arxiv_id=candidate,
+                                                url=f'https://arxiv.org/abs/{candidate}')
+                                results[candidate] = metadata
+                except Exception as e:
+                    print(f'Error extracting metadata from arXiv batch: {e}', file=sys.stderr)
+                    break
                 
-        except Exception as e:
-            print(f'Error extracting metadata from arXiv {arxiv_id}: {e}', file=sys.stderr)
-            return None
+                if count < page_size:
+                    break
+                start += page_size
+        
+        for arxiv_id, metadata in results.items():
+            if metadata is None:
+                print(f'Error: No entry found for arXiv ID: {arxiv_id}', file=sys.stderr)
+        
+        return results
+    
+    def _fetch_arxiv_page(self, arxiv_ids: List[str], start: int, max_results: int):
+        """
+        Fetch one page of an id_list query and stream-parse the Atom feed.
+        
+        Yields:
+            Tuples of (versioned arXiv ID, metadata dictionary)
+        """
+        # arXiv asks for no more than one request every 3 seconds
+        elapsed = time.time() - self._last_arxiv_request
+        if elapsed < self.ARXIV_DELAY:
+            time.sleep(self.ARXIV_DELAY - elapsed)
+        self._last_arxiv_request = time.time()
+        
+        # POST keeps long ID lists out of the URL
+        data = {
+            'id_list': ','.join(arxiv_ids),
+            'start': start,
+            'max_results': max_results
+        }
+        response = self.session.post(self.ARXIV_API_URL, data=data, timeout=60, stream=True)
+        
+        try:
+            if response.status_code != 200:
+                raise RuntimeError(f'arXiv API returned status {response.status_code}')
+            
+            response.raw.decode_content = True
+            entry_tag = f'{{{self.ARXIV_NS["atom"]}}}entry'
+            
+            for _, elem in ET.iterparse(response.raw, events=('end',)):
+                if elem.tag != entry_tag:
+                    continue
+                # Entry IDs look like http://arxiv.org/abs/2101.00001v2; errors use /api/errors
+                entry_id = elem.findtext('atom:id', '', self.ARXIV_NS)
+                if '/abs/' in entry_id:
+                    entry_id = entry_id.split('/abs/')[-1]
+                    yield entry_id, self._metadata_from_arxiv(entry_id, elem)
+                elem.clear()
+        finally:
+            response.close()
+    
+    def _metadata_from_arxiv(self, arxiv_id: str, entry: ET.Element) -> Dict:
+        """Build a metadata dictionary from an arXiv Atom entry element."""
+        ns = self.ARXIV_NS
+        
+        # Extract DOI if published
+        doi_elem = entry.find('arxiv:doi', ns)
+        doi = doi_elem.text if doi_elem is not None else None
+        
+        # Extract journal reference if published
+        journal_ref_elem = entry.find('arxiv:journal_ref', ns)
+        journal_ref = journal_ref_elem.text if journal_ref_elem is not None else None
+        
+        # Get publication date
+        published = entry.findtext('atom:published', '', ns)
+        year = published[:4] if published else ''
+        
+        # Get authors
+        authors = []
+        for author in entry.findall('atom:author', ns):
+            name = author.findtext('atom:name', '', ns)
+            if name:
+                authors.append(name)
+        
+        return {
+            'type': 'arxiv',
+            'entry_type': 'misc' if not doi else 'article',
+            'arxiv_id': arxiv_id,
+            'title': entry.findtext('atom:title', '', ns).strip().replace('\n', ' '),
+            'authors': ' and '.join(authors),
+            'year': year,
+            'doi': doi,
+            'journal_ref': journal_ref,
+            'abstract': entry.findtext('atom:summary', '', ns).strip().replace('\n', ' '),
+            'url': f'https://arxiv.org/abs/{arxiv_id}'
+        }
     
     def metadata_to_bibtex(self, metadata: Dict, citation_key: Optional[str] = None) -> str:
         """
@@ -291,89 +455,63 @@ class MetadataExtractor:
         Returns:
             BibTeX string
         """
-        if not citation_key:
-            citation_key = self._generate_citation_key(metadata)
-        
-        entry_type = metadata.get('entry_type', 'misc')
-        
-        # Build BibTeX entry
-        lines = [f'@{entry_type}{{{citation_key},']
-        
-        # Add fields
-        if metadata.get('authors'):
-            lines.append(f'  author  = {{{metadata["authors"]}}},')
-        
-        if metadata.get('title'):
-            # Protect capitalization
-            title = self._protect_title(metadata['title'])
-            lines.append(f'  title   = {{{title}}},')
-        
-        if entry_type == 'article' and metadata.get('journal'):
-            lines.append(f'  journal = {{{metadata["journal"]}}},')
-        elif entry_type == 'misc' and metadata.get('type') == 'arxiv':
-            lines.append(f'  howpublished = {{arXiv}},')
-        
-        if metadata.get('year'):
-            lines.append(f'  year    = {{{metadata["year"]}}},')
-        
-        if metadata.get('volume'):
-            lines.append(f'  volume  = {{{metadata["volume"]}}},')
-        
-        if metadata.get('issue'):
-            lines.append(f'  number  = {{{metadata["issue"]}}},')
-        
-        if metadata.get('pages'):
-            pages = metadata['pages'].replace('-', '--')  # En-dash
-            lines.append(f'  pages   = {{{pages}}},')
-        
-        if metadata.get('doi'):
-            lines.append(f'  doi     = {{{metadata["doi"]}}},')
-        elif metadata.get('url'):
-            lines.append(f'  url     = {{{metadata["url"]}}},')
-        
-        if metadata.get('pmid'):
-            lines.append(f'  note    = {{PMID: {metadata["pmid"]}}},')
-        
-        if metadata.get('type') == 'arxiv' and not metadata.get('doi'):
-            lines.append(f'  note    = {{Preprint}},')
-        
-        # Remove trailing comma from last field
-        if lines[-1].endswith(','):
-            lines[-1] = lines[-1][:-1]
-        
-        lines.append('}')
-        
-        return '\n'.join(lines)
+        return self.renderer.render(self.metadata_to_csl(metadata), 'bibtex', citation_key)
     
-    def _crossref_type_to_bibtex(self, crossref_type: str) -> str:
-        """Map CrossRef type to BibTeX entry type."""
-        type_map = {
-            'journal-article': 'article',
-            'book': 'book',
-            'book-chapter': 'incollection',
-            'proceedings-article': 'inproceedings',
-            'posted-content': 'misc',
-            'dataset': 'misc',
-            'report': 'techreport'
-        }
-        return type_map.get(crossref_type, 'misc')
+    def metadata_to_citation(self, metadata: Dict, style: str = 'bibtex') -> str:
+        """
+        Render metadata in a citation style (bibtex, apa, nature, ieee, ris).
+        
+        Args:
+            metadata: Metadata dictionary
+            style: Citation style
+            
+        Returns:
+            Formatted citation string
+        """
+        return self.renderer.render(self.metadata_to_csl(metadata), style)
     
-    def _format_authors_crossref(self, authors: List[Dict]) -> str:
-        """Format author list from CrossRef data."""
-        if not authors:
-            return ''
+    def metadata_to_csl(self, metadata: Dict) -> Dict:
+        """
+        Convert a metadata dictionary to a CSL-JSON record.
         
-        formatted = []
-        for author in authors:
-            given = author.get('given', '')
-            family = author.get('family', '')
-            if family:
-                if given:
-                    formatted.append(f'{family}, {given}')
-                else:
-                    formatted.append(family)
+        Args:
+            metadata: Metadata dictionary
+            
+        Returns:
+            CSL-JSON dictionary
+        """
+        authors = []
+        for name in metadata.get('authors', '').split(' and '):
+            name = name.strip()
+            if ',' in name:
+                family, given = name.split(',', 1)
+                authors.append({'family': family.strip(), 'given': given.strip()})
+            elif name:
+                authors.append({'literal': name})
+        
+        is_arxiv = metadata.get('type') == 'arxiv'
+        entry_type = metadata.get('entry_type', 'misc')
+        csl_type = BIBTEX_TO_CSL_TYPE.get(entry_type, 'article' if is_arxiv else 'document')
+        
+        csl = {
+            'type': csl_type,
+            'title': metadata.get('title', ''),
+            'author': authors,
+            'container-title': metadata.get('journal', ''),
+            'volume': metadata.get('volume', ''),
+            'issue': metadata.get('issue', ''),
+            'page': metadata.get('pages', ''),
+            'publisher': metadata.get('publisher', ''),
+            'DOI': metadata.get('doi') or '',
+            'URL': metadata.get('url', ''),
+            'PMID': metadata.get('pmid', ''),
+            'archive': 'arXiv' if is_arxiv else ''
+        }
+        year = metadata.get('year', '').strip()
+        if year.isdigit():
+            csl['issued'] = {'date-parts': [[int(year)]]}
         
-        return ' and '.join(formatted)
+        return {k: v for k, v in csl.items() if v}
     
     def _format_authors_pubmed(self, authors: List) -> str:
         """Format author list from PubMed XML."""
@@ -389,17 +527,6 @@ class MetadataExtractor:
         
         return ' and '.join(formatted)
     
-    def _extract_year_crossref(self, message: Dict) -> str:
-        """Extract year from CrossRef message."""
-        # Try published-print first, then published-online
-        date_parts = message.get('published-print', {}).get('date-parts', [[]])
-        if not date_parts or not date_parts[0]:
-            date_parts = message.get('published-online', {}).get('date-parts', [[]])
-        
-        if date_parts and date_parts[0]:
-            return str(date_parts[0][0])
-        return ''
-    
     def _extract_year_pubmed(self, article: ET.Element) -> str:
         """Extract year from PubMed XML."""
         year = article.findtext('.//Journal/JournalIssue/PubDate/Year', '')
@@ -411,56 +538,16 @@ class MetadataExtractor:
                     year = year_match.group()
         return year
     
-    def _generate_citation_key(self, metadata: Dict) -> str:
-        """Generate a citation key from metadata."""
-        # Get first author last name
-        authors = metadata.get('authors', '')
-        if authors:
-            first_author = authors.split(' and ')[0]
-            if ',' in first_author:
-                last_name = first_author.split(',')[0].strip()
-            else:
-                last_name = first_author.split()[-1] if first_author else 'Unknown'
-        else:
-            last_name = 'Unknown'
-        
-        # Get year
-        year = metadata.get('year', '').strip()
-        if not year:
-            year = 'XXXX'
-        
-        # Clean last name (remove special characters)
-        last_name = re.sub(r'[^a-zA-Z]', '', last_name)
-        
-        # Get keyword from title
-        title = metadata.get('title', '')
-        words = re.findall(r'\b[a-zA-Z]{4,}\b', title)
-        keyword = words[0].lower() if words else 'paper'
-        
-        return f'{last_name}{year}{keyword}'
-    
-    def _protect_title(self, title: str) -> str:
-        """Protect capitalization in title for BibTeX."""
-        # Protect common acronyms and proper nouns
-        protected_words = [
-            'DNA', 'RNA', 'CRISPR', 'COVID', 'HIV', 'AIDS', 'AlphaFold',
-            'Python', 'AI', 'ML', 'GPU', 'CPU', 'USA', 'UK', 'EU'
-        ]
-        
-        for word in protected_words:
-            title = re.sub(rf'\b{word}\b', f'{{{word}}}', title, flags=re.IGNORECASE)
-        
-        return title
-    
-    def extract(self, identifier: str) -> Optional[str]:
+    def extract(self, identifier: str, style: str = 'bibtex') -> Optional[str]:
         """
         Extract metadata and return BibTeX.
         
         Args:
             identifier: DOI, PMID, arXiv ID, or URL
+            style: Citation style (bibtex, apa, nature, ieee, ris)
             
         Returns:
-            BibTeX string or None
+            BibTeX (or styled citation) string or None
         """
         id_type, clean_id = self.identify_type(identifier)
         
@@ -479,10 +566,62 @@ class MetadataExtractor:
             return None
         
         if metadata:
-            return self.metadata_to_bibtex(metadata)
+            return self.metadata_to_citation(metadata, style)
         else:
             return None
-
+    
+    def extract_batch(self, identifiers: List[str], style: str = 'bibtex') -> List[Optional[str]]:
+        """
+        Extract metadata for many identifiers, grouped by type.
+        
+        Identifiers are classified first, then fetched with one request per
+        batch: bulk CrossRef for DOIs, EFetch for PMIDs and id_list queries
+        for arXiv IDs. The groups are fetched concurrently since they hit
+        different services; DOIs are resolved on the calling thread, which
+        owns the CSL cache connection. Other identifiers fall back to `extract`.
+        
+        Args:
+            identifiers: List of DOIs, PMIDs, arXiv IDs, or URLs
+            style: Citation style (bibtex, apa, nature, ieee, ris)
+            
+        Returns:
+            BibTeX (or styled citation) strings, None for failures, in the original order
+        """
+        classified = [self.identify_type(identifier) for identifier in identifiers]
+        
+        groups = defaultdict(list)
+        for id_type, clean_id in classified:
+            groups[id_type].append(clean_id)
+        
+        for id_type, ids in groups.items():
+            print(f'Identified {len(ids)} {id_type} identifier(s)', file=sys.stderr)
+        
+        fetchers = {
+            'pmid': self.extract_from_pmid_batch,
+            'arxiv': self.extract_from_arxiv_batch
+        }
+        
+        metadata_by_type = {}
+        with ThreadPoolExecutor(max_workers=len(fetchers)) as executor:
+            futures = {
+                id_type: executor.submit(fetch, groups[id_type])
+                for id_type, fetch in fetchers.items() if groups.get(id_type)
+            }
+            # DOIs go through the SQLite CSL cache, whose connection belongs to this thread
+            if groups.get('doi'):
+                metadata_by_type['doi'] = self.extract_from_doi_batch(groups['doi'])
+            for id_type, future in futures.items():
+                metadata_by_type[id_type] = future.result()
+        
+        bibtex_entries = []
+        for identifier, (id_type, clean_id) in zip(identifiers, classified):
+            if id_type in metadata_by_type:
+                metadata = metadata_by_type[id_type].get(clean_id)
+                bibtex_entries.append(self.metadata_to_citation(metadata, style) if metadata else None)
+            else:
+                bibtex_entries.append(self.extract(identifier, style))
+        
+        return bibtex_entries
 
 def main():
     """Command-line interface."""
@@ -499,6 +638,11 @@ def main():
     parser.add_argument('-o', '--output', help='Output file for BibTeX (default: stdout)')
     parser.add_argument('--format', choices=['bibtex', 'json'], default='bibtex', help='Output format')
     parser.add_argument('--email', help='Email for NCBI E-utilities (recommended)')
+    parser.add_argument('--style', choices=STYLES, default='bibtex', help='Citation style, rendered locally (default: bibtex)')
+    parser.add_argument('--csl-cache', default=DEFAULT_CACHE, help='CSL-JSON cache file for DOI metadata')
+    parser.add_argument('--journal', help='Progress journal (default: OUTPUT.journal.jsonl when -o is given)')
+    parser.add_argument('--resume', action='store_true', help='Skip identifiers already completed in the journal')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Identifiers fetched per batch (default: 1000)')
     
     args = parser.parse_args()
     
@@ -526,42 +670,56 @@ def main():
         parser.print_help()
         sys.exit(1)
     
+    journal_path = args.journal or (f'{args.output}.journal.jsonl' if args.output else None)
+    if args.resume and not journal_path:
+        print('Error: --resume needs --journal or --output', file=sys.stderr)
+        sys.exit(1)
+    
     # Extract metadata
-    extractor = MetadataExtractor(email=args.email)
-    bibtex_entries = []
+    extractor = MetadataExtractor(email=args.email, cache_path=args.csl_cache)
+    journal = BatchJournal(journal_path, resume=args.resume, style=args.style) if journal_path else None
+    completed = journal.completed() if journal else {}
+    if completed:
+        print(f'Resuming: {len(completed)} identifiers already completed', file=sys.stderr)
     
-    for i, identifier in enumerate(identifiers):
-        print(f'\nProcessing {i+1}/{len(identifiers)}...', file=sys.stderr)
-        bibtex = extractor.extract(identifier)
-        if bibtex:
-            bibtex_entries.append(bibtex)
-        
-        # Rate limiting
-        if i < len(identifiers) - 1:
-            time.sleep(0.5)
+    # Entries are journaled and written as each chunk completes
+    writer = EntryWriter(args.output, args.format)
+    
+    for start in range(0, len(identifiers), args.chunk_size):
+        chunk = identifiers[start:start + args.chunk_size]
+        pending = [identifier for identifier in chunk if identifier not in completed]
+        
+        if not pending:
+            fetched = []
+        elif len(identifiers) == 1:
+            fetched = [extractor.extract(pending[0], args.style)]
+        else:
+            print(f'\nProcessing {start+1}-{start+len(chunk)}/{len(identifiers)}...', file=sys.stderr)
+            # Batch mode: classify, group by type and fetch each group in bulk
+            fetched = extractor.extract_batch(pending, args.style)
+        
+        results = dict(zip(pending, fetched))
+        if journal:
+            for identifier, bibtex in results.items():
+                journal.record(identifier, bibtex)
+        
+        for identifier in chunk:
+            bibtex = completed.get(identifier) or results.get(identifier)
+            if bibtex:
+                writer.write(bibtex)
     
-    if not bibtex_entries:
+    writer.close()
+    if journal:
+        journal.close()
+    
+    if not writer.count:
         print('Error: No successful extractions', file=sys.stderr)
         sys.exit(1)
     
-    # Format output
-    if args.format == 'bibtex':
-        output = '\n\n'.join(bibtex_entries) + '\n'
-    else:  # json
-        output = json.dumps({
-            'count': len(bibtex_entries),
-            'entries': bibtex_entries
-        }, indent=2)
-    
-    # Write output
     if args.output:
-        with open(args.output, 'w', encoding='utf-8') as f:
-            f.write(output)
-        print(f'\nSuccessfully wrote {len(bibtex_entries)} entries to {args.output}', file=sys.stderr)
-    else:
-        print(output)
+        print(f'\nSuccessfully wrote {writer.count} entries to {args.output}', file=sys.stderr)
     
-    print(f'\nExtracted {len(bibtex_entries)}/{len(identifiers)} entries', file=sys.stderr)
+    print(f'\nExtracted {writer.count}/{len(identifiers)} entries', file=sys.stderr)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+File Watcher
+Block until watched files change, using Linux inotify through ctypes and
+falling back to polling size and mtime elsewhere.
+"""
+
+import os
+import sys
+import time
+import ctypes
+import ctypes.util
+import select
+import struct
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+
+# inotify event masks (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+# Editors save in place or write a temporary file and rename it over the
+# original, so the parent directories are watched rather than the files
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+EVENT_HEADER = struct.Struct('iIII')
+
+
+def _load_inotify() -> Optional[ctypes.CDLL]:
+    """Get libc with the inotify functions, or None where unavailable."""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class FileWatcher:
+    """Wait for changes to a fixed set of files."""
+
+    def __init__(self, paths: Iterable[str], interval: float = 1.0, debounce: float = 0.2,
+                 polling: bool = False):
+        """
+        Start watching files.
+
+        Args:
+            paths: Files to watch (they may not exist yet)
+            interval: Seconds between checks when polling
+            debounce: Quiet period that ends a burst of events, so one save
+                is reported once
+            polling: Poll even where inotify is available
+        """
+        self.paths = {os.path.abspath(path) for path in paths}
+        self.interval = interval
+        self.debounce = debounce
+        self._signatures = {path: self._signature(path) for path in self.paths}
+        self._fd = -1
+        self._watches: Dict[int, str] = {}
+
+        libc = None if polling else _load_inotify()
+        if libc is not None:
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd >= 0:
+                self._fd = fd
+                for directory in {os.path.dirname(path) for path in self.paths}:
+                    wd = libc.inotify_add_watch(fd, os.fsencode(directory), WATCH_MASK)
+                    if wd < 0:
+                        # e.g. the watch limit is reached: poll instead
+                        self.close()
+                        break
+                    self._watches[wd] = directory
+
+        self.backend = 'inotify' if self._fd >= 0 else 'polling'
+
+    def __enter__(self) -> 'FileWatcher':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the inotify descriptor."""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+            self._watches = {}
+
+    @staticmethod
+    def _signature(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _changed(self) -> Set[str]:
+        """Compare size and mtime with the last check."""
+        changed = set()
+        for path in self.paths:
+            signature = self._signature(path)
+            if signature != self._signatures[path]:
+                self._signatures[path] = signature
+                changed.add(path)
+        return changed
+
+    def _read_events(self, timeout: Optional[float]) -> Set[str]:
+        """Read pending inotify events, waiting up to timeout seconds for the first."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        touched = set()
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                path = os.path.join(self._watches.get(wd, ''), os.fsdecode(name))
+                if path in self.paths:
+                    touched.add(path)
+        return touched
+
+    def wait(self) -> Set[str]:
+        """
+        Block until at least one watched file changes.
+
+        Returns:
+            Paths whose size or mtime changed, or that were created or deleted
+        """
+        while True:
+            changed = set()
+            if self._fd < 0:
+                time.sleep(self.interval)
+                changed = self._changed()
+                if not changed:
+                    continue
+                time.sleep(self.debounce)
+            elif not self._read_events(None):
+                continue
+            else:
+                # Let the burst of events from one save settle
+                while self._read_events(self.debounce):
+                    pass
+
+            changed |= self._changed()
+            if changed:
+                return changed
+
+
+def watch_files(paths: Iterable[str], callback: Callable[[Set[str]], None],
+                interval: float = 1.0) -> None:
+    """
+    Run a callback on startup and after every change until interrupted.
+
+    Args:
+        paths: Files to watch
+        callback: Called with the set of changed absolute paths (all paths
+            on the first call)
+        interval: Seconds between checks when polling
+    """
+    with FileWatcher(paths, interval=interval) as watcher:
+        callback(set(watcher.paths))
+        print(f'\nWatching {len(watcher.paths)} file(s) for changes ({watcher.backend}); '
+              f'press Ctrl+C to stop', file=sys.stderr)
+        try:
+            while True:
+                changed = watcher.wait()
+                print(f'\nChanged: {", ".join(sorted(os.path.basename(path) for path in changed))}',
+                      file=sys.stderr)
+                callback(changed)
+        except KeyboardInterrupt:
+            print('\nStopped watching', file=sys.stderr)
@@ -4,16 +4,44 @@ BibTeX Formatter and Cleaner
 Format, clean, sort, and deduplicate BibTeX files.
 """
 
+import os
 import sys
 import re
+import json
+import heapq
+import pickle
+import hashlib
 import argparse
-from typing import List, Dict, Tuple
+import tempfile
+from typing import Iterator, List, Dict, Optional, Tuple
 from collections import OrderedDict
 
+from bibtex_index import BibTeXIndex
+from bibtex_cache import DEFAULT_CACHE_DIR, load_bibtex
+from bibtex_tokenizer import iter_bibtex_entries
+from crossref_bulk import normalize_doi
+
+# Output buffer for streamed writes
+WRITE_BUFFER = 1 << 20
+
+# Records per pickle batch in sorted run files
+RUN_BATCH = 2048
+
+# Approximate per-record overhead of a buffered (key, sequence, text) tuple
+RECORD_OVERHEAD = 200
+
 class BibTeXFormatter:
     """Format and clean BibTeX entries."""
     
-    def __init__(self):
+    def __init__(self, cache_dir: Optional[str] = DEFAULT_CACHE_DIR):
+        """
+        Initialize formatter.
+        
+        Args:
+            cache_dir: Parsed-entry cache directory (None to always re-parse)
+        """
+        self.cache_dir = cache_dir
+        
         # Standard field order for readability
         self.field_order = [
             'author', 'editor', 'title', 'booktitle', 'journal',
@@ -32,48 +60,15 @@ class BibTeXFormatter:
             filepath: Path to BibTeX file
             
         Returns:
-            List of entry dictionaries
+            List of entry dictionaries (streamed through the shared tokenizer,
+            which handles nested braces, @string macros and # concatenation;
+            unchanged entries are reused from the parse cache)
         """
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
+            return load_bibtex(filepath, self.cache_dir)
         except Exception as e:
             print(f'Error reading file: {e}', file=sys.stderr)
             return []
-        
-        entries = []
-        
-        # Match BibTeX entries
-        pattern = r'@(\w+)\s*\{\s*([^,\s]+)\s*,(.*?)\n\}'
-        matches = re.finditer(pattern, content, re.DOTALL | re.IGNORECASE)
-        
-        for match in matches:
-            entry_type = match.group(1).lower()
-            citation_key = match.group(2).strip()
-            fields_text = match.group(3)
-            
-            # Parse fields
-            fields = OrderedDict()
-            field_pattern = r'(\w+)\s*=\s*\{([^}]*)\}|(\w+)\s*=\s*"([^"]*)"'
-            field_matches = re.finditer(field_pattern, fields_text)
-            
-            for field_match in field_matches:
-                if field_match.group(1):
-                    field_name = field_match.group(1).lower()
-                    field_value = field_match.group(2)
-                else:
-                    field_name = field_match.group(3).lower()
-                    field_value = field_match.group(4)
-                
-                fields[field_name] = field_value.strip()
-            
-            entries.append({
-                'type': entry_type,
-                'key': citation_key,
-                'fields': fields
-            })
-        
-        return entries
     
     def format_entry(self, entry: Dict) -> str:
         """
@@ -175,28 +170,66 @@ class BibTeXFormatter:
         """
         seen_dois = set()
         seen_keys = set()
-        unique_entries = []
+        return [entry for entry in entries
+                if not self.is_duplicate(entry['key'], entry['fields'].get('doi'), seen_dois, seen_keys)]
+    
+    def is_duplicate(self, key: str, doi: Optional[str], seen_dois: set, seen_keys: set) -> bool:
+        """
+        Check one entry against the entries kept so far, in file order.
         
-        for entry in entries:
-            doi = entry['fields'].get('doi', '').strip()
-            key = entry['key']
-            
-            # Check DOI first (more reliable)
-            if doi:
-                if doi in seen_dois:
-                    print(f'Duplicate DOI found: {doi} (skipping {key})', file=sys.stderr)
-                    continue
-                seen_dois.add(doi)
-            
-            # Check citation key
-            if key in seen_keys:
-                print(f'Duplicate citation key found: {key} (skipping)', file=sys.stderr)
-                continue
-            seen_keys.add(key)
+        DOIs are compared normalized (see crossref_bulk.normalize_doi). Every
+        deduplication path goes through here, so they all keep the same
+        entries.
+        
+        Args:
+            key: Citation key
+            doi: DOI, if any
+            seen_dois: Normalized DOIs seen so far (updated)
+            seen_keys: Keys of the entries kept so far (updated)
             
-            unique_entries.append(entry)
+        Returns:
+            True if the entry should be skipped
+        """
+        doi = normalize_doi(doi) if doi else ''
+        
+        # Check DOI first (more reliable)
+        if doi:
+            if doi in seen_dois:
+                print(f'Duplicate DOI found: {doi} (skipping {key})', file=sys.stderr)
+                return True
+            seen_dois.add(doi)
+        
+        # Check citation key
+        if key in seen_keys:
+            print(f'Duplicate citation key found: {key} (skipping)', file=sys.stderr)
+            return True
+        seen_keys.add(key)
+        return False
+    
+    def sort_key(self, entry: Dict, sort_by: str = 'key') -> str:
+        """
+        Compute the normalized collation key of an entry.
         
-        return unique_entries
+        Args:
+            entry: Entry dictionary
+            sort_by: Field to sort by ('key', 'year', 'author', 'title')
+            
+        Returns:
+            Key string; entries sort by plain string comparison of their keys
+        """
+        if sort_by == 'year':
+            return entry['fields'].get('year', '9999')
+        elif sort_by == 'author':
+            author = entry['fields'].get('author', 'ZZZ')
+            # Get last name of first author
+            if ',' in author:
+                return author.split(',')[0].lower()
+            else:
+                return author.split()[0].lower() if author else 'zzz'
+        elif sort_by == 'title':
+            return entry['fields'].get('title', '').lower()
+        else:
+            return entry['key'].lower()
     
     def sort_entries(self, entries: List[Dict], sort_by: str = 'key', descending: bool = False) -> List[Dict]:
         """
@@ -210,25 +243,9 @@ class BibTeXFormatter:
         Returns:
             Sorted list of entries
         """
-        def get_sort_key(entry: Dict) -> str:
-            if sort_by == 'key':
-                return entry['key'].lower()
-            elif sort_by == 'year':
-                year = entry['fields'].get('year', '9999')
-                return year
-            elif sort_by == 'author':
-                author = entry['fields'].get('author', 'ZZZ')
-                # Get last name of first author
-                if ',' in author:
-                    return author.split(',')[0].lower()
-                else:
-                    return author.split()[0].lower() if author else 'zzz'
-            elif sort_by == 'title':
-                return entry['fields'].get('title', '').lower()
-            else:
-                return entry['key'].lower()
-        
-        return sorted(entries, key=get_sort_key, reverse=descending)
+        keys = [self.sort_key(entry, sort_by) for entry in entries]
+        order = sorted(range(len(entries)), key=keys.__getitem__, reverse=descending)
+        return [entries[i] for i in order]
     
     def format_file(self, filepath: str, output: str = None,
                    deduplicate: bool = False, sort_by: str = None,
@@ -287,6 +304,356 @@ class BibTeXFormatter:
         except Exception as e:
             print(f'Error writing file: {e}', file=sys.stderr)
             sys.exit(1)
+    
+    def entry_hash(self, entry: Dict, fix_issues: bool = True) -> str:
+        """
+        Hash an entry's canonical form together with the formatting settings.
+        
+        Args:
+            entry: Entry dictionary (as parsed, before fixes)
+            fix_issues: Whether common issues are fixed when formatting
+            
+        Returns:
+            Hex digest
+        """
+        canonical = (entry['type'], entry['key'], tuple(entry['fields'].items()),
+                     fix_issues, tuple(self.field_order))
+        return hashlib.blake2b(repr(canonical).encode('utf-8'), digest_size=16).hexdigest()
+    
+    def format_file_incremental(self, filepath: str, output: str = None,
+                                manifest: str = None, deduplicate: bool = False,
+                                sort_by: str = None, descending: bool = False,
+                                fix_issues: bool = True) -> None:
+        """
+        Format a BibTeX file, reformatting only new or changed entries.
+        
+        A manifest maps each entry's canonical hash to the byte range of its
+        formatted text in the output. Entries whose hash is unchanged (and
+        whose formatted bytes are still intact) are copied verbatim from the
+        previous output; only the rest go through format_entry. Every entry
+        is still fixed, so duplicates and sort order match a full run.
+        
+        Args:
+            filepath: Input BibTeX file
+            output: Output file (None for in-place)
+            manifest: Manifest file (default: OUTPUT.manifest.json)
+            deduplicate: Remove duplicates
+            sort_by: Field to sort by
+            descending: Sort in descending order
+            fix_issues: Fix common formatting issues
+        """
+        print(f'Parsing {filepath}...', file=sys.stderr)
+        entries = self.parse_bibtex_file(filepath)
+        
+        if not entries:
+            print('No entries found', file=sys.stderr)
+            return
+        
+        print(f'Found {len(entries)} entries', file=sys.stderr)
+        
+        output_file = output or filepath
+        manifest = manifest or f'{output_file}.manifest.json'
+        
+        try:
+            with open(output_file, 'rb') as f:
+                previous_output = f.read()
+        except FileNotFoundError:
+            previous_output = b''
+        try:
+            with open(manifest, 'r', encoding='utf-8') as f:
+                previous = json.load(f).get('entries', {})
+        except (FileNotFoundError, json.JSONDecodeError):
+            previous = {}
+        
+        # Reuse formatted bytes for unchanged entries; deduplication and
+        # sorting still see the fixed DOI and author fields of every entry
+        prepared = []
+        for entry in entries:
+            digest = self.entry_hash(entry, fix_issues)
+            span = previous.get(digest)
+            formatted = None
+            if span:
+                offset, length, checksum = span
+                chunk = previous_output[offset:offset + length]
+                if hashlib.blake2b(chunk, digest_size=16).hexdigest() == checksum:
+                    formatted = chunk
+            if fix_issues:
+                entry = self.fix_common_issues(entry)
+            prepared.append(dict(entry, canonical_hash=digest, formatted=formatted))
+        entries = prepared
+        
+        # Deduplicate
+        if deduplicate:
+            print('Removing duplicates...', file=sys.stderr)
+            original_count = len(entries)
+            entries = self.deduplicate_entries(entries)
+            removed = original_count - len(entries)
+            if removed > 0:
+                print(f'Removed {removed} duplicate(s)', file=sys.stderr)
+        
+        # Sort
+        if sort_by:
+            print(f'Sorting by {sort_by}...', file=sys.stderr)
+            entries = self.sort_entries(entries, sort_by, descending)
+        
+        reused = sum(1 for entry in entries if entry['formatted'])
+        print(f'Formatting {len(entries) - reused} new or changed entries '
+              f'({reused} unchanged)...', file=sys.stderr)
+        chunks = []
+        spans = {}
+        offset = 0
+        for entry in entries:
+            if chunks:
+                offset += 2
+            chunk = entry['formatted']
+            if chunk is None:
+                chunk = self.format_entry(entry).encode('utf-8')
+                span = [offset, len(chunk), hashlib.blake2b(chunk, digest_size=16).hexdigest()]
+                # Formatting in place turns the output into the next input,
+                # so also key the span by the formatted entry's own hash
+                fields = {name: entry['fields'][name] for name in self.field_order if name in entry['fields']}
+                fields.update(entry['fields'])
+                output_hash = self.entry_hash({'type': entry['type'], 'key': entry['key'], 'fields': fields},
+                                              fix_issues)
+                spans[output_hash] = span
+            else:
+                span = [offset, len(chunk), hashlib.blake2b(chunk, digest_size=16).hexdigest()]
+            spans[entry['canonical_hash']] = span
+            chunks.append(chunk)
+            offset += len(chunk)
+        output_content = b'\n\n'.join(chunks) + b'\n'
+        
+        try:
+            if output_content != previous_output:
+                temp_file = f'{output_file}.tmp'
+                with open(temp_file, 'wb') as f:
+                    f.write(output_content)
+                os.replace(temp_file, output_file)
+                print(f'Successfully wrote {len(entries)} entries to {output_file}', file=sys.stderr)
+            else:
+                print(f'{output_file} is already up to date', file=sys.stderr)
+            
+            if spans != previous:
+                with open(manifest, 'w', encoding='utf-8') as f:
+                    json.dump({'source': os.path.abspath(filepath), 'entries': spans}, f)
+        except Exception as e:
+            print(f'Error writing file: {e}', file=sys.stderr)
+            sys.exit(1)
+    
+    def format_file_indexed(self, filepath: str, output: str = None,
+                            deduplicate: bool = False, sort_by: str = None,
+                            descending: bool = False, fix_issues: bool = True) -> None:
+        """
+        Format a large BibTeX file through a memory-mapped index.
+        
+        Duplicates and sort order are resolved from the key, DOI and sort
+        field alone; each entry is fully decoded only when it is written.
+        
+        Args:
+            filepath: Input BibTeX file
+            output: Output file (None for in-place)
+            deduplicate: Remove duplicates
+            sort_by: Field to sort by
+            descending: Sort in descending order
+            fix_issues: Fix common formatting issues
+        """
+        print(f'Indexing {filepath}...', file=sys.stderr)
+        try:
+            index = BibTeXIndex(filepath)
+        except OSError as e:
+            print(f'Error reading file: {e}', file=sys.stderr)
+            return
+        
+        output_file = output or filepath
+        temp_file = f'{output_file}.tmp'
+        count = 0
+        
+        with index:
+            if not len(index):
+                print('No entries found', file=sys.stderr)
+                return
+            
+            print(f'Found {len(index)} entries', file=sys.stderr)
+            positions = list(range(len(index)))
+            
+            # Deduplicate
+            if deduplicate:
+                print('Removing duplicates...', file=sys.stderr)
+                positions = self.deduplicate_indexed(index)
+                removed = len(index) - len(positions)
+                if removed > 0:
+                    print(f'Removed {removed} duplicate(s)', file=sys.stderr)
+            
+            # Sort on the sort field only
+            if sort_by:
+                print(f'Sorting by {sort_by}...', file=sys.stderr)
+                stubs = []
+                for position in positions:
+                    value = index.field(position, sort_by) if sort_by != 'key' else None
+                    stub = {
+                        'key': index.keys[position],
+                        'fields': {sort_by: value} if value is not None else {},
+                        'position': position
+                    }
+                    stubs.append(self.fix_common_issues(stub) if fix_issues else stub)
+                positions = [stub['position'] for stub in self.sort_entries(stubs, sort_by, descending)]
+            
+            # Format entries one at a time; the input stays mapped until done
+            print('Formatting entries...', file=sys.stderr)
+            try:
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    for position in positions:
+                        entry = index.entry(position)
+                        if entry is None:
+                            continue
+                        if fix_issues:
+                            entry = self.fix_common_issues(entry)
+                        f.write(('\n\n' if count else '') + self.format_entry(entry))
+                        count += 1
+                    f.write('\n')
+            except Exception as e:
+                print(f'Error writing file: {e}', file=sys.stderr)
+                sys.exit(1)
+        
+        os.replace(temp_file, output_file)
+        print(f'Successfully wrote {count} entries to {output_file}', file=sys.stderr)
+    
+    def deduplicate_indexed(self, index: BibTeXIndex) -> List[int]:
+        """
+        Find the positions of unique entries using the index's key and DOI hashes.
+        
+        Keeps the same entries as deduplicate_entries, without decoding
+        anything but the DOI field.
+        
+        Args:
+            index: BibTeX index
+            
+        Returns:
+            Positions of entries to keep, in file order
+        """
+        dois = {position: doi for doi, positions in index.doi_index().items() for position in positions}
+        seen_dois = set()
+        seen_keys = set()
+        return [position for position in range(len(index))
+                if not self.is_duplicate(index.keys[position], dois.get(position), seen_dois, seen_keys)]
+
+
+    def format_file_streaming(self, filepath: str, output: str = None,
+                              deduplicate: bool = False, sort_by: str = None,
+                              descending: bool = False, fix_issues: bool = True,
+                              memory_mb: int = 256) -> None:
+        """
+        Format a BibTeX file without holding the whole bibliography in memory.
+        
+        Entries are streamed from the input, fixed and formatted one at a
+        time. Without sorting they go straight to a buffered writer. With
+        sorting, each entry's collation key is computed once and buffered
+        with its formatted text; runs that fill the memory budget are sorted
+        and spilled to temporary files (under $TMPDIR), then k-way merged
+        into the output. Deduplication keeps only the DOIs and keys seen.
+        
+        Args:
+            filepath: Input BibTeX file
+            output: Output file (None for in-place)
+            deduplicate: Remove duplicates
+            sort_by: Field to sort by
+            descending: Sort in descending order
+            fix_issues: Fix common formatting issues
+            memory_mb: Approximate memory budget for buffered entries
+        """
+        output_file = output or filepath
+        temp_file = f'{output_file}.tmp'
+        budget = memory_mb * 1024 * 1024
+        
+        seen_dois = set()
+        seen_keys = set()
+        removed = 0
+        run, run_size = [], 0
+        
+        print(f'Streaming {filepath}...', file=sys.stderr)
+        try:
+            with tempfile.TemporaryDirectory(prefix='bibsort-') as run_dir, \
+                    open(filepath, 'rb') as source, \
+                    open(temp_file, 'w', encoding='utf-8', buffering=WRITE_BUFFER) as out:
+                run_files = []
+                count = 0
+                
+                for sequence, entry in enumerate(iter_bibtex_entries(source)):
+                    if fix_issues:
+                        entry = self.fix_common_issues(entry)
+                    
+                    # Deduplicate fixed entries in file order, as format_file does before sorting
+                    if deduplicate and self.is_duplicate(entry['key'], entry['fields'].get('doi'),
+                                                         seen_dois, seen_keys):
+                        removed += 1
+                        continue
+                    
+                    text = self.format_entry(entry)
+                    
+                    if not sort_by:
+                        out.write(('\n\n' if count else '') + text)
+                        count += 1
+                        continue
+                    
+                    # Descending sorts stay stable: ties keep file order
+                    sort_key = self.sort_key(entry, sort_by)
+                    run.append((sort_key, -sequence if descending else sequence, text))
+                    run_size += len(sort_key) + len(text) + RECORD_OVERHEAD
+                    if run_size >= budget:
+                        run_files.append(_write_run(run, run_dir, descending))
+                        print(f'Sorted run {len(run_files)} ({len(run)} entries)', file=sys.stderr)
+                        run, run_size = [], 0
+                
+                if sort_by:
+                    run.sort(reverse=descending)
+                    if run_files:
+                        run_files.append(_write_run(run, run_dir, descending))
+                        print(f'Merging {len(run_files)} sorted runs...', file=sys.stderr)
+                        records = heapq.merge(*map(_read_run, run_files), reverse=descending)
+                    else:
+                        records = iter(run)
+                    for _, _, text in records:
+                        out.write(('\n\n' if count else '') + text)
+                        count += 1
+                    run = []
+                
+                out.write('\n')
+        except OSError as e:
+            print(f'Error writing file: {e}', file=sys.stderr)
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            sys.exit(1)
+        
+        if removed > 0:
+            print(f'Removed {removed} duplicate(s)', file=sys.stderr)
+        if not count:
+            os.remove(temp_file)
+            print('No entries found', file=sys.stderr)
+            return
+        
+        os.replace(temp_file, output_file)
+        print(f'Successfully wrote {count} entries to {output_file}', file=sys.stderr)
+
+
+def _write_run(run: List[Tuple], directory: str, descending: bool) -> str:
+    """Sort a run in place and spill it to a temporary file in pickled batches."""
+    run.sort(reverse=descending)
+    fd, path = tempfile.mkstemp(suffix='.run', dir=directory)
+    with os.fdopen(fd, 'wb') as f:
+        for start in range(0, len(run), RUN_BATCH):
+            pickle.dump(run[start:start + RUN_BATCH], f, protocol=pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def _read_run(path: str) -> Iterator[Tuple]:
+    """Stream the records of a sorted run file."""
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                batch = pickle.load(f)
+            except EOFError:
+                return
+            yield from batch
 
 
 def main():
@@ -330,18 +697,65 @@ def main():
         help='Do not fix common issues'
     )
     
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Re-parse the file instead of using the parsed-entry cache'
+    )
+    
+    parser.add_argument(
+        '--index',
+        action='store_true',
+        help='Use a memory-mapped index instead of loading every entry (for very large files)'
+    )
+    
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Reformat only new or changed entries, copying the rest from the previous output'
+    )
+    
+    parser.add_argument(
+        '--manifest',
+        help='Manifest for --incremental (default: OUTPUT.manifest.json)'
+    )
+    
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Stream entries and sort with an external merge sort (for multi-million-entry files)'
+    )
+    
+    parser.add_argument(
+        '--memory-mb',
+        type=int,
+        default=256,
+        help='Memory budget in MB for sorted runs with --stream (default: 256)'
+    )
+    
     args = parser.parse_args()
     
     # Format file
-    formatter = BibTeXFormatter()
-    formatter.format_file(
-        args.file,
-        output=args.output,
-        deduplicate=args.deduplicate,
-        sort_by=args.sort,
-        descending=args.descending,
-        fix_issues=not args.no_fix
-    )
+    if args.index + args.incremental + args.stream > 1:
+        parser.error('--index, --incremental and --stream cannot be combined')
+    
+    formatter = BibTeXFormatter(cache_dir=None if args.no_cache else DEFAULT_CACHE_DIR)
+    options = {
+        'output': args.output,
+        'deduplicate': args.deduplicate,
+        'sort_by': args.sort,
+        'descending': args.descending,
+        'fix_issues': not args.no_fix
+    }
+    
+    if args.incremental:
+        formatter.format_file_incremental(args.file, manifest=args.manifest, **options)
+    elif args.index:
+        formatter.format_file_indexed(args.file, **options)
+    elif args.stream:
+        formatter.format_file_streaming(args.file, memory_mb=args.memory_mb, **options)
+    else:
+        formatter.format_file(args.file, **options)
 
 
 if __name__ == '__main__':
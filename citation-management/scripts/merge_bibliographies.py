@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Bibliography Merger
+Merge BibTeX files from different sources into one bibliography, joining
+duplicates on DOI, PMID, arXiv ID and a fuzzy title key.
+"""
+
+import re
+import sys
+import json
+import argparse
+from typing import Dict, List, Optional, Tuple
+
+from bibtex_tokenizer import iter_bibtex_entries
+from crossref_bulk import normalize_doi
+from format_bibtex import BibTeXFormatter
+from near_duplicates import ARXIV_ID, first_author_surname, main_title
+
+
+ARXIV_DOI_PREFIX = '10.48550/arxiv.'
+
+# Join keys, strongest first
+JOIN_KEYS = ['doi', 'pmid', 'arxiv', 'title']
+
+STRATEGIES = ('first', 'longest', 'union')
+
+# Field merge strategy when no rule is given: the highest-ranked entry wins
+DEFAULT_RULES = {
+    'abstract': 'longest',
+    'keywords': 'union',
+}
+
+
+def entry_identifiers(entry: Dict) -> Dict[str, str]:
+    """
+    Extract join identifiers from an entry.
+
+    Args:
+        entry: Entry dictionary
+
+    Returns:
+        Dictionary with any of doi, pmid, arxiv and title keys
+    """
+    fields = entry['fields']
+    identifiers = {}
+    eprint_type = (fields.get('archiveprefix') or fields.get('eprinttype') or '').lower()
+
+    doi = normalize_doi(fields.get('doi', ''))
+    if doi.startswith(ARXIV_DOI_PREFIX):
+        # arXiv DOIs identify the preprint, not the published version
+        identifiers['arxiv'] = doi[len(ARXIV_DOI_PREFIX):]
+    elif doi:
+        identifiers['doi'] = doi
+
+    pmid = fields.get('pmid') or (fields.get('eprint') if eprint_type == 'pubmed' else '')
+    if pmid and pmid.strip().isdigit():
+        identifiers['pmid'] = pmid.strip()
+
+    if 'arxiv' not in identifiers:
+        candidates = [fields.get('arxiv', '')]
+        if eprint_type == 'arxiv':
+            candidates.append(fields.get('eprint', ''))
+        # URLs and journal strings only count when they name arXiv
+        candidates += [value for value in (fields.get('url', ''), fields.get('journal', ''))
+                       if 'arxiv' in value.lower()]
+        for candidate in candidates:
+            match = ARXIV_ID.search(candidate)
+            if match:
+                identifiers['arxiv'] = match.group(1).lower()
+                break
+
+    title = main_title(fields.get('title', ''))
+    surname = first_author_surname(fields.get('author', '') or fields.get('editor', ''))
+    # Short titles ("Introduction", "Editorial") are too ambiguous to join on
+    if surname and len(title.split()) >= 4:
+        identifiers['title'] = f'{surname}|{title}'
+
+    return identifiers
+
+
+def _normalized_value(value: str) -> str:
+    return ' '.join(value.replace('{', '').replace('}', '').lower().split())
+
+
+class BibliographyMerger:
+    """Hash-join BibTeX entries from several files and merge duplicate groups."""
+
+    def __init__(self, rules: Optional[Dict[str, str]] = None):
+        """
+        Initialize merger.
+
+        Args:
+            rules: Field name to merge strategy ('first', 'longest' or 'union');
+                unlisted fields use 'first'
+        """
+        self.rules = dict(DEFAULT_RULES)
+        self.rules.update(rules or {})
+        for field_name, strategy in self.rules.items():
+            if strategy not in STRATEGIES:
+                raise ValueError(f'Unknown merge strategy for {field_name}: {strategy}')
+
+        self.entries: List[Dict] = []
+        self.sources: List[Dict] = []
+        self._parent: List[int] = []
+        self._reasons: Dict[int, List[str]] = {}
+        self._dois: List[Optional[str]] = []
+        self._join_tables: Dict[str, Dict[str, int]] = {name: {} for name in JOIN_KEYS}
+
+    def add_file(self, filepath: str) -> int:
+        """
+        Stream entries from a BibTeX file into the join tables.
+
+        Files added first take precedence when fields conflict.
+
+        Args:
+            filepath: Path to BibTeX file
+
+        Returns:
+            Number of entries read
+        """
+        source = {'file': filepath, 'entries': 0}
+        self.sources.append(source)
+        with open(filepath, 'rb') as f:
+            for entry in iter_bibtex_entries(f):
+                self._add(entry, len(self.sources) - 1)
+                source['entries'] += 1
+        return source['entries']
+
+    def _find(self, item: int) -> int:
+        parent = self._parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def _union(self, item: int, other: int, reason: str) -> None:
+        root, other_root = self._find(item), self._find(other)
+        if root == other_root:
+            return
+        if reason == 'title':
+            # A fuzzy title match never overrides two different DOIs
+            dois = self._dois[root], self._dois[other_root]
+            if all(dois) and dois[0] != dois[1]:
+                return
+        if other_root < root:
+            root, other_root = other_root, root
+        self._parent[other_root] = root
+        self._dois[root] = self._dois[root] or self._dois[other_root]
+        self._reasons.setdefault(root, []).extend(self._reasons.pop(other_root, []))
+        self._reasons[root].append(reason)
+
+    def _add(self, entry: Dict, source: int) -> None:
+        item = len(self.entries)
+        identifiers = entry_identifiers(entry)
+        entry = dict(entry, source=source, order=item, identifiers=identifiers)
+        entry.pop('raw', None)
+        self.entries.append(entry)
+        self._parent.append(item)
+        self._dois.append(identifiers.get('doi'))
+
+        for name in JOIN_KEYS:
+            value = identifiers.get(name)
+            if not value:
+                continue
+            table = self._join_tables[name]
+            if value in table:
+                self._union(item, table[value], name)
+            else:
+                table[value] = item
+
+    def _rank(self, entry: Dict) -> Tuple:
+        """Published versions first, then source precedence, then file order."""
+        fields = entry['fields']
+        published = bool(fields.get('journal') or fields.get('booktitle')) \
+            and 'arxiv' not in fields.get('journal', '').lower()
+        return (not published, entry['source'], entry['order'])
+
+    @staticmethod
+    def _unique_key(key: str, used_keys: set) -> str:
+        """Append the first free suffix b, c, ... z, then 2, 3, ... to a colliding key."""
+        for suffix in 'bcdefghijklmnopqrstuvwxyz':
+            if f'{key}{suffix}' not in used_keys:
+                return f'{key}{suffix}'
+        number = 2
+        while f'{key}{number}' in used_keys:
+            number += 1
+        return f'{key}{number}'
+
+    def _merge_fields(self, members: List[Dict], conflicts: List[Dict], key: str) -> Dict[str, str]:
+        merged = {}
+        names = []
+        for member in members:
+            names.extend(name for name in member['fields'] if name not in names)
+
+        for name in names:
+            values = [member['fields'][name] for member in members if member['fields'].get(name, '').strip()]
+            if not values:
+                continue
+            strategy = self.rules.get(name, 'first')
+
+            if strategy == 'union':
+                parts = []
+                seen = set()
+                for value in values:
+                    for part in re.split(r'\s*[,;]\s*', value):
+                        if part and part.lower() not in seen:
+                            seen.add(part.lower())
+                            parts.append(part)
+                merged[name] = ', '.join(parts)
+                continue
+
+            chosen = max(values, key=len) if strategy == 'longest' else values[0]
+            merged[name] = chosen
+            alternatives = []
+            for value in values:
+                if _normalized_value(value) != _normalized_value(chosen) and value not in alternatives:
+                    alternatives.append(value)
+            if alternatives and name not in ('doi', 'url'):
+                conflicts.append({'key': key, 'field': name, 'chosen': chosen, 'alternatives': alternatives})
+
+        return merged
+
+    def merge(self) -> Tuple[List[Dict], Dict]:
+        """
+        Merge joined entries.
+
+        Each group keeps the type and key of its best-ranked entry
+        (published before preprint, then input order). Keys that collide
+        across groups are rewritten deterministically with b, c, ... suffixes
+        in order of first appearance.
+
+        Returns:
+            Tuple of (merged entries in first-appearance order, merge report)
+        """
+        groups: Dict[int, List[int]] = {}
+        for item in range(len(self.entries)):
+            groups.setdefault(self._find(item), []).append(item)
+
+        merged_entries = []
+        used_keys = set()
+        merged_groups, conflicts, renamed = [], [], []
+
+        for root, items in groups.items():
+            members = sorted((self.entries[item] for item in items), key=self._rank)
+            best = members[0]
+            key = best['key']
+            if key in used_keys:
+                key = self._unique_key(key, used_keys)
+                renamed.append({'source': self.sources[best['source']]['file'], 'old': best['key'], 'new': key})
+            used_keys.add(key)
+
+            fields = self._merge_fields(members, conflicts, key)
+            merged_entries.append({'type': best['type'], 'key': key, 'fields': fields})
+
+            if len(members) > 1:
+                merged_groups.append({
+                    'key': key,
+                    'matched_on': sorted(set(self._reasons.get(root, []))),
+                    'members': [
+                        {'source': self.sources[member['source']]['file'], 'key': member['key']}
+                        for member in members
+                    ]
+                })
+
+        report = {
+            'inputs': self.sources,
+            'input_entries': len(self.entries),
+            'output_entries': len(merged_entries),
+            'merged_groups': merged_groups,
+            'conflicts': conflicts,
+            'renamed_keys': renamed
+        }
+        return merged_entries, report
+
+
+def main():
+    """Command-line interface."""
+    parser = argparse.ArgumentParser(
+        description='Merge BibTeX files, joining duplicates on DOI, PMID, arXiv ID and title',
+        epilog='Example: python merge_bibliographies.py zotero.bib mendeley.bib -o merged.bib --report merge.json'
+    )
+    
+    parser.add_argument(
+        'files',
+        nargs='+',
+        help='BibTeX files to merge, highest precedence first'
+    )
+    
+    parser.add_argument(
+        '-o', '--output',
+        help='Output file for merged BibTeX (default: stdout)'
+    )
+    
+    parser.add_argument(
+        '--report',
+        help='Output file for JSON merge report'
+    )
+    
+    parser.add_argument(
+        '--rule',
+        action='append',
+        default=[],
+        metavar='FIELD=STRATEGY',
+        help='Merge strategy for a field: first, longest or union (repeatable; '
+             'defaults: abstract=longest, keywords=union, others=first)'
+    )
+    
+    args = parser.parse_args()
+    
+    rules = {}
+    for rule in args.rule:
+        field_name, _, strategy = rule.partition('=')
+        if strategy not in STRATEGIES:
+            parser.error(f'Invalid rule {rule!r}; use FIELD=first|longest|union')
+        rules[field_name.strip().lower()] = strategy
+    
+    merger = BibliographyMerger(rules)
+    for filepath in args.files:
+        try:
+            count = merger.add_file(filepath)
+        except OSError as e:
+            print(f'Error reading file: {e}', file=sys.stderr)
+            sys.exit(1)
+        print(f'Read {count} entries from {filepath}', file=sys.stderr)
+    
+    entries, report = merger.merge()
+    
+    formatter = BibTeXFormatter(cache_dir=None)
+    output_content = '\n\n'.join(formatter.format_entry(entry) for entry in entries) + '\n'
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output_content)
+        print(f'Successfully wrote {len(entries)} entries to {args.output}', file=sys.stderr)
+    else:
+        print(output_content, end='')
+    
+    print(f'Merged {report["input_entries"]} entries into {report["output_entries"]} '
+          f'({len(report["merged_groups"])} duplicate groups, {len(report["conflicts"])} field conflicts, '
+          f'{len(report["renamed_keys"])} renamed keys)', file=sys.stderr)
+    
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f'Merge report saved to: {args.report}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
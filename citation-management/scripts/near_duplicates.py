@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Detection
+MinHash signatures over title character shingles with LSH banding, blocked by first-author
+surname and year inside each bucket, so fuzzy duplicate detection avoids
+comparing every pair.
+"""
+
+import re
+import hashlib
+import unicodedata
+from array import array
+from collections import defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+# LaTeX accent and symbol commands: \"u, \'{e}, {\"u}, \c{c}, \ss, \&
+LATEX_ACCENT = re.compile(r'\\[`\'^"~=.uvHtcdbr]\s*\{?\s*([A-Za-z])\}?')
+LATEX_SYMBOL = re.compile(r'\\(ss|ae|oe|aa|o|l|i|j|AE|OE|AA|O|L)\b')
+LATEX_COMMAND = re.compile(r'\\[A-Za-z]+\*?')
+LATEX_SYMBOLS = {'ss': 'ss', 'ae': 'ae', 'oe': 'oe', 'aa': 'a', 'o': 'o', 'l': 'l', 'i': 'i', 'j': 'j',
+                 'AE': 'ae', 'OE': 'oe', 'AA': 'a', 'O': 'o', 'L': 'l'}
+NON_WORD = re.compile(r'[^\w\s]')
+SUBTITLE_SEPARATOR = re.compile(r'\s*(?::|\s-{1,3}\s|\.\s)\s*')
+# Function words carry no signal for title similarity and make LSH buckets huge
+TITLE_STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'by', 'for', 'from', 'in', 'into', 'is', 'of', 'on', 'or',
+    'the', 'to', 'via', 'with', 'its', 'their', 'between', 'towards', 'toward', 'under', 'over'
+}
+
+SHINGLE_SIZE = 3
+
+# Blocks larger than this share only an uninformative bucket and are not paired
+MAX_BLOCK_SIZE = 100
+
+# New-style (2301.01234v2) and old-style (hep-th/9901001) arXiv identifiers
+ARXIV_ID = re.compile(r'(\d{4}\.\d{4,5}|[a-z][a-z\-]*(?:\.[A-Z]{2})?/\d{7})(?:v\d+)?', re.IGNORECASE)
+
+
+def normalize_title(title: str) -> str:
+    """
+    Normalize a title for comparison.
+
+    LaTeX escapes and Unicode accents are folded to plain letters, braces,
+    commands and punctuation are removed, and whitespace is collapsed.
+
+    Args:
+        title: Title as written in BibTeX
+
+    Returns:
+        Lowercase normalized title
+    """
+    if '\\' in title:
+        title = LATEX_ACCENT.sub(r'\1', title)
+        title = LATEX_SYMBOL.sub(lambda m: LATEX_SYMBOLS[m.group(1)], title)
+        title = LATEX_COMMAND.sub(' ', title)
+    if not title.isascii():
+        title = unicodedata.normalize('NFKD', title)
+        title = ''.join(c for c in title if not unicodedata.combining(c))
+    title = NON_WORD.sub(' ', title.replace('{', '').replace('}', '').lower())
+    return ' '.join(title.split())
+
+
+def main_title(title: str) -> str:
+    """Get the normalized title without its subtitle."""
+    return normalize_title(SUBTITLE_SEPARATOR.split(title, maxsplit=1)[0])
+
+
+def title_shingles(title_norm: str, size: int = SHINGLE_SIZE) -> Set[str]:
+    """
+    Character n-grams of a normalized title without its stopwords.
+
+    Character shingles track the edit-based similarity used for
+    verification far better than whole words, which a single typo or
+    plural changes completely.
+
+    Args:
+        title_norm: Normalized title
+        size: Characters per shingle
+
+    Returns:
+        Shingle set (the whole text if it is shorter than a shingle)
+    """
+    words = [word for word in title_norm.split() if word not in TITLE_STOPWORDS]
+    text = ' '.join(words) or title_norm
+    return {text[i:i + size] for i in range(max(1, len(text) - size + 1))}
+
+
+def first_author_surname(author: str) -> str:
+    """
+    Get the normalized surname of the first author of a BibTeX author field.
+
+    Args:
+        author: Author field ("Last, First and ..." or "First Last and ...")
+
+    Returns:
+        Surname, or '' if there is no author
+    """
+    first = re.split(r'\s+and\s+', author.strip(), maxsplit=1)[0]
+    if not first or first.lower() == 'others':
+        return ''
+    surname = first.split(',')[0] if ',' in first else first.split()[-1]
+    return normalize_title(surname).replace(' ', '')
+
+
+class MinHashLSH:
+    """MinHash signatures with banded locality-sensitive hashing."""
+
+    def __init__(self, num_perm: int = 32, bands: int = 16, seed: int = 1):
+        """
+        Initialize hash family.
+
+        Args:
+            num_perm: Signature length
+            bands: LSH bands (num_perm must be divisible by bands); with
+                r = num_perm / bands rows, pairs above roughly
+                (1 / bands) ** (1 / r) Jaccard similarity become candidates
+            seed: Seed for the hash family
+        """
+        if num_perm % bands:
+            raise ValueError('num_perm must be divisible by bands')
+        # Each 64-byte digest yields 32 hash values
+        self.salts = [seed.to_bytes(8, 'little') + block.to_bytes(8, 'little')
+                      for block in range(-(-num_perm // 32))]
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.buckets: List[Dict[bytes, List[int]]] = [defaultdict(list) for _ in range(bands)]
+        self._token_hashes: Dict[str, List[int]] = {}
+
+    def signature(self, tokens: Set[str]) -> bytes:
+        """
+        Compute a MinHash signature.
+
+        Each token's BLAKE2b digest supplies num_perm 16-bit hash values at
+        once; the signature is their element-wise minimum over the tokens.
+
+        Args:
+            tokens: Token set (must be non-empty)
+
+        Returns:
+            Signature of num_perm 16-bit values, packed as bytes
+        """
+        cache = self._token_hashes
+        rows = []
+        for token in tokens:
+            hashes = cache.get(token)
+            if hashes is None:
+                digest = b''.join(
+                    hashlib.blake2b(token.encode('utf-8'), digest_size=64, salt=salt).digest()
+                    for salt in self.salts
+                )
+                hashes = cache[token] = memoryview(digest).cast('H')[:self.num_perm].tolist()
+            rows.append(hashes)
+        return array('H', map(min, zip(*rows))).tobytes()
+
+    def add(self, item: int, signature: bytes) -> None:
+        """Insert an item's signature into the band buckets."""
+        width = self.rows * 2
+        for band, buckets in enumerate(self.buckets):
+            buckets[signature[band * width:(band + 1) * width]].append(item)
+
+    def iter_buckets(self) -> Iterator[List[int]]:
+        """Iterate over band buckets holding more than one item."""
+        for buckets in self.buckets:
+            for items in buckets.values():
+                if len(items) > 1:
+                    yield items
+
+
+def _blocked_pairs(positions: List[int], items: List[Dict]) -> Iterator[Tuple[int, int]]:
+    """
+    Pair the items of one bucket that pass the blocking rule, without
+    enumerating the others.
+
+    Items are grouped by first-author surname and paired only within a
+    group, in year order while years are at most one apart; items without
+    a surname or year pair with every item of their group. Groups larger
+    than MAX_BLOCK_SIZE are skipped.
+
+    Args:
+        positions: Item positions sharing a bucket
+        items: All items
+
+    Yields:
+        Position pairs (smaller first)
+    """
+    by_surname = defaultdict(list)
+    anonymous = []
+    for position in positions:
+        surname = items[position]['surname']
+        if surname:
+            by_surname[surname].append(position)
+        else:
+            anonymous.append(position)
+    groups = [group + anonymous for group in by_surname.values()] or [anonymous]
+
+    for group in groups:
+        if len(group) < 2 or len(group) > MAX_BLOCK_SIZE:
+            continue
+        dated = sorted((position for position in group if items[position]['year'] is not None),
+                       key=lambda position: items[position]['year'])
+        for i, first in enumerate(dated):
+            for second in dated[i + 1:]:
+                if items[second]['year'] - items[first]['year'] > 1:
+                    break
+                yield min(first, second), max(first, second)
+        for first in group:
+            if items[first]['year'] is None:
+                for second in group:
+                    if second != first:
+                        yield min(first, second), max(first, second)
+
+
+def _compatible(first: Dict, second: Dict) -> bool:
+    """Blocking rule: same first-author surname and years at most one apart, when known."""
+    if first['surname'] and second['surname'] and first['surname'] != second['surname']:
+        return False
+    if first['year'] is not None and second['year'] is not None and abs(first['year'] - second['year']) > 1:
+        return False
+    return True
+
+
+def title_similarity(first: str, second: str) -> float:
+    """
+    Similarity of two normalized titles.
+
+    Args:
+        first: Normalized title
+        second: Normalized title
+
+    Returns:
+        Edit-based similarity ratio in [0, 1]
+    """
+    matcher = SequenceMatcher(None, first, second, autojunk=False)
+    if matcher.real_quick_ratio() < 0.5 or matcher.quick_ratio() < 0.5:
+        return matcher.quick_ratio()
+    return matcher.ratio()
+
+
+def find_near_duplicates(records: Iterable[Tuple[str, str, str, Optional[str]]],
+                         threshold: float = 0.85, num_perm: int = 32,
+                         bands: int = 16) -> List[Dict]:
+    """
+    Find pairs of records with near-identical titles.
+
+    Candidates come from LSH buckets over MinHashes of title character
+    shingles (stopwords removed) and from exact matches of the title without its
+    subtitle. Within each bucket only records whose first-author surnames
+    match and whose years are at most one apart (when known) are paired;
+    the pairs are then verified with an exact similarity score. Identical normalized titles
+    are always reported, as pairs of the first occurrence and each repeat.
+
+    Args:
+        records: Iterable of (key, title, author, year)
+        threshold: Minimum similarity to report
+        num_perm: MinHash signature length
+        bands: LSH bands
+
+    Returns:
+        List of {'entries': [key1, key2], 'similarity': float, 'identical': bool},
+        ordered by the position of the first entry
+    """
+    lsh = MinHashLSH(num_perm=num_perm, bands=bands)
+    items = []
+    exact = defaultdict(list)
+    mains = defaultdict(list)
+
+    for key, title, author, year in records:
+        title_norm = normalize_title(title or '')
+        if not title_norm:
+            continue
+        year_match = re.search(r'\d{4}', year or '')
+        item = {
+            'key': key,
+            'title': title_norm,
+            'main': main_title(title) if SUBTITLE_SEPARATOR.search(title) else title_norm,
+            'surname': first_author_surname(author or ''),
+            'year': int(year_match.group()) if year_match else None
+        }
+        position = len(items)
+        items.append(item)
+
+        exact[title_norm].append(position)
+        if len(exact[title_norm]) > 1:
+            # Only the first of identical titles is hashed
+            continue
+        if item['main'] != title_norm and len(item['main'].split()) >= 3:
+            mains[item['main']].append(position)
+        lsh.add(position, lsh.signature(title_shingles(title_norm)))
+
+    results = []
+    pairs = []
+    for positions in exact.values():
+        for other in positions[1:]:
+            pairs.append((positions[0], other, True))
+
+    candidates = set()
+    for bucket in lsh.iter_buckets():
+        candidates.update(_blocked_pairs(bucket, items))
+    for main, positions in mains.items():
+        # Titles with a subtitle are also compared to the bare title
+        candidates.update(_blocked_pairs(exact.get(main, [])[:1] + positions, items))
+    pairs.extend((first, second, False) for first, second in candidates)
+
+    for first, second, identical in sorted(pairs):
+        a, b = items[first], items[second]
+        if identical:
+            similarity = 1.0
+        elif not _compatible(a, b):
+            continue
+        else:
+            similarity = title_similarity(a['title'], b['title'])
+            if a['main'] == b['main'] and len(a['main'].split()) >= 3:
+                # Same title, different or missing subtitle
+                similarity = max(similarity, threshold)
+        if similarity >= threshold:
+            results.append({
+                'entries': [a['key'], b['key']],
+                'similarity': round(similarity, 3),
+                'identical': identical
+            })
+
+    return results
@@ -4,18 +4,40 @@ Citation Validation Tool
 Validate BibTeX files for accuracy, completeness, and format compliance.
 """
 
+import os
 import sys
 import re
+import mmap
 import requests
 import argparse
 import json
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterable, List, Tuple, Optional
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from bibtex_index import BibTeXIndex
+from bibtex_tokenizer import BibTeXSyntaxError, parse_entry
+from bibtex_cache import DEFAULT_CACHE_DIR, load_bibtex
+from crossref_bulk import CrossRefBulkResolver, normalize_doi
+from file_watcher import watch_files
+from near_duplicates import find_near_duplicates
 
 class CitationValidator:
     """Validate BibTeX entries for errors and inconsistencies."""
     
-    def __init__(self):
+    def __init__(self, cache_dir: Optional[str] = DEFAULT_CACHE_DIR):
+        """
+        Initialize validator.
+        
+        Args:
+            cache_dir: Parsed-entry cache directory (None to always re-parse)
+        """
+        self.cache_dir = cache_dir
+        
+        # In-memory results reused across runs in watch mode
+        self._entry_results: Dict[Tuple, Tuple[List[Dict], List[Dict]]] = {}
+        self._doi_results: Dict[str, Tuple[bool, Optional[Dict]]] = {}
+        
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'CitationValidator/1.0 (Citation Management Tool)'
@@ -48,49 +70,15 @@ class CitationValidator:
             filepath: Path to BibTeX file
             
         Returns:
-            List of entry dictionaries
+            List of entry dictionaries (streamed through the shared tokenizer,
+            which handles nested braces, @string macros and # concatenation;
+            unchanged entries are reused from the parse cache)
         """
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
+            return load_bibtex(filepath, self.cache_dir)
         except Exception as e:
             print(f'Error reading file: {e}', file=sys.stderr)
             return []
-        
-        entries = []
-        
-        # Match BibTeX entries
-        pattern = r'@(\w+)\s*\{\s*([^,\s]+)\s*,(.*?)\n\}'
-        matches = re.finditer(pattern, content, re.DOTALL | re.IGNORECASE)
-        
-        for match in matches:
-            entry_type = match.group(1).lower()
-            citation_key = match.group(2).strip()
-            fields_text = match.group(3)
-            
-            # Parse fields
-            fields = {}
-            field_pattern = r'(\w+)\s*=\s*\{([^}]*)\}|(\w+)\s*=\s*"([^"]*)"'
-            field_matches = re.finditer(field_pattern, fields_text)
-            
-            for field_match in field_matches:
-                if field_match.group(1):
-                    field_name = field_match.group(1).lower()
-                    field_value = field_match.group(2)
-                else:
-                    field_name = field_match.group(3).lower()
-                    field_value = field_match.group(4)
-                
-                fields[field_name] = field_value.strip()
-            
-            entries.append({
-                'type': entry_type,
-                'key': citation_key,
-                'fields': fields,
-                'raw': match.group(0)
-            })
-        
-        return entries
     
     def validate_entry(self, entry: Dict) -> Tuple[List[Dict], List[Dict]]:
         """
@@ -236,26 +224,93 @@ class CitationValidator:
         except Exception:
             return False, None
     
-    def detect_duplicates(self, entries: List[Dict]) -> List[Dict]:
+    def verify_dois(self, dois: List[str]) -> Dict[str, Tuple[bool, Optional[Dict]]]:
+        """
+        Verify many DOIs using CrossRef bulk filter requests.
+        
+        DOIs found in CrossRef are valid. The rest (e.g. DataCite DOIs)
+        are checked individually against doi.org.
+        
+        Args:
+            dois: List of Digital Object Identifiers
+            
+        Returns:
+            Dictionary mapping each DOI (as given) to (is_valid, metadata)
+        """
+        resolver = CrossRefBulkResolver(session=self.session)
+        messages = resolver.resolve(dois)
+        
+        results = {}
+        for doi in dois:
+            if doi in results:
+                continue
+            message = messages.get(normalize_doi(doi))
+            if message:
+                results[doi] = (True, {
+                    'title': message.get('title', [''])[0] if message.get('title') else '',
+                    'year': self._extract_year_crossref(message),
+                    'authors': self._format_authors_crossref(message.get('author', [])),
+                })
+            else:
+                results[doi] = self.verify_doi(doi)
+        
+        return results
+    
+    def detect_duplicates(self, entries: List[Dict], similarity: float = 0.85) -> List[Dict]:
         """
         Detect duplicate entries.
         
+        Near-duplicate titles (preprint vs published, typos, subtitles, LaTeX
+        escapes) are found with MinHash/LSH, blocked by first-author surname
+        and year, rather than by comparing every pair.
+        
         Args:
             entries: List of entry dictionaries
+            similarity: Minimum title similarity to report (0-1)
             
         Returns:
             List of duplicate groups
         """
-        duplicates = []
-        
-        # Check for duplicate DOIs
+        # Group entries by normalized DOI and by citation key, in file order
         doi_map = defaultdict(list)
+        key_counts = defaultdict(int)
         for entry in entries:
-            doi = entry['fields'].get('doi', '').strip()
+            doi = normalize_doi(entry['fields'].get('doi') or '')
             if doi:
                 doi_map[doi].append(entry['key'])
+            key_counts[entry['key']] += 1
+        
+        duplicates = self._identifier_duplicates(doi_map.items(), key_counts.items())
+        
+        # Check for similar titles (possible duplicates)
+        records = (
+            (entry['key'], entry['fields'].get('title', ''),
+             entry['fields'].get('author', ''), entry['fields'].get('year'))
+            for entry in entries
+        )
+        duplicates.extend(self._similar_titles(records, similarity))
+        
+        return duplicates
+    
+    def _identifier_duplicates(self, doi_groups: Iterable[Tuple[str, List[str]]],
+                               key_counts: Iterable[Tuple[str, int]]) -> List[Dict]:
+        """
+        Report DOIs shared by several entries and repeated citation keys.
         
-        for doi, keys in doi_map.items():
+        Both detect_duplicates and detect_duplicates_indexed report through
+        here, so loaded and indexed files give the same report.
+        
+        Args:
+            doi_groups: (normalized DOI, keys of its entries) in order of
+                first occurrence
+            key_counts: (citation key, number of entries) in order of first
+                occurrence
+            
+        Returns:
+            List of duplicate groups
+        """
+        duplicates = []
+        for doi, keys in doi_groups:
             if len(keys) > 1:
                 duplicates.append({
                     'type': 'duplicate_doi',
@@ -265,12 +320,7 @@ class CitationValidator:
                     'message': f'Duplicate DOI {doi} found in entries: {", ".join(keys)}'
                 })
         
-        # Check for duplicate citation keys
-        key_counts = defaultdict(int)
-        for entry in entries:
-            key_counts[entry['key']] += 1
-        
-        for key, count in key_counts.items():
+        for key, count in key_counts:
             if count > 1:
                 duplicates.append({
                     'type': 'duplicate_key',
@@ -279,42 +329,85 @@ class CitationValidator:
                     'severity': 'high',
                     'message': f'Citation key "{key}" appears {count} times'
                 })
+        return duplicates
+    
+    def _similar_titles(self, records: Iterable[Tuple], similarity: float) -> List[Dict]:
+        """Report near-duplicate titles found with MinHash/LSH."""
+        duplicates = []
+        for match in find_near_duplicates(records, threshold=similarity):
+            first, second = match['entries']
+            if match['identical']:
+                message = f'Possible duplicate: "{first}" and "{second}" have identical titles'
+            else:
+                message = (f'Possible duplicate: "{first}" and "{second}" have similar titles '
+                           f'(similarity {match["similarity"]:.2f})')
+            duplicates.append({
+                'type': 'similar_title',
+                'entries': [first, second],
+                'similarity': match['similarity'],
+                'severity': 'medium',
+                'message': message
+            })
+        return duplicates
+    
+    def detect_duplicates_indexed(self, index: BibTeXIndex, similarity: float = 0.85) -> List[Dict]:
+        """
+        Detect duplicate entries from a BibTeX index.
         
-        # Check for similar titles (possible duplicates)
-        titles = {}
-        for entry in entries:
-            title = entry['fields'].get('title', '').lower()
-            title = re.sub(r'[^\w\s]', '', title)  # Remove punctuation
-            title = ' '.join(title.split())  # Normalize whitespace
+        Keys and DOIs come from the index's hash tables and titles are
+        decoded one field at a time, so no full entries are built.
+        
+        Args:
+            index: BibTeX index
+            similarity: Minimum title similarity to report (0-1)
             
-            if title:
-                if title in titles:
-                    duplicates.append({
-                        'type': 'similar_title',
-                        'entries': [titles[title], entry['key']],
-                        'severity': 'medium',
-                        'message': f'Possible duplicate: "{titles[title]}" and "{entry["key"]}" have identical titles'
-                    })
-                else:
-                    titles[title] = entry['key']
+        Returns:
+            List of duplicate groups
+        """
+        doi_groups = ((doi, [index.keys[position] for position in positions])
+                      for doi, positions in index.doi_index().items())
+        # The index records repeated keys at their second occurrence; report them at their first
+        key_counts = sorted(index.duplicate_keys().items(), key=lambda item: index.positions(item[0])[0])
+        duplicates = self._identifier_duplicates(doi_groups, key_counts)
+        
+        records = (
+            (index.keys[position], title, index.field(position, 'author'), index.field(position, 'year'))
+            for position, title in index.iter_field('title')
+        )
+        duplicates.extend(self._similar_titles(records, similarity))
         
         return duplicates
     
-    def validate_file(self, filepath: str, check_dois: bool = False) -> Dict:
+    def validate_file(self, filepath: str, check_dois: bool = False, use_index: bool = False,
+                      similarity: float = 0.85) -> Dict:
         """
         Validate entire BibTeX file.
         
         Args:
             filepath: Path to BibTeX file
             check_dois: Whether to verify DOIs (slow)
+            use_index: Stream entries through a memory-mapped index instead
+                of loading them all (for very large files)
+            similarity: Minimum title similarity for near-duplicate reports
             
         Returns:
             Validation report dictionary
         """
-        print(f'Parsing {filepath}...', file=sys.stderr)
-        entries = self.parse_bibtex_file(filepath)
+        index = None
+        if use_index:
+            print(f'Indexing {filepath}...', file=sys.stderr)
+            try:
+                index = BibTeXIndex(filepath)
+            except OSError as e:
+                print(f'Error reading file: {e}', file=sys.stderr)
+            entries = index if index is not None else []
+        else:
+            print(f'Parsing {filepath}...', file=sys.stderr)
+            entries = self.parse_bibtex_file(filepath)
         
         if not entries:
+            if index is not None:
+                index.close()
             return {
                 'total_entries': 0,
                 'errors': [],
@@ -342,26 +435,23 @@ class CitationValidator:
         
         # Check for duplicates
         print('Checking for duplicates...', file=sys.stderr)
-        duplicates = self.detect_duplicates(entries)
+        if index is not None:
+            duplicates = self.detect_duplicates_indexed(index, similarity)
+        else:
+            duplicates = self.detect_duplicates(entries, similarity)
         
         # Verify DOIs if requested
         doi_errors = []
         if check_dois:
             print('Verifying DOIs...', file=sys.stderr)
-            for i, entry in enumerate(entries):
-                doi = entry['fields'].get('doi', '')
-                if doi:
-                    print(f'Verifying DOI {i+1}: {doi}', file=sys.stderr)
-                    is_valid, metadata = self.verify_doi(doi)
-                    
-                    if not is_valid:
-                        doi_errors.append({
-                            'type': 'invalid_doi',
-                            'entry': entry['key'],
-                            'doi': doi,
-                            'severity': 'high',
-                            'message': f'Entry {entry["key"]}: DOI does not resolve: {doi}'
-                        })
+            if index is not None:
+                doi_entries = [(index.keys[position], doi) for position, doi in index.iter_field('doi')]
+            else:
+                doi_entries = [(entry['key'], entry['fields'].get('doi', '')) for entry in entries]
+            doi_errors = self.check_dois(doi_entries)
+        
+        if index is not None:
+            index.close()
         
         all_errors.extend(doi_errors)
         
@@ -374,6 +464,174 @@ class CitationValidator:
             'duplicates': duplicates
         }
     
+    def check_dois(self, doi_entries: List[Tuple[str, str]]) -> List[Dict]:
+        """
+        Verify that DOIs resolve.
+        
+        Results are remembered, so each DOI is looked up once per validator.
+        
+        Args:
+            doi_entries: List of (citation key, DOI); empty DOIs are skipped
+            
+        Returns:
+            List of invalid_doi errors
+        """
+        doi_entries = [(key, doi) for key, doi in doi_entries if doi]
+        new_dois = [doi for _, doi in doi_entries if doi not in self._doi_results]
+        if new_dois:
+            self._doi_results.update(self.verify_dois(new_dois))
+        doi_results = self._doi_results
+        
+        doi_errors = []
+        for key, doi in doi_entries:
+            is_valid, metadata = doi_results[doi]
+            
+            if not is_valid:
+                doi_errors.append({
+                    'type': 'invalid_doi',
+                    'entry': key,
+                    'doi': doi,
+                    'severity': 'high',
+                    'message': f'Entry {key}: DOI does not resolve: {doi}'
+                })
+        
+        return doi_errors
+    
+    def validate_file_incremental(self, filepath: str, check_dois: bool = False,
+                                  similarity: float = 0.85) -> Dict:
+        """
+        Validate a BibTeX file, re-checking only entries changed since the last call.
+        
+        Per-entry results are kept in memory keyed by entry type, key and
+        parsed fields, so an entry is validated again only when it is added
+        or edited (including through an @string it uses). DOIs already
+        verified are not looked up again. Duplicate detection always covers
+        the whole file.
+        
+        Args:
+            filepath: Path to BibTeX file
+            check_dois: Whether to verify DOIs (slow)
+            similarity: Minimum title similarity for near-duplicate reports
+            
+        Returns:
+            Validation report dictionary, with changed_entries and
+            removed_entries counts
+        """
+        entries = self.parse_bibtex_file(filepath)
+        
+        previous = self._entry_results
+        results = {}
+        all_errors = []
+        all_warnings = []
+        changed = 0
+        
+        for entry in entries:
+            signature = (entry['type'], entry['key'], tuple(entry['fields'].items()))
+            result = results.get(signature) or previous.get(signature)
+            if result is None:
+                errors, warnings = self.validate_entry(entry)
+                for issue in errors + warnings:
+                    issue['entry'] = entry['key']
+                result = (errors, warnings)
+                changed += 1
+            results[signature] = result
+            all_errors.extend(result[0])
+            all_warnings.extend(result[1])
+        
+        removed = sum(1 for signature in previous if signature not in results)
+        self._entry_results = results
+        
+        duplicates = self.detect_duplicates(entries, similarity) if entries else []
+        
+        if check_dois:
+            all_errors.extend(self.check_dois([(entry['key'], entry['fields'].get('doi', ''))
+                                               for entry in entries]))
+        
+        return {
+            'filepath': filepath,
+            'total_entries': len(entries),
+            'valid_entries': len(entries) - len([e for e in all_errors if e['severity'] == 'high']),
+            'changed_entries': changed,
+            'removed_entries': removed,
+            'errors': all_errors,
+            'warnings': all_warnings,
+            'duplicates': duplicates
+        }
+    
+    def validate_file_parallel(self, filepath: str, check_dois: bool = False,
+                               similarity: float = 0.85, jobs: int = 0) -> Dict:
+        """
+        Validate a BibTeX file with entries sharded across a process pool.
+        
+        The file is indexed once; contiguous ranges of entry byte spans are
+        parsed and validated by worker processes, and their errors and
+        warnings are merged in file order. Duplicate detection then runs as
+        one global pass over compact (key, doi, title, author, year) records
+        returned by the shards.
+        
+        Args:
+            filepath: Path to BibTeX file
+            check_dois: Whether to verify DOIs (slow)
+            similarity: Minimum title similarity for near-duplicate reports
+            jobs: Worker processes (0 for all CPUs)
+            
+        Returns:
+            Validation report dictionary
+        """
+        print(f'Indexing {filepath}...', file=sys.stderr)
+        try:
+            index = BibTeXIndex(filepath)
+        except OSError as e:
+            print(f'Error reading file: {e}', file=sys.stderr)
+            return {'total_entries': 0, 'errors': [], 'warnings': [], 'duplicates': []}
+        
+        with index:
+            total = len(index)
+            spans = list(zip((index.entry_type(position) for position in range(total)),
+                             index.offsets, index.lengths))
+            macros = index.macros
+        
+        if not total:
+            return {'total_entries': 0, 'errors': [], 'warnings': [], 'duplicates': []}
+        
+        jobs = jobs or os.cpu_count() or 1
+        # Several shards per worker keeps the pool busy when shards are uneven
+        shard_size = max(1, -(-total // (jobs * 4)))
+        shards = [spans[start:start + shard_size] for start in range(0, total, shard_size)]
+        print(f'Validating {total} entries in {len(shards)} shards on {jobs} processes...',
+              file=sys.stderr)
+        
+        all_errors = []
+        all_warnings = []
+        records = []
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_shard_worker,
+                                 initargs=(filepath, macros)) as executor:
+            for done, (errors, warnings, shard_records) in enumerate(executor.map(_validate_shard, shards), 1):
+                all_errors.extend(errors)
+                all_warnings.extend(warnings)
+                records.extend(shard_records)
+                print(f'Validated shard {done}/{len(shards)}', file=sys.stderr)
+        
+        # Global duplicate pass over the compact records
+        print('Checking for duplicates...', file=sys.stderr)
+        duplicates = self.detect_duplicates([
+            {'key': key, 'fields': {'doi': doi, 'title': title, 'author': author, 'year': year}}
+            for key, doi, title, author, year in records
+        ], similarity)
+        
+        if check_dois:
+            print('Verifying DOIs...', file=sys.stderr)
+            all_errors.extend(self.check_dois([(key, doi) for key, doi, *_ in records]))
+        
+        return {
+            'filepath': filepath,
+            'total_entries': len(records),
+            'valid_entries': len(records) - len([e for e in all_errors if e['severity'] == 'high']),
+            'errors': all_errors,
+            'warnings': all_warnings,
+            'duplicates': duplicates
+        }
+    
     def _extract_year_crossref(self, message: Dict) -> str:
         """Extract year from CrossRef message."""
         date_parts = message.get('published-print', {}).get('date-parts', [[]])
@@ -402,6 +660,104 @@ class CitationValidator:
         return ', '.join(formatted)
 
 
+# Per-process state for validate_file_parallel workers
+_shard_state = {}
+
+
+def _init_shard_worker(filepath: str, macros: Dict[str, str]) -> None:
+    """Open the file and create a validator once per worker process."""
+    _shard_state['file'] = open(filepath, 'rb')
+    try:
+        _shard_state['buf'] = mmap.mmap(_shard_state['file'].fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:
+        _shard_state['buf'] = b''
+    _shard_state['macros'] = macros
+    _shard_state['validator'] = CitationValidator(cache_dir=None)
+
+
+def _validate_shard(spans: List[Tuple[str, int, int]]) -> Tuple[List[Dict], List[Dict], List[Tuple]]:
+    """
+    Parse and validate one shard of entry spans.
+    
+    Args:
+        spans: List of (entry type, byte offset, length)
+        
+    Returns:
+        Tuple of (errors, warnings, [(key, doi, title, author, year), ...])
+    """
+    buf = _shard_state['buf']
+    validator = _shard_state['validator']
+    all_errors, all_warnings, records = [], [], []
+    
+    for entry_type, offset, length in spans:
+        try:
+            entry = parse_entry(entry_type, buf[offset:offset + length], offset, _shard_state['macros'])
+        except BibTeXSyntaxError as e:
+            print(f'Warning: skipping malformed entry at byte {offset}: {e}', file=sys.stderr)
+            continue
+        
+        errors, warnings = validator.validate_entry(entry)
+        for error in errors:
+            error['entry'] = entry['key']
+            all_errors.append(error)
+        for warning in warnings:
+            warning['entry'] = entry['key']
+            all_warnings.append(warning)
+        
+        fields = entry['fields']
+        records.append((entry['key'], fields.get('doi', ''), fields.get('title', ''),
+                        fields.get('author', ''), fields.get('year')))
+    
+    return all_errors, all_warnings, records
+
+
+def print_report(report: Dict, verbose: bool = False) -> None:
+    """Print a validation report summary."""
+    print('\n' + '='*60)
+    print('CITATION VALIDATION REPORT')
+    print('='*60)
+    print(f'\nFile: {report["filepath"]}')
+    print(f'Total entries: {report["total_entries"]}')
+    print(f'Valid entries: {report["valid_entries"]}')
+    print(f'Errors: {len(report["errors"])}')
+    print(f'Warnings: {len(report["warnings"])}')
+    print(f'Duplicates: {len(report["duplicates"])}')
+    
+    # Print errors
+    if report['errors']:
+        print('\n' + '-'*60)
+        print('ERRORS (must fix):')
+        print('-'*60)
+        for error in report['errors']:
+            print(f'\n{error["message"]}')
+            if verbose:
+                print(f'  Type: {error["type"]}')
+                print(f'  Severity: {error["severity"]}')
+    
+    # Print warnings
+    if report['warnings'] and verbose:
+        print('\n' + '-'*60)
+        print('WARNINGS (should fix):')
+        print('-'*60)
+        for warning in report['warnings']:
+            print(f'\n{warning["message"]}')
+    
+    # Print duplicates
+    if report['duplicates']:
+        print('\n' + '-'*60)
+        print('DUPLICATES:')
+        print('-'*60)
+        for dup in report['duplicates']:
+            print(f'\n{dup["message"]}')
+
+
+def save_report(report: Dict, filepath: str) -> None:
+    """Save a validation report as JSON."""
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f'\nDetailed report saved to: {filepath}')
+
+
 def main():
     """Command-line interface."""
     parser = argparse.ArgumentParser(
@@ -437,55 +793,79 @@ def main():
         help='Show detailed output'
     )
     
+    parser.add_argument(
+        '--similarity',
+        type=float,
+        default=0.85,
+        help='Minimum title similarity (0-1) for near-duplicate reports (default: 0.85)'
+    )
+    
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help='Validate in parallel shards on this many processes (0 for all CPUs; default: 1)'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Re-parse the file instead of using the parsed-entry cache'
+    )
+    
+    parser.add_argument(
+        '--index',
+        action='store_true',
+        help='Stream entries through a memory-mapped index (for very large files)'
+    )
+    
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='Keep running and re-check only new or changed entries whenever the file is saved'
+    )
+    
+    parser.add_argument(
+        '--interval',
+        type=float,
+        default=1.0,
+        help='Seconds between checks in --watch mode when inotify is unavailable (default: 1)'
+    )
+    
     args = parser.parse_args()
     
-    # Validate file
-    validator = CitationValidator()
-    report = validator.validate_file(args.file, check_dois=args.check_dois)
+    if args.watch and (args.jobs != 1 or args.index):
+        parser.error('--watch cannot be combined with --jobs or --index')
     
-    # Print summary
-    print('\n' + '='*60)
-    print('CITATION VALIDATION REPORT')
-    print('='*60)
-    print(f'\nFile: {args.file}')
-    print(f'Total entries: {report["total_entries"]}')
-    print(f'Valid entries: {report["valid_entries"]}')
-    print(f'Errors: {len(report["errors"])}')
-    print(f'Warnings: {len(report["warnings"])}')
-    print(f'Duplicates: {len(report["duplicates"])}')
+    # Validate file
+    validator = CitationValidator(cache_dir=None if args.no_cache else DEFAULT_CACHE_DIR)
     
-    # Print errors
-    if report['errors']:
-        print('\n' + '-'*60)
-        print('ERRORS (must fix):')
-        print('-'*60)
-        for error in report['errors']:
-            print(f'\n{error["message"]}')
-            if args.verbose:
-                print(f'  Type: {error["type"]}')
-                print(f'  Severity: {error["severity"]}')
+    if args.watch:
+        def revalidate(changed):
+            report = validator.validate_file_incremental(args.file, check_dois=args.check_dois,
+                                                         similarity=args.similarity)
+            print(f'Re-checked {report["changed_entries"]} new or changed entries '
+                  f'({report["removed_entries"]} removed)', file=sys.stderr)
+            print_report(report, args.verbose)
+            if args.report:
+                save_report(report, args.report)
+        
+        watch_files([args.file], revalidate, interval=args.interval)
+        return
     
-    # Print warnings
-    if report['warnings'] and args.verbose:
-        print('\n' + '-'*60)
-        print('WARNINGS (should fix):')
-        print('-'*60)
-        for warning in report['warnings']:
-            print(f'\n{warning["message"]}')
+    if args.jobs != 1:
+        report = validator.validate_file_parallel(args.file, check_dois=args.check_dois,
+                                                  similarity=args.similarity, jobs=args.jobs)
+    else:
+        report = validator.validate_file(args.file, check_dois=args.check_dois, use_index=args.index,
+                                        similarity=args.similarity)
+    report.setdefault('filepath', args.file)
     
-    # Print duplicates
-    if report['duplicates']:
-        print('\n' + '-'*60)
-        print('DUPLICATES:')
-        print('-'*60)
-        for dup in report['duplicates']:
-            print(f'\n{dup["message"]}')
+    print_report(report, args.verbose)
     
     # Save report
     if args.report:
-        with open(args.report, 'w', encoding='utf-8') as f:
-            json.dump(report, f, indent=2)
-        print(f'\nDetailed report saved to: {args.report}')
+        save_report(report, args.report)
     
     # Exit with error code if there are errors
     if report['errors']:
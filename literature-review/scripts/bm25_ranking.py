@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+BM25F Relevance Ranking
+Rank literature search results against a query locally, so results merged
+from different databases are scored on the same scale.
+"""
+
+import os
+import json
+import math
+import re
+import heapq
+import sqlite3
+import unicodedata
+import zlib
+from array import array
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Field weights and length normalization (b) for BM25F
+FIELD_WEIGHTS = {'title': 2.5, 'keywords': 1.5, 'abstract': 1.0}
+FIELD_B = {'title': 0.5, 'keywords': 0.5, 'abstract': 0.75}
+K1 = 1.2
+
+TOKEN = re.compile(r'[a-z0-9]+')
+
+INDEX_SCHEMA = '''
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE columns (name TEXT PRIMARY KEY, typecode TEXT, data BLOB);
+CREATE TABLE postings (
+    term TEXT, field TEXT, docs BLOB, counts BLOB,
+    PRIMARY KEY (term, field)
+) WITHOUT ROWID;
+'''
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'have', 'in', 'into', 'is',
+    'it', 'its', 'of', 'on', 'or', 'that', 'the', 'their', 'this', 'to', 'was', 'were', 'which', 'with'
+}
+
+
+def _fold(text: str) -> str:
+    """Lowercase and strip accents."""
+    text = text.lower()
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+        text = ''.join(c for c in text if not unicodedata.combining(c))
+    return text
+
+
+_stems: Dict[str, str] = {}
+
+
+def stem(token: str) -> str:
+    """Strip a plural ending ("proteins" -> "protein", "studies" -> "study")."""
+    stemmed = _stems.get(token)
+    if stemmed is None:
+        stemmed = token
+        if len(token) > 4 and token[-1] == 's' and token[-2] not in 'su' and token[-2:] != 'is':
+            stemmed = token[:-3] + 'y' if token.endswith('ies') else token[:-1]
+        _stems[token] = stemmed
+    return stemmed
+
+
+class _Terms(dict):
+    """Token -> term ('' for stopwords), filled on first lookup."""
+
+    def __missing__(self, token: str) -> str:
+        term = self[token] = '' if token in STOPWORDS else stem(token)
+        return term
+
+
+_terms = _Terms()
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into normalized terms.
+
+    Lowercases, folds accents, drops stopwords and strips plural endings,
+    so "Proteins" and "protein" match.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of terms, in order
+    """
+    return [stem(token) for token in TOKEN.findall(_fold(text)) if token not in STOPWORDS]
+
+
+def term_counts(text: str) -> Dict[str, int]:
+    """
+    Count the normalized terms of a text (see tokenize).
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        Dictionary of term to number of occurrences
+    """
+    # One cached dictionary lookup per token, counted in C
+    counts = Counter(map(_terms.__getitem__, TOKEN.findall(_fold(text))))
+    counts.pop('', None)
+    return counts
+
+
+def _field_text(result: Dict, field: str) -> str:
+    value = result.get(field) or ''
+    if isinstance(value, (list, tuple)):
+        return ' '.join(str(item) for item in value)
+    return str(value)
+
+
+class _StoredPostings:
+    """Postings of one field of a saved index, read per term on first use."""
+
+    def __init__(self, connection: sqlite3.Connection, field: str):
+        self._connection = connection
+        self._field = field
+        self._cache: Dict[str, Optional[Tuple[array, array]]] = {}
+
+    def get(self, term: str) -> Optional[Tuple[array, array]]:
+        if term not in self._cache:
+            row = self._connection.execute('SELECT docs, counts FROM postings WHERE term = ? AND field = ?',
+                                           (term, self._field)).fetchone()
+            self._cache[term] = (array('I', zlib.decompress(row[0])),
+                                 array('H', zlib.decompress(row[1]))) if row else None
+        return self._cache[term]
+
+
+class BM25Index:
+    """Inverted index over title, abstract and keywords with BM25F scoring."""
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, k1: float = K1,
+                 terms: Optional[Iterable[str]] = None):
+        """
+        Initialize index.
+
+        Args:
+            weights: Field name to weight (default: title 2.5, keywords 1.5,
+                abstract 1.0)
+            k1: Term frequency saturation
+            terms: Index only these terms (already tokenized). Ranking one
+                stream against a known query then keeps only the query's
+                postings and the field lengths.
+        """
+        self.weights = dict(weights or FIELD_WEIGHTS)
+        self.k1 = k1
+        self.terms: Optional[Set[str]] = set(terms) if terms is not None else None
+        # Spellings of the indexed terms, found with one regex scan per field
+        # instead of tokenizing every word
+        self._spellings: Dict[str, str] = {}
+        for term in self.terms or ():
+            for spelling in (term, term + 's', term[:-1] + 'ies' if term.endswith('y') else term):
+                if stem(spelling) == term:
+                    self._spellings[spelling] = term
+        self._matcher = None
+        if self._spellings:
+            alternatives = '|'.join(sorted(map(re.escape, self._spellings), key=len, reverse=True))
+            self._matcher = re.compile(rf'(?<![a-z0-9])(?:{alternatives})(?![a-z0-9])')
+
+        # Per field: term -> (document ids, term frequencies)
+        self.postings: Dict[str, Dict[str, Tuple[array, array]]] = {field: {} for field in self.weights}
+        self.lengths: Dict[str, array] = {field: array('I') for field in self.weights}
+        self.years = array('H')
+        self.citations = array('I')
+        self._norms: Optional[Dict[str, List[float]]] = None
+
+        # Values saved with the index (see save and load)
+        self.meta: Dict = {}
+        self.columns: Dict[str, array] = {}
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def __len__(self) -> int:
+        return len(self.years)
+
+    def add(self, result: Dict) -> int:
+        """
+        Index one search result.
+
+        Args:
+            result: Search result with title, abstract and/or keywords
+
+        Returns:
+            Document id (position in insertion order)
+        """
+        if self._connection is not None:
+            raise ValueError('an index opened with load() is read-only')
+        doc = len(self.years)
+        for field, postings in self.postings.items():
+            text = _fold(_field_text(result, field))
+            # Field length in words, for length normalization
+            self.lengths[field].append(len(text.split()))
+
+            counts: Dict[str, int] = {}
+            if self.terms is not None:
+                if self._matcher is not None:
+                    for spelling in self._matcher.findall(text):
+                        term = self._spellings[spelling]
+                        counts[term] = counts.get(term, 0) + 1
+            else:
+                counts = term_counts(text)
+
+            for token, count in counts.items():
+                entry = postings.get(token)
+                if entry is None:
+                    entry = postings[token] = (array('I'), array('H'))
+                entry[0].append(doc)
+                entry[1].append(count if count < 65535 else 65535)
+
+        match = re.search(r'\d{4}', str(result.get('year') or ''))
+        self.years.append(int(match.group()) if match else 0)
+        try:
+            self.citations.append(max(0, int(result.get('citations') or 0)))
+        except (ValueError, TypeError):
+            self.citations.append(0)
+
+        self._norms = None
+        return doc
+
+    def save(self, path: str, meta: Optional[Dict] = None, columns: Optional[Dict[str, array]] = None):
+        """
+        Write the index to a SQLite file, replacing any previous one atomically.
+
+        Postings are stored as one compressed blob per term and field, so
+        a loaded index reads only the postings of the terms it is queried
+        for.
+
+        Args:
+            path: Index file
+            meta: JSON-serializable values to keep with the index (e.g. a
+                fingerprint of the indexed file)
+            columns: Extra per-document arrays to keep with the index
+                (e.g. byte offsets)
+        """
+        temporary = f'{path}.{os.getpid()}.tmp'
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        info = {'weights': self.weights, 'k1': self.k1,
+                'terms': sorted(self.terms) if self.terms is not None else None, **(meta or {})}
+        stored = {'years': self.years, 'citations': self.citations, **(columns or {}),
+                  **{f'length:{field}': lengths for field, lengths in self.lengths.items()}}
+
+        connection = sqlite3.connect(temporary)
+        try:
+            connection.executescript(INDEX_SCHEMA)
+            connection.executemany('INSERT INTO meta VALUES (?, ?)',
+                                   ((key, json.dumps(value)) for key, value in info.items()))
+            connection.executemany('INSERT INTO columns VALUES (?, ?, ?)',
+                                   ((name, values.typecode, values.tobytes()) for name, values in stored.items()))
+            connection.executemany('INSERT INTO postings VALUES (?, ?, ?, ?)',
+                                   ((term, field, zlib.compress(docs.tobytes(), 1),
+                                     zlib.compress(counts.tobytes(), 1))
+                                    for field, postings in self.postings.items()
+                                    for term, (docs, counts) in postings.items()))
+            connection.commit()
+        except BaseException:
+            connection.close()
+            os.remove(temporary)
+            raise
+        connection.close()
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'BM25Index':
+        """
+        Open an index written by save().
+
+        Field lengths, years and citations are read at once; postings are
+        read per query term on first use. The loaded index is read-only.
+
+        Args:
+            path: Index file
+
+        Returns:
+            Index, with the saved meta values and extra columns in .meta
+            and .columns
+        """
+        connection = sqlite3.connect(Path(path).resolve().as_uri() + '?mode=ro', uri=True)
+        meta = {key: json.loads(value) for key, value in connection.execute('SELECT key, value FROM meta')}
+        columns = {name: array(typecode, data)
+                   for name, typecode, data in connection.execute('SELECT name, typecode, data FROM columns')}
+
+        index = cls(meta.pop('weights'), meta.pop('k1'), meta.pop('terms'))
+        index.years = columns.pop('years')
+        index.citations = columns.pop('citations')
+        index.lengths = {field: columns.pop(f'length:{field}') for field in index.weights}
+        index.postings = {field: _StoredPostings(connection, field) for field in index.weights}
+        index.meta = meta
+        index.columns = columns
+        index._connection = connection
+        return index
+
+    def _field_norms(self) -> Dict[str, List[float]]:
+        """Per-document weight / length normalization for each field (cached until the next add)."""
+        if self._norms is None:
+            self._norms = {}
+            for field, lengths in self.lengths.items():
+                average = (sum(lengths) / len(lengths)) if lengths else 0.0
+                b = FIELD_B.get(field, 0.75)
+                weight = self.weights[field]
+                if average:
+                    self._norms[field] = [weight / (1 - b + b * length / average) for length in lengths]
+                else:
+                    self._norms[field] = [weight] * len(lengths)
+        return self._norms
+
+    def scores(self, query: str) -> Dict[int, float]:
+        """
+        Compute BM25F scores for every document matching the query.
+
+        Args:
+            query: Query text
+
+        Returns:
+            Dictionary of document id to score (documents without any query
+            term are omitted)
+        """
+        norms = self._field_norms()
+        total = len(self)
+        scores: Dict[int, float] = {}
+
+        for term in dict.fromkeys(tokenize(query)):
+            # Field-weighted pseudo term frequency per document
+            frequencies: Dict[int, float] = {}
+            for field, postings in self.postings.items():
+                entry = postings.get(term)
+                if entry is None:
+                    continue
+                field_norms = norms[field]
+                for doc, count in zip(*entry):
+                    frequencies[doc] = frequencies.get(doc, 0.0) + count * field_norms[doc]
+            if not frequencies:
+                continue
+
+            df = len(frequencies)
+            idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+            k1 = self.k1
+            for doc, frequency in frequencies.items():
+                scores[doc] = scores.get(doc, 0.0) + idf * frequency / (k1 + frequency)
+
+        return scores
+
+    def search(self, query: str, top_k: Optional[int] = None, recency_weight: float = 0.0,
+               citation_weight: float = 0.0, half_life: float = 5.0) -> List[Tuple[int, float]]:
+        """
+        Rank documents against a query.
+
+        Optional priors are added to the BM25F score: recency_weight *
+        0.5 ** (age / half_life) for documents with a year, and
+        citation_weight * log(1 + citations).
+
+        Args:
+            query: Query text
+            top_k: Return only the best k (heap selection); None for all matches
+            recency_weight: Weight of the recency prior
+            citation_weight: Weight of the citation prior
+            half_life: Years after which the recency prior halves
+
+        Returns:
+            List of (document id, score), best first; ties keep insertion order
+        """
+        scores = self.scores(query)
+
+        if recency_weight or citation_weight:
+            current_year = datetime.now().year
+            years, citations = self.years, self.citations
+            for doc in scores:
+                if recency_weight and years[doc]:
+                    scores[doc] += recency_weight * 0.5 ** (max(0, current_year - years[doc]) / half_life)
+                if citation_weight:
+                    scores[doc] += citation_weight * math.log1p(citations[doc])
+
+        if top_k is not None:
+            return heapq.nlargest(top_k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Citation Impact Normalization
+Turn raw citation counts into percentile ranks within (field, publication
+year) cohorts, so old papers and heavily cited fields do not dominate a
+ranking. Baselines come from the result set itself or from cached OpenAlex
+citation distributions.
+"""
+
+import os
+import sys
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from search_statistics import ResultColumns
+
+# Reuse the rate-limited client from the openalex-database skill when installed alongside
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'openalex-database' / 'scripts'))
+try:
+    from openalex_client import OpenAlexClient
+except ImportError:
+    OpenAlexClient = None
+
+BASELINES = ('results', 'openalex')
+
+# Cohorts smaller than this fall back to the year cohort, then to all results
+MIN_COHORT = 20
+
+DEFAULT_BASELINE_CACHE = os.path.join(
+    os.getenv('LITERATURE_LIBRARY_DIR', os.path.expanduser('~/.cache/literature-review')),
+    'citation_baselines.json'
+)
+
+# Cached OpenAlex distributions are refetched after this many days
+BASELINE_MAX_AGE_DAYS = 30
+
+# Citation counts are below this, so (cohort, citations) packs into one int64 key
+KEY_STRIDE = 1 << 32
+
+
+def cohort_percentiles(cohorts: np.ndarray, citations: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Percentile rank of every record's citations within its cohort, in one sort.
+
+    Uses the mid-rank definition: 100 * (papers with fewer citations + half
+    of the papers with as many) / cohort size, so ties share a percentile.
+
+    Args:
+        cohorts: Cohort code per record (-1 for none)
+        citations: Citation count per record (-1 if unknown)
+
+    Returns:
+        Tuple of (percentile per record, NaN where unranked; cohort size per
+        record, 0 where unranked)
+    """
+    percentiles = np.full(len(cohorts), np.nan)
+    sizes = np.zeros(len(cohorts), dtype=np.int64)
+
+    members = np.flatnonzero((cohorts >= 0) & (citations >= 0))
+    if not len(members):
+        return percentiles, sizes
+    members = members[np.lexsort((citations[members], cohorts[members]))]
+    cohort, count = cohorts[members], citations[members]
+
+    position = np.arange(len(members))
+    new_cohort = np.concatenate([[True], cohort[1:] != cohort[:-1]])
+    new_run = new_cohort | np.concatenate([[True], count[1:] != count[:-1]])
+    cohort_start = np.maximum.accumulate(np.where(new_cohort, position, 0))
+    run_start = np.maximum.accumulate(np.where(new_run, position, 0))
+
+    cohort_id = np.cumsum(new_cohort) - 1
+    run_id = np.cumsum(new_run) - 1
+    size = np.bincount(cohort_id)[cohort_id]
+    ties = np.bincount(run_id)[run_id]
+
+    percentiles[members] = 100 * ((run_start - cohort_start) + 0.5 * ties) / size
+    sizes[members] = size
+    return percentiles, sizes
+
+
+def primary_fields(columns: ResultColumns) -> np.ndarray:
+    """First listed field of study per record (-1 if none)."""
+    offsets, codes, _ = columns.fields
+    has_field = np.diff(offsets) > 0
+    first = np.full(len(columns), -1, dtype=np.int64)
+    first[has_field] = codes[offsets[:-1][has_field]]
+    return first
+
+
+def result_set_percentiles(columns: ResultColumns, min_cohort: int = MIN_COHORT) -> np.ndarray:
+    """
+    Citation percentiles with the result set itself as the baseline.
+
+    Records are ranked within their (field, year) cohort; when that has
+    fewer than min_cohort ranked records, within their year, then within
+    all results.
+
+    Args:
+        columns: Result columns
+        min_cohort: Minimum cohort size
+
+    Returns:
+        Percentile per record (NaN if the citation count is unknown)
+    """
+    years, citations = columns.years, columns.citations
+    fields = primary_fields(columns)
+    known_year = years > 0
+
+    field_year = np.where(known_year & (fields >= 0), fields * 10000 + years, -1)
+    by_field_year, field_year_sizes = cohort_percentiles(field_year, citations)
+    by_year, year_sizes = cohort_percentiles(np.where(known_year, years, -1), citations)
+    overall, _ = cohort_percentiles(np.zeros(len(columns), dtype=np.int64), citations)
+
+    return np.where(field_year_sizes >= min_cohort, by_field_year,
+                    np.where(year_sizes >= min_cohort, by_year, overall))
+
+
+class OpenAlexBaselines:
+    """Citation distributions of (field, year) cohorts from OpenAlex group_by, cached on disk."""
+
+    def __init__(self, cache_path: str = DEFAULT_BASELINE_CACHE, client=None,
+                 max_age_days: float = BASELINE_MAX_AGE_DAYS):
+        """
+        Initialize baselines.
+
+        Args:
+            cache_path: JSON cache of fetched distributions
+            client: OpenAlexClient to use (default: a new one)
+            max_age_days: Refetch cached distributions older than this
+        """
+        if client is None:
+            if OpenAlexClient is None:
+                raise ImportError('openalex_client from the openalex-database skill is required for '
+                                  'OpenAlex baselines')
+            client = OpenAlexClient()
+        self.client = client
+        self.cache_path = cache_path
+        self.max_age = max_age_days * 86400
+        self._cache = self._load()
+        self._fields: Optional[Dict[str, str]] = None
+
+    def _load(self) -> Dict:
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def save(self) -> None:
+        """Write fetched distributions to the cache file."""
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+            temp_path = f'{self.cache_path}.{os.getpid()}.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._cache, f)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            print(f'Warning: could not write baseline cache {self.cache_path}: {e}', file=sys.stderr)
+
+    def _fresh(self, key: str) -> Optional[Dict]:
+        entry = self._cache.get(key)
+        if entry and time.time() - entry['fetched'] < self.max_age:
+            return entry
+        return None
+
+    def field_ids(self) -> Dict[str, str]:
+        """OpenAlex field display names (casefolded) to field ids."""
+        if self._fields is None:
+            entry = self._fresh('fields')
+            if entry is None:
+                entry = self._cache['fields'] = {
+                    'fetched': time.time(),
+                    'ids': {field['display_name'].casefold(): field['id'].rsplit('/', 1)[-1]
+                            for field in self.client.paginate_all('/fields')}
+                }
+                self.save()
+            self._fields = entry['ids']
+        return self._fields
+
+    def distribution(self, field_id: str, year: int) -> Tuple[List[int], List[int]]:
+        """
+        Get the citation distribution of one cohort, fetching every
+        cited_by_count group on a cache miss (call save() to persist).
+
+        Args:
+            field_id: OpenAlex field id (e.g. '27' for Medicine)
+            year: Publication year
+
+        Returns:
+            Tuple of (citation counts ascending, number of works with each)
+        """
+        key = f'{field_id}|{year}'
+        entry = self._fresh(key)
+        if entry is None:
+            counts: Dict[int, int] = {}
+            groups = self.client.group_by('works', 'cited_by_count', {
+                'primary_topic.field.id': field_id,
+                'publication_year': year
+            }, all_groups=True)
+            for group in groups:
+                counts[int(group['key'])] = counts.get(int(group['key']), 0) + group['count']
+            values = sorted(counts)
+            entry = self._cache[key] = {'fetched': time.time(), 'citations': values,
+                                        'works': [counts[value] for value in values]}
+        return entry['citations'], entry['works']
+
+    def percentiles(self, columns: ResultColumns) -> np.ndarray:
+        """
+        Citation percentiles against the OpenAlex population of each record's cohort.
+
+        Distributions of all cohorts are concatenated into one sorted key
+        array, so every record is looked up with a single searchsorted.
+
+        Args:
+            columns: Result columns
+
+        Returns:
+            Percentile per record (NaN where the field is not an OpenAlex
+            field, the year or citation count is unknown, or the cohort is empty)
+        """
+        field_ids = self.field_ids()
+        labels = columns.fields[2]
+        label_ids = np.array([int(field_ids.get(label.casefold(), -1)) for label in labels] + [-1], dtype=np.int64)
+        fields = label_ids[primary_fields(columns)]
+        years, citations = columns.years, columns.citations
+
+        ranked = (fields >= 0) & (years > 0) & (citations >= 0)
+        cohort_keys = np.unique(fields[ranked] * 10000 + years[ranked])
+        keys, works, starts, totals = [], [], [], []
+        start = 0
+        try:
+            for index, cohort in enumerate(cohort_keys.tolist()):
+                values, counts = self.distribution(str(cohort // 10000), cohort % 10000)
+                keys.append(index * KEY_STRIDE + np.asarray(values, dtype=np.int64))
+                works.append(np.asarray(counts, dtype=np.int64))
+                starts.append(start)
+                totals.append(int(sum(counts)))
+                start += len(values)
+        finally:
+            self.save()
+
+        percentiles = np.full(len(columns), np.nan)
+        if not keys:
+            return percentiles
+        keys, works = np.concatenate(keys), np.concatenate(works)
+        before = np.concatenate([[0], np.cumsum(works)])
+        cohort_before = before[np.asarray(starts, dtype=np.int64)]
+        totals = np.asarray(totals, dtype=np.int64)
+
+        members = np.flatnonzero(ranked)
+        cohort = np.searchsorted(cohort_keys, fields[members] * 10000 + years[members])
+        lookup = cohort * KEY_STRIDE + np.minimum(citations[members], KEY_STRIDE - 1)
+        position = np.searchsorted(keys, lookup)
+        exact = (position < len(keys)) & (keys[np.minimum(position, len(keys) - 1)] == lookup)
+        ties = np.where(exact, works[np.minimum(position, len(keys) - 1)], 0)
+        fewer = before[position] - cohort_before[cohort]
+
+        valid = totals[cohort] > 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            values = 100 * (fewer + 0.5 * ties) / totals[cohort]
+        percentiles[members[valid]] = values[valid]
+        return percentiles
+
+
+def citation_percentiles(columns: ResultColumns, baseline: str = 'results', min_cohort: int = MIN_COHORT,
+                         baselines: Optional[OpenAlexBaselines] = None) -> np.ndarray:
+    """
+    Field- and year-normalized citation percentiles for every record.
+
+    Args:
+        columns: Result columns
+        baseline: 'results' (the result set itself) or 'openalex' (cached
+            OpenAlex cohort distributions; records without one fall back to
+            the result set)
+        min_cohort: Minimum result-set cohort size (see result_set_percentiles)
+        baselines: OpenAlexBaselines to use with baseline='openalex'
+
+    Returns:
+        Percentile per record (0-100; NaN if the citation count is unknown)
+    """
+    if baseline not in BASELINES:
+        raise ValueError(f'Unknown baseline: {baseline}')
+    percentiles = result_set_percentiles(columns, min_cohort)
+    if baseline == 'openalex':
+        external = (baselines or OpenAlexBaselines()).percentiles(columns)
+        percentiles = np.where(np.isnan(external), percentiles, external)
+    return percentiles
+
+
+def rank_by_impact(columns: ResultColumns, baseline: str = 'results',
+                   top_k: Optional[int] = None) -> List[Tuple[int, Optional[float]]]:
+    """
+    Order records by normalized citation impact.
+
+    Args:
+        columns: Result columns
+        baseline: 'results' or 'openalex' (see citation_percentiles)
+        top_k: Return only the best k
+
+    Returns:
+        List of (position, percentile rounded to 2 decimals or None), best
+        first; ties go to more raw citations, then input order. Records
+        with unknown citation counts come last.
+    """
+    percentiles = citation_percentiles(columns, baseline)
+    order = np.lexsort((-columns.citations, -np.nan_to_num(percentiles, nan=-1.0)))[:top_k]
+    return [(position, None if np.isnan(percentiles[position]) else round(float(percentiles[position]), 2))
+            for position in order.tolist()]
@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Record Linkage for Literature Search Results
+Cluster duplicate records from merged database exports (PubMed, OpenAlex,
+arXiv, Google Scholar, ...) and merge each cluster into one enriched record.
+"""
+
+import re
+import json
+import sys
+import unicodedata
+from collections import Counter
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+# Share DOI and arXiv ID normalization with the citation-management skill when installed alongside
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'citation-management' / 'scripts'))
+try:
+    from crossref_bulk import normalize_doi
+    from near_duplicates import ARXIV_ID, SUBTITLE_SEPARATOR
+except ImportError:
+    # Standalone install: the same rules as citation-management
+    ARXIV_ID = re.compile(r'(\d{4}\.\d{4,5}|[a-z][a-z\-]*(?:\.[A-Z]{2})?/\d{7})(?:v\d+)?', re.IGNORECASE)
+    DOI_PREFIX = re.compile(r'^(?:https?://(?:dx\.)?doi\.org/|doi:)', re.IGNORECASE)
+    SUBTITLE_SEPARATOR = re.compile(r'\s*(?::|\s-{1,3}\s|\.\s)\s*')
+
+    def normalize_doi(doi: str) -> str:
+        """Normalize a DOI: strip resolver prefixes and whitespace, lowercase."""
+        return DOI_PREFIX.sub('', doi.strip()).strip().lower()
+
+# Records in blocks larger than this share only an uninformative key
+MAX_BLOCK_SIZE = 50
+
+# Minimum title similarity for records with compatible authors and years
+TITLE_THRESHOLD = 0.9
+
+# Without author information the titles must be almost identical
+TITLE_THRESHOLD_NO_AUTHOR = 0.97
+
+# Preprint servers: a preprint DOI may differ from the published version's DOI
+PREPRINT_DOI_PREFIXES = ('10.48550/', '10.1101/', '10.2139/ssrn', '10.21203/rs.', '10.20944/preprints',
+                         '10.31234/', '10.31219/', '10.36227/techrxiv')
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'by', 'for', 'from', 'in', 'into', 'is', 'of', 'on', 'or',
+    'the', 'to', 'via', 'with', 'using', 'based', 'study', 'analysis'
+}
+
+NON_WORD = re.compile(r'[^\w\s]')
+AUTHOR_SEPARATOR = re.compile(r'\s*;\s*|\s+and\s+|\s*&\s*')
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, strip accents, braces and punctuation, and collapse whitespace."""
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+        text = ''.join(c for c in text if not unicodedata.combining(c))
+    text = NON_WORD.sub(' ', text.replace('{', '').replace('}', '').lower())
+    return ' '.join(text.split())
+
+
+def is_preprint_doi(doi: str) -> bool:
+    """Check whether a normalized DOI belongs to a preprint server."""
+    return doi.startswith(PREPRINT_DOI_PREFIXES)
+
+
+def first_author_names(result: Dict) -> Set[str]:
+    """
+    Get the normalized name tokens of a record's first author.
+
+    Handles "Smith J, Doe A", "Smith, John and Doe, Jane", "John Smith; Jane
+    Doe" and author lists. Initials are dropped, so the surname survives
+    whichever order the source wrote the name in.
+
+    Args:
+        result: Search result
+
+    Returns:
+        Set of name tokens (empty if there is no author)
+    """
+    authors = result.get('first_author') or result.get('authors') or ''
+    if isinstance(authors, list):
+        authors = authors[0] if authors else ''
+    if isinstance(authors, dict):
+        authors = authors.get('name') or ' '.join(filter(None, [authors.get('given'), authors.get('family')]))
+    if not isinstance(authors, str):
+        return set()
+
+    first = AUTHOR_SEPARATOR.split(authors.strip(), maxsplit=1)[0]
+    parts = first.split(',')
+    # "Smith, John": surname and given names; "Smith J, Doe A": the first author is "Smith J"
+    name = ' '.join(parts[:2]) if len(parts) > 1 and len(parts[0].split()) == 1 else parts[0]
+    return {token for token in normalize_text(name).split() if len(token) > 1 and token != 'et' and token != 'al'}
+
+
+def record_identifiers(result: Dict) -> Dict[str, str]:
+    """
+    Extract exact identifiers from a search result.
+
+    Args:
+        result: Search result
+
+    Returns:
+        Dictionary with any of doi, pmid and arxiv keys
+    """
+    identifiers = {}
+    doi = normalize_doi(str(result.get('doi') or ''))
+    if doi.startswith('10.48550/arxiv.'):
+        identifiers['arxiv'] = doi[len('10.48550/arxiv.'):]
+    if doi:
+        identifiers['doi'] = doi
+
+    pmid = str(result.get('pmid') or '').strip()
+    if pmid.isdigit():
+        identifiers['pmid'] = pmid
+
+    if 'arxiv' not in identifiers:
+        url = str(result.get('url') or '')
+        candidates = [result.get('arxiv_id'), result.get('arxiv'), url if 'arxiv.org' in url else '']
+        for value in candidates:
+            if value:
+                match = ARXIV_ID.search(str(value))
+                if match:
+                    identifiers['arxiv'] = match.group(1).lower()
+                    break
+
+    return identifiers
+
+
+def _year(result: Dict) -> Optional[int]:
+    match = re.search(r'\d{4}', str(result.get('year') or ''))
+    return int(match.group()) if match else None
+
+
+class RecordLinker:
+    """Blocking, pairwise scoring and union-find clustering of search results."""
+
+    def __init__(self, threshold: float = TITLE_THRESHOLD, max_block_size: int = MAX_BLOCK_SIZE):
+        """
+        Initialize linker.
+
+        Args:
+            threshold: Minimum title similarity to link two records
+            max_block_size: Blocks with more records than this are skipped
+        """
+        self.threshold = threshold
+        self.max_block_size = max_block_size
+        self.comparisons = 0
+
+    def _prepare(self, results: List[Dict]) -> List[Dict]:
+        """Normalize the fields used for blocking and scoring, once per record."""
+        records = []
+        for result in results:
+            raw_title = str(result.get('title') or '')
+            title = normalize_text(raw_title)
+            tokens = [token for token in title.split() if token not in STOPWORDS]
+            main = normalize_text(SUBTITLE_SEPARATOR.split(raw_title, maxsplit=1)[0])
+            records.append({
+                'title': title,
+                # Title without subtitle, if it is long enough to identify the work
+                'main': main if len(main.split()) >= 4 else title,
+                'tokens': set(tokens),
+                'names': first_author_names(result),
+                'year': _year(result),
+                'ids': record_identifiers(result)
+            })
+        return records
+
+    def _blocks(self, records: List[Dict]) -> Dict[Tuple, List[int]]:
+        """
+        Assign each record to blocking keys.
+
+        Keys are the normalized title without subtitle, (author name token,
+        each of the two rarest title tokens) and (year, two rarest title
+        tokens), so casing, punctuation and subtitle variants, titles with
+        one changed word, preprint/published pairs with a changed year, and
+        records with differently formatted authors share at least one block.
+        """
+        frequency = Counter(token for record in records for token in record['tokens'])
+        blocks: Dict[Tuple, List[int]] = {}
+
+        for position, record in enumerate(records):
+            if not record['title']:
+                continue
+            keys = [('title', record['main'])]
+            rare = sorted(record['tokens'], key=lambda token: (frequency[token], token))[:2]
+            if rare:
+                keys.extend(('author', name, token) for name in record['names'] for token in rare)
+                if record['year'] is not None:
+                    keys.append(('year', record['year'], *rare))
+            for key in keys:
+                blocks.setdefault(key, []).append(position)
+
+        return blocks
+
+    def score(self, first: Dict, second: Dict) -> float:
+        """
+        Score a candidate pair of prepared records.
+
+        Args:
+            first: Prepared record
+            second: Prepared record
+
+        Returns:
+            Title similarity in [0, 1] if the records are compatible, else 0
+        """
+        self.comparisons += 1
+        if first['year'] is not None and second['year'] is not None and abs(first['year'] - second['year']) > 1:
+            return 0.0
+        if first['names'] and second['names'] and not first['names'] & second['names']:
+            return 0.0
+
+        first_doi, second_doi = first['ids'].get('doi'), second['ids'].get('doi')
+        if first_doi and second_doi and first_doi != second_doi \
+                and not (is_preprint_doi(first_doi) or is_preprint_doi(second_doi)):
+            # Two published DOIs: different works (e.g. a paper and its erratum)
+            return 0.0
+
+        if first['title'] == second['title']:
+            similarity = 1.0
+        elif first['main'] == second['main'] and first['names'] and second['names']:
+            # Same title with a different or missing subtitle
+            similarity = self.threshold
+        else:
+            # Token overlap bounds the edit similarity cheaply
+            union = len(first['tokens'] | second['tokens'])
+            if union and len(first['tokens'] & second['tokens']) / union < 0.5:
+                return 0.0
+            similarity = SequenceMatcher(None, first['title'], second['title'], autojunk=False).ratio()
+
+        needed = self.threshold if first['names'] and second['names'] else max(self.threshold,
+                                                                                TITLE_THRESHOLD_NO_AUTHOR)
+        return similarity if similarity >= needed else 0.0
+
+    def link(self, results: List[Dict]) -> List[List[int]]:
+        """
+        Cluster duplicate records.
+
+        Records sharing a DOI, PMID or arXiv ID are linked directly; other
+        candidate pairs come from blocks and are linked when their score
+        passes the threshold. A cluster never joins two different published
+        DOIs.
+
+        Args:
+            results: Search results
+
+        Returns:
+            Clusters as lists of positions, ordered by first appearance
+        """
+        records = self._prepare(results)
+        parent = list(range(len(records)))
+        dois: List[Set[str]] = [
+            {record['ids']['doi']} if record['ids'].get('doi') and not is_preprint_doi(record['ids']['doi'])
+            else set()
+            for record in records
+        ]
+
+        def find(item: int) -> int:
+            while parent[item] != item:
+                parent[item] = parent[parent[item]]
+                item = parent[item]
+            return item
+
+        def union(item: int, other: int) -> None:
+            root, other_root = find(item), find(other)
+            if root == other_root:
+                return
+            if dois[root] and dois[other_root] and dois[root] != dois[other_root]:
+                return
+            if other_root < root:
+                root, other_root = other_root, root
+            parent[other_root] = root
+            dois[root] |= dois[other_root]
+
+        # Exact identifiers: hash join
+        first_seen: Dict[Tuple[str, str], int] = {}
+        for position, record in enumerate(records):
+            for name, value in record['ids'].items():
+                key = (name, value)
+                if key in first_seen:
+                    union(first_seen[key], position)
+                else:
+                    first_seen[key] = position
+
+        # Fuzzy matches within blocks
+        compared = set()
+        for members in self._blocks(records).values():
+            if len(members) < 2 or len(members) > self.max_block_size:
+                continue
+            for i, first in enumerate(members):
+                for second in members[i + 1:]:
+                    if (first, second) in compared or find(first) == find(second):
+                        continue
+                    compared.add((first, second))
+                    if self.score(records[first], records[second]):
+                        union(first, second)
+
+        clusters: Dict[int, List[int]] = {}
+        for position in range(len(records)):
+            clusters.setdefault(find(position), []).append(position)
+        return sorted(clusters.values(), key=lambda members: members[0])
+
+
+def _completeness(result: Dict) -> Tuple:
+    """Rank records for a cluster's primary: published, then most fields filled."""
+    doi = normalize_doi(str(result.get('doi') or ''))
+    published = bool(result.get('journal')) and not (doi and is_preprint_doi(doi))
+    return (published, sum(1 for value in result.values() if value not in (None, '', [], {})))
+
+
+def merge_cluster(results: List[Dict], members: List[int]) -> Dict:
+    """
+    Merge a cluster of duplicate records into one enriched record.
+
+    The most complete published record is the base; missing fields are
+    filled from the others, the longest abstract and highest citation
+    count are kept, and provenance lists every source record.
+
+    Args:
+        results: All search results
+        members: Positions of the cluster's records
+
+    Returns:
+        Merged record with sources and provenance
+    """
+    if len(members) == 1:
+        return results[members[0]]
+
+    ordered = sorted(members, key=lambda position: (_completeness(results[position]), -position), reverse=True)
+    merged = dict(results[ordered[0]])
+
+    for position in ordered[1:]:
+        for field, value in results[position].items():
+            if field in ('provenance', 'sources'):
+                continue
+            if merged.get(field) in (None, '', [], {}) and value not in (None, '', [], {}):
+                merged[field] = value
+
+    abstracts = [str(results[position].get('abstract') or '') for position in members]
+    if any(abstracts):
+        merged['abstract'] = max(abstracts, key=len)
+
+    citations = []
+    for position in members:
+        try:
+            citations.append(int(results[position].get('citations') or 0))
+        except (ValueError, TypeError):
+            pass
+    if citations and max(citations):
+        merged['citations'] = max(citations)
+
+    merged['sources'] = sorted({str(results[position].get('source', 'Unknown')) for position in members})
+    merged['provenance'] = [
+        {
+            'source': results[position].get('source', 'Unknown'),
+            'doi': results[position].get('doi', ''),
+            'title': results[position].get('title', ''),
+            'position': position
+        }
+        for position in members
+    ]
+    return merged
+
+
+def link_and_merge(results: List[Dict], threshold: float = TITLE_THRESHOLD) -> Tuple[List[Dict], Dict]:
+    """
+    Deduplicate search results by record linkage.
+
+    Args:
+        results: Search results
+        threshold: Minimum title similarity to link two records
+
+    Returns:
+        Tuple of (merged records in first-appearance order, statistics)
+    """
+    linker = RecordLinker(threshold=threshold)
+    clusters = linker.link(results)
+    merged = [merge_cluster(results, members) for members in clusters]
+    stats = {
+        'input_records': len(results),
+        'output_records': len(merged),
+        'duplicate_clusters': sum(1 for members in clusters if len(members) > 1),
+        'comparisons': linker.comparisons
+    }
+    return merged, stats
+
+
+def main():
+    """Command-line interface."""
+    if len(sys.argv) < 2:
+        print("Usage: python record_linkage.py <results.json> [output.json] [--threshold 0.9]")
+        sys.exit(1)
+
+    threshold = TITLE_THRESHOLD
+    args = sys.argv[1:]
+    if '--threshold' in args:
+        index = args.index('--threshold')
+        threshold = float(args[index + 1])
+        del args[index:index + 2]
+
+    with open(args[0], 'r', encoding='utf-8') as f:
+        results = json.load(f)
+
+    merged, stats = link_and_merge(results, threshold)
+    print(f"Merged {stats['input_records']} records into {stats['output_records']} "
+          f"({stats['duplicate_clusters']} duplicate clusters, {stats['comparisons']} comparisons)",
+          file=sys.stderr)
+
+    output = json.dumps(merged, indent=2)
+    if len(args) > 1:
+        with open(args[1], 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"✓ Results saved to: {args[1]}", file=sys.stderr)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -4,137 +4,300 @@ Literature Database Search Script
 Searches multiple literature databases and aggregates results.
 """
 
+import os
 import json
 import sys
-from typing import Dict, List
+import heapq
+import sqlite3
+import hashlib
+from array import array
+from itertools import islice
+from operator import itemgetter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime
 
+from bm25_ranking import BM25Index, tokenize
+from record_linkage import is_preprint_doi, link_and_merge, normalize_text, record_identifiers
+
+try:
+    from search_statistics import ColumnBuilder
+    from citation_impact import rank_by_impact
+    from topic_clusters import cluster_results, format_clusters
+except ImportError:
+    # numpy not installed: basic summary only, no impact ranking or topic clusters
+    ColumnBuilder = rank_by_impact = cluster_results = format_clusters = None
+
+# Output buffer for streamed writes
+WRITE_BUFFER = 1 << 20
+
+# Saved BM25F indexes of results files, so repeated relevance queries skip indexing
+INDEX_CACHE_DIR = os.path.join(
+    os.getenv('LITERATURE_LIBRARY_DIR', os.path.expanduser('~/.cache/literature-review')),
+    'bm25'
+)
+INDEX_VERSION = 1
+
 def format_search_results(results: List[Dict], output_format: str = 'json') -> str:
     """
     Format search results for output.
 
     Args:
         results: List of search results
-        output_format: Format (json, markdown, or bibtex)
+        output_format: Format (json, jsonl, markdown, or bibtex)
 
     Returns:
         Formatted string
     """
-    if output_format == 'json':
-        return json.dumps(results, indent=2)
+    return ''.join(iter_formatted_results(results, output_format, total=len(results)))
+
+def iter_formatted_results(results: Iterable[Dict], output_format: str = 'json',
+                           total: Optional[int] = None) -> Iterator[str]:
+    """
+    Format search results one at a time.
+
+    Args:
+        results: Search results (any iterable, e.g. a stream)
+        output_format: Format (json, jsonl, markdown, or bibtex)
+        total: Number of results for the markdown header; if unknown, the
+            count is written as a footer instead
 
-    elif output_format == 'markdown':
-        md = f"# Literature Search Results\n\n"
-        md += f"**Search Date**: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n"
-        md += f"**Total Results**: {len(results)}\n\n"
+    Yields:
+        Chunks of formatted output
+    """
+    if output_format not in ('json', 'jsonl', 'markdown', 'bibtex'):
+        raise ValueError(f"Unknown format: {output_format}")
 
-        for i, result in enumerate(results, 1):
-            md += f"## {i}. {result.get('title', 'Untitled')}\n\n"
-            md += f"**Authors**: {result.get('authors', 'Unknown')}\n\n"
-            md += f"**Year**: {result.get('year', 'N/A')}\n\n"
-            md += f"**Source**: {result.get('source', 'Unknown')}\n\n"
+    if output_format == 'markdown':
+        yield f"# Literature Search Results\n\n"
+        yield f"**Search Date**: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n"
+        if total is not None:
+            yield f"**Total Results**: {total}\n\n"
+        else:
+            yield "\n"
+
+    count = 0
+    for count, result in enumerate(results, 1):
+        if output_format == 'json':
+            # Same layout as json.dumps(results, indent=2)
+            item = json.dumps(result, indent=2).replace('\n', '\n  ')
+            yield f"{'[' if count == 1 else ','}\n  {item}"
+        elif output_format == 'jsonl':
+            yield json.dumps(result) + '\n'
+        elif output_format == 'markdown':
+            yield format_markdown_result(count, result)
+        else:
+            yield format_bibtex_result(result)
 
-            if result.get('abstract'):
-                md += f"**Abstract**: {result['abstract']}\n\n"
+    if output_format == 'json':
+        yield '\n]' if count else '[]'
+    elif output_format == 'markdown' and total is None:
+        yield f"**Total Results**: {count}\n"
 
-            if result.get('doi'):
-                md += f"**DOI**: [{result['doi']}](https://doi.org/{result['doi']})\n\n"
+def format_markdown_result(number: int, result: Dict) -> str:
+    """Format one search result as a markdown section."""
+    parts = [
+        f"## {number}. {result.get('title', 'Untitled')}\n\n",
+        f"**Authors**: {result.get('authors', 'Unknown')}\n\n",
+        f"**Year**: {result.get('year', 'N/A')}\n\n",
+        f"**Source**: {result.get('source', 'Unknown')}\n\n"
+    ]
 
-            if result.get('url'):
-                md += f"**URL**: {result['url']}\n\n"
+    if result.get('cluster'):
+        parts.append(f"**Topic**: {result['cluster']}. {result['cluster_label']}\n\n")
 
-            if result.get('citations'):
-                md += f"**Citations**: {result['citations']}\n\n"
+    if result.get('abstract'):
+        parts.append(f"**Abstract**: {result['abstract']}\n\n")
 
-            md += "---\n\n"
+    if result.get('doi'):
+        parts.append(f"**DOI**: [{result['doi']}](https://doi.org/{result['doi']})\n\n")
 
-        return md
+    if result.get('url'):
+        parts.append(f"**URL**: {result['url']}\n\n")
 
-    elif output_format == 'bibtex':
-        bibtex = ""
-        for i, result in enumerate(results, 1):
-            entry_type = result.get('type', 'article')
-            cite_key = f"{result.get('first_author', 'unknown')}{result.get('year', '0000')}"
+    if result.get('citations'):
+        parts.append(f"**Citations**: {result['citations']}\n\n")
 
-            bibtex += f"@{entry_type}{{{cite_key},\n"
-            bibtex += f"  title = {{{result.get('title', '')}}},\n"
-            bibtex += f"  author = {{{result.get('authors', '')}}},\n"
-            bibtex += f"  year = {{{result.get('year', '')}}},\n"
+    parts.append("---\n\n")
+    return ''.join(parts)
 
-            if result.get('journal'):
-                bibtex += f"  journal = {{{result['journal']}}},\n"
+def format_bibtex_result(result: Dict) -> str:
+    """Format one search result as a BibTeX entry."""
+    entry_type = result.get('type', 'article')
+    cite_key = f"{result.get('first_author', 'unknown')}{result.get('year', '0000')}"
 
-            if result.get('volume'):
-                bibtex += f"  volume = {{{result['volume']}}},\n"
+    parts = [
+        f"@{entry_type}{{{cite_key},\n",
+        f"  title = {{{result.get('title', '')}}},\n",
+        f"  author = {{{result.get('authors', '')}}},\n",
+        f"  year = {{{result.get('year', '')}}},\n"
+    ]
 
-            if result.get('pages'):
-                bibtex += f"  pages = {{{result['pages']}}},\n"
+    if result.get('journal'):
+        parts.append(f"  journal = {{{result['journal']}}},\n")
 
-            if result.get('doi'):
-                bibtex += f"  doi = {{{result['doi']}}},\n"
+    if result.get('volume'):
+        parts.append(f"  volume = {{{result['volume']}}},\n")
 
-            bibtex += "}\n\n"
+    if result.get('pages'):
+        parts.append(f"  pages = {{{result['pages']}}},\n")
 
-        return bibtex
+    if result.get('doi'):
+        parts.append(f"  doi = {{{result['doi']}}},\n")
 
-    else:
-        raise ValueError(f"Unknown format: {output_format}")
+    parts.append("}\n\n")
+    return ''.join(parts)
 
 def deduplicate_results(results: List[Dict]) -> List[Dict]:
     """
-    Remove duplicate results based on DOI or title.
+    Remove duplicate results by record linkage.
+
+    Records sharing a DOI, PMID or arXiv ID are merged, and so are records
+    whose normalized titles match closely with compatible first authors and
+    years (casing and punctuation variants, preprint/published pairs).
+    See record_linkage.py.
 
     Args:
         results: List of search results
 
     Returns:
-        Deduplicated list
+        Deduplicated list; merged records carry 'sources' and 'provenance'
     """
-    seen_dois = set()
-    seen_titles = set()
-    unique_results = []
-
-    for result in results:
-        doi = result.get('doi', '').lower().strip()
-        title = result.get('title', '').lower().strip()
+    merged, _ = link_and_merge(results)
+    return merged
 
-        # Check DOI first (more reliable)
-        if doi and doi in seen_dois:
-            continue
+def _rank_key(criteria: str) -> Callable[[Dict], object]:
+    """Get the descending sort key of a ranking criterion."""
+    if criteria == 'citations':
+        return lambda x: x.get('citations', 0)
+    elif criteria == 'year':
+        return lambda x: x.get('year', '0')
+    elif criteria == 'relevance':
+        return lambda x: x.get('relevance_score', 0)
+    return None
 
-        # Check title as fallback
-        if not doi and title in seen_titles:
-            continue
+def rank_results(results: List[Dict], criteria: str = 'citations', query: str = None,
+                 top_k: int = None, recency_weight: float = 0.0, citation_weight: float = 0.0,
+                 baseline: str = 'results', index: Optional[BM25Index] = None) -> List[Dict]:
+    """
+    Rank results by specified criteria.
 
-        # Add to results
-        if doi:
-            seen_dois.add(doi)
-        if title:
-            seen_titles.add(title)
+    With criteria='relevance' and a query, results are scored locally with
+    BM25F over title, keywords and abstract (see bm25_ranking.py), so
+    records from every source are ranked on the same scale; scores are
+    stored in 'relevance_score'. Without a query, a source-provided
+    'relevance_score' is used. Pass a full BM25Index of the same results
+    (see load_file_index) to query them repeatedly without re-indexing.
 
-        unique_results.append(result)
+    With criteria='impact', results are ranked by their citation percentile
+    within (field, year) cohorts instead of raw counts, so older papers and
+    heavily cited fields are not favored (see citation_impact.py);
+    percentiles are stored in 'citation_percentile'.
 
-    return unique_results
+    Args:
+        results: List of search results
+        criteria: Ranking criteria (citations, impact, year, relevance)
+        query: Query text for relevance ranking
+        top_k: Return only the best k results (heap selection, no full sort)
+        recency_weight: Weight of the recency prior for relevance ranking
+        citation_weight: Weight of the citation prior for relevance ranking
+        baseline: Cohort baseline for impact ranking ('results' or 'openalex')
+        index: Prebuilt index of exactly these results, in order
 
-def rank_results(results: List[Dict], criteria: str = 'citations') -> List[Dict]:
+    Returns:
+        Ranked list
     """
-    Rank results by specified criteria.
+    if criteria == 'relevance' and query:
+        if index is not None and len(index) != len(results):
+            raise ValueError(f'index covers {len(index)} results, not {len(results)}')
+        ranked = _bm25_order(results, query, top_k, recency_weight, citation_weight, index)
+        return [dict(results[position], relevance_score=round(score, 4)) for position, score in ranked]
+
+    if criteria == 'impact':
+        ranked = _impact_order(results, baseline, top_k)
+        return [dict(results[position], citation_percentile=percentile) for position, percentile in ranked]
+
+    key = _rank_key(criteria)
+    if key is None:
+        return results[:top_k] if top_k is not None else results
+    if top_k is not None:
+        return heapq.nlargest(top_k, results, key=key)
+    return sorted(results, key=key, reverse=True)
+
+def _bm25_order(results: Iterable[Dict], query: str, top_k: Optional[int], recency_weight: float,
+                citation_weight: float, index: Optional[BM25Index] = None) -> List[Tuple[int, float]]:
+    """Rank positions by BM25F score; results without any query term follow in input order."""
+    if index is None:
+        # One-off query: index only its terms
+        index = BM25Index(terms=tokenize(query))
+        for result in results:
+            index.add(result)
+
+    ranked = index.search(query, top_k, recency_weight=recency_weight, citation_weight=citation_weight)
+    if top_k is None or len(ranked) < top_k:
+        matched = {position for position, _ in ranked}
+        rest = (position for position in range(len(index)) if position not in matched)
+        limit = None if top_k is None else top_k - len(ranked)
+        ranked.extend((position, 0.0) for position in islice(rest, limit))
+    return ranked
+
+def load_file_index(results_file: str, results: Iterable[Dict], options: Dict,
+                    offsets: Optional[array] = None, cache_dir: str = INDEX_CACHE_DIR) -> BM25Index:
+    """
+    Load the saved full BM25F index of a results file, or build and save it.
+
+    The index covers every term, so later queries with other terms reuse
+    it. It is rebuilt when the file's size or modification time, or the
+    filtering options, change.
 
     Args:
-        results: List of search results
-        criteria: Ranking criteria (citations, year, relevance)
+        results_file: Results file the results were read from
+        results: The results, as filtered by options; only consumed when
+            the index has to be built
+        options: Filtering options that decide which results are indexed
+            (deduplication, year range)
+        offsets: Byte offset of each result; filled while building, saved
+            with the index and restored from it
+        cache_dir: Directory of saved indexes
 
     Returns:
-        Ranked list
+        Index of the results, in order
     """
-    if criteria == 'citations':
-        return sorted(results, key=lambda x: x.get('citations', 0), reverse=True)
-    elif criteria == 'year':
-        return sorted(results, key=lambda x: x.get('year', '0'), reverse=True)
-    elif criteria == 'relevance':
-        return sorted(results, key=lambda x: x.get('relevance_score', 0), reverse=True)
-    else:
-        return results
+    path = os.path.abspath(results_file)
+    stat = os.stat(path)
+    key = json.dumps({'file': path, **options}, sort_keys=True)
+    index_file = os.path.join(cache_dir, hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest() + '.sqlite')
+    fingerprint = {'version': INDEX_VERSION, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    try:
+        index = BM25Index.load(index_file)
+        if index.meta.get('fingerprint') == fingerprint and index.terms is None:
+            if offsets is not None:
+                offsets.extend(index.columns['offsets'])
+            return index
+    except (sqlite3.Error, KeyError, ValueError):
+        pass
+
+    index = BM25Index()
+    for result in results:
+        index.add(result)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        index.save(index_file, meta={'fingerprint': fingerprint},
+                   columns={'offsets': offsets} if offsets is not None else None)
+        print(f"Indexed {len(index)} results for relevance ranking: {index_file}", file=sys.stderr)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Warning: could not save the relevance index: {e}", file=sys.stderr)
+    return index
+
+def _impact_order(results: Iterable[Dict], baseline: str,
+                  top_k: Optional[int]) -> List[Tuple[int, Optional[float]]]:
+    """Rank positions by field- and year-normalized citation percentile."""
+    if rank_by_impact is None:
+        raise ImportError('numpy required for impact ranking. Install with: pip install numpy')
+    builder = ColumnBuilder()
+    for result in results:
+        builder.add(result)
+    return rank_by_impact(builder.build(), baseline, top_k)
 
 def filter_by_year(results: List[Dict], start_year: int = None, end_year: int = None) -> List[Dict]:
     """
@@ -148,86 +311,276 @@ def filter_by_year(results: List[Dict], start_year: int = None, end_year: int =
     Returns:
         Filtered list
     """
-    filtered = []
+    return list(iter_filter_by_year(results, start_year, end_year))
 
+def iter_filter_by_year(results: Iterable[Dict], start_year: int = None,
+                        end_year: int = None) -> Iterator[Dict]:
+    """Lazily filter results by publication year range (see filter_by_year)."""
     for result in results:
-        try:
-            year = int(result.get('year', 0))
-            if start_year and year < start_year:
-                continue
-            if end_year and year > end_year:
-                continue
-            filtered.append(result)
-        except (ValueError, TypeError):
-            # Include if year parsing fails
-            filtered.append(result)
+        if _in_year_range(result, start_year, end_year):
+            yield result
 
-    return filtered
-
-def generate_search_summary(results: List[Dict]) -> Dict:
+def _in_year_range(result: Dict, start_year: int = None, end_year: int = None) -> bool:
+    try:
+        year = int(result.get('year', 0))
+    except (ValueError, TypeError):
+        # Include if year parsing fails
+        return True
+    if start_year and year < start_year:
+        return False
+    if end_year and year > end_year:
+        return False
+    return True
+
+def generate_search_summary(results: Iterable[Dict]) -> Dict:
     """
     Generate summary statistics for search results.
 
+    With numpy installed, results are converted once to columns and the
+    summary adds citation percentiles per year and field, h-indices,
+    source overlap, and top venues and authors (see search_statistics.py).
+
     Args:
-        results: List of search results
+        results: Search results (any iterable)
 
     Returns:
         Summary dictionary
     """
-    summary = {
-        'total_results': len(results),
+    if ColumnBuilder is not None:
+        builder = ColumnBuilder()
+        for result in results:
+            builder.add(result)
+        return builder.build().summary()
+
+    summary = _new_summary()
+    for result in results:
+        _update_summary(summary, result)
+    return _finish_summary(summary)
+
+def _new_summary() -> Dict:
+    return {
+        'total_results': 0,
         'sources': {},
         'year_distribution': {},
         'avg_citations': 0,
-        'total_citations': 0
+        'total_citations': 0,
+        '_cited': 0
     }
 
-    citations = []
-
-    for result in results:
-        # Count by source
-        source = result.get('source', 'Unknown')
-        summary['sources'][source] = summary['sources'].get(source, 0) + 1
+def _update_summary(summary: Dict, result: Dict) -> None:
+    summary['total_results'] += 1
 
-        # Count by year
-        year = result.get('year', 'Unknown')
-        summary['year_distribution'][year] = summary['year_distribution'].get(year, 0) + 1
+    # Count by source
+    source = result.get('source', 'Unknown')
+    summary['sources'][source] = summary['sources'].get(source, 0) + 1
 
-        # Collect citations
-        if result.get('citations'):
-            try:
-                citations.append(int(result['citations']))
-            except (ValueError, TypeError):
-                pass
+    # Count by year
+    year = result.get('year', 'Unknown')
+    summary['year_distribution'][year] = summary['year_distribution'].get(year, 0) + 1
 
-    if citations:
-        summary['avg_citations'] = sum(citations) / len(citations)
-        summary['total_citations'] = sum(citations)
+    # Collect citations
+    if result.get('citations'):
+        try:
+            summary['total_citations'] += int(result['citations'])
+            summary['_cited'] += 1
+        except (ValueError, TypeError):
+            pass
 
+def _finish_summary(summary: Dict) -> Dict:
+    cited = summary.pop('_cited')
+    if cited:
+        summary['avg_citations'] = summary['total_citations'] / cited
     return summary
 
+def iter_jsonl(path: str) -> Iterator[Tuple[int, Dict]]:
+    """
+    Stream results from a JSON Lines file.
+
+    Args:
+        path: File with one JSON result per line
+
+    Yields:
+        Tuples of (byte offset of the line, result)
+    """
+    offset = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                yield offset, json.loads(line)
+            offset += len(line)
+
+def iter_unique_results(results: Iterable[Tuple[int, Dict]]) -> Iterator[Tuple[int, Dict]]:
+    """
+    Drop exact duplicates from a stream, keeping the first occurrence.
+
+    Only 8-byte digests are kept in memory: of each normalized DOI, PMID and
+    arXiv ID, and of normalized titles (at least four words) together with
+    the title's published DOI, so two papers with different DOIs are never
+    collapsed. Fuzzy matching (subtitles, one-word differences) needs the
+    in-memory record linker (deduplicate_results).
+
+    Args:
+        results: Stream of (offset, result)
+
+    Yields:
+        Unique (offset, result) tuples
+    """
+    seen_ids = set()
+    seen_titles: Dict[bytes, Optional[bytes]] = {}
+
+    for offset, result in results:
+        identifiers = record_identifiers(result)
+        ids = [_digest(f'{name}:{value}') for name, value in identifiers.items()]
+        if any(digest in seen_ids for digest in ids):
+            continue
+
+        doi = identifiers.get('doi')
+        doi = _digest(doi) if doi and not is_preprint_doi(doi) else None
+        title = normalize_text(str(result.get('title') or ''))
+        title = _digest(title) if len(title.split()) >= 4 else None
+        if title in seen_titles:
+            other = seen_titles[title]
+            if not (doi and other and doi != other):
+                continue
+
+        seen_ids.update(ids)
+        if title is not None and seen_titles.get(title) is None:
+            seen_titles[title] = doi
+        yield offset, result
+
+def _digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest()
+
+def stream_results(results_file: str, output, output_format: str = 'jsonl',
+                   deduplicate: bool = False, year_start: int = None, year_end: int = None,
+                   rank_criteria: str = None, summary: Optional[Dict] = None, query: str = None,
+                   top_k: int = None, recency_weight: float = 0.0, citation_weight: float = 0.0,
+                   baseline: str = 'results', index_cache: Optional[str] = INDEX_CACHE_DIR) -> int:
+    """
+    Process a JSON Lines results file in constant memory.
+
+    Filtering and formatting run as generators over the input. Ranking
+    keeps only (sort key, byte offset) pairs, the BM25F index for
+    relevance ranking (saved under index_cache, so later queries on the
+    same file only read the query terms' postings), or compact
+    year/field/citation columns for impact ranking, then re-reads each
+    result from its offset in ranked order.
+
+    Args:
+        results_file: JSON Lines input
+        output: Text file to write to
+        output_format: Format (json, jsonl, markdown, or bibtex)
+        deduplicate: Drop exact duplicates (see iter_unique_results)
+        year_start: Minimum year (inclusive)
+        year_end: Maximum year (inclusive)
+        rank_criteria: Ranking criteria (citations, impact, year, relevance)
+        summary: Dictionary to fill with summary statistics, if given
+        query: Query text for relevance ranking
+        top_k: Write only the best k results
+        recency_weight: Weight of the recency prior for relevance ranking
+        citation_weight: Weight of the citation prior for relevance ranking
+        baseline: Cohort baseline for impact ranking ('results' or 'openalex')
+        index_cache: Directory of saved relevance indexes; None indexes only
+            the query terms, without saving
+
+    Returns:
+        Number of results written
+    """
+    stream = iter_jsonl(results_file)
+    if deduplicate:
+        stream = iter_unique_results(stream)
+    if year_start or year_end:
+        stream = ((offset, result) for offset, result in stream
+                  if _in_year_range(result, year_start, year_end))
+
+    key = _rank_key(rank_criteria) if rank_criteria else None
+    order = None
+    score_field = 'relevance_score'
+    offsets = array('q')
+
+    def documents():
+        for offset, result in stream:
+            offsets.append(offset)
+            yield result
+
+    if rank_criteria == 'relevance' and query:
+        index = None
+        if index_cache:
+            options = {'mode': 'stream', 'deduplicate': deduplicate, 'year_start': year_start, 'year_end': year_end}
+            index = load_file_index(results_file, documents(), options, offsets, index_cache)
+        ranked = _bm25_order(documents(), query, top_k, recency_weight, citation_weight, index)
+        order = [(offsets[position], round(score, 4)) for position, score in ranked]
+    elif rank_criteria == 'impact':
+        ranked = _impact_order(documents(), baseline, top_k)
+        order = [(offsets[position], percentile) for position, percentile in ranked]
+        score_field = 'citation_percentile'
+    elif key is not None:
+        pairs = ((key(result), offset) for offset, result in stream)
+        if top_k is not None:
+            ranked = heapq.nlargest(top_k, pairs, key=itemgetter(0))
+        else:
+            ranked = sorted(pairs, key=itemgetter(0), reverse=True)
+        order = [(offset, None) for _, offset in ranked]
+
+    if order is not None:
+        results = _reread(results_file, order, score_field)
+    else:
+        results = islice((result for _, result in stream), top_k)
+
+    tally = _new_summary()
+    builder = ColumnBuilder() if summary is not None and ColumnBuilder is not None else None
+    for chunk in iter_formatted_results(_summarize(results, tally, builder), output_format):
+        output.write(chunk)
+    _finish_summary(tally)
+
+    if summary is not None:
+        summary.update(builder.build().summary() if builder is not None else tally)
+    return tally['total_results']
+
+def _reread(results_file: str, order: List[Tuple[int, Optional[float]]],
+            score_field: str = 'relevance_score') -> Iterator[Dict]:
+    """Read results back from their byte offsets, attaching scores."""
+    with open(results_file, 'rb') as f:
+        for offset, score in order:
+            f.seek(offset)
+            result = json.loads(f.readline())
+            if score is not None or score_field == 'citation_percentile':
+                result[score_field] = score
+            yield result
+
+def _summarize(results: Iterable[Dict], summary: Dict, builder=None) -> Iterator[Dict]:
+    for result in results:
+        _update_summary(summary, result)
+        if builder is not None:
+            builder.add(result)
+        yield result
+
 def main():
     """Command-line interface for search result processing."""
     if len(sys.argv) < 2:
         print("Usage: python search_databases.py <results.json> [options]")
         print("\nOptions:")
-        print("  --format FORMAT          Output format (json, markdown, bibtex)")
+        print("  --format FORMAT          Output format (json, jsonl, markdown, bibtex)")
         print("  --output FILE            Output file (default: stdout)")
-        print("  --rank CRITERIA          Rank by (citations, year, relevance)")
+        print("  --rank CRITERIA          Rank by (citations, impact, year, relevance)")
+        print("  --query TEXT             Query for local BM25F relevance ranking")
+        print("  --top N                  Keep only the N best-ranked results")
+        print("  --recency-weight W       Recency prior for relevance ranking (default: 0)")
+        print("  --citation-weight W      Citation prior for relevance ranking (default: 0)")
+        print("  --baseline BASELINE      Cohorts for impact ranking: results or openalex")
+        print("                           (default: results)")
         print("  --year-start YEAR        Filter by start year")
         print("  --year-end YEAR          Filter by end year")
         print("  --deduplicate            Remove duplicates")
         print("  --summary                Show summary statistics")
+        print("  --clusters N             Group results into N topic clusters (0: automatic)")
+        print("  --stream                 Process a JSON Lines file in constant memory")
+        print("                           (default for .jsonl input)")
+        print("  --no-index-cache         Index only the query terms and save nothing, instead of")
+        print("                           saving a full relevance index of the file for later queries")
         sys.exit(1)
 
-    # Load results
     results_file = sys.argv[1]
-    try:
-        with open(results_file, 'r', encoding='utf-8') as f:
-            results = json.load(f)
-    except Exception as e:
-        print(f"Error loading results: {e}")
-        sys.exit(1)
 
     # Parse options
     output_format = 'markdown'
@@ -237,6 +590,11 @@ def main():
     year_end = None
     do_dedup = False
     show_summary = False
+    n_clusters = None
+    streaming = results_file.endswith('.jsonl')
+    index_cache = INDEX_CACHE_DIR
+    ranking = {'query': None, 'top_k': None, 'recency_weight': 0.0, 'citation_weight': 0.0,
+               'baseline': 'results'}
 
     i = 2
     while i < len(sys.argv):
@@ -251,6 +609,21 @@ def main():
         elif arg == '--rank' and i + 1 < len(sys.argv):
             rank_criteria = sys.argv[i + 1]
             i += 2
+        elif arg == '--query' and i + 1 < len(sys.argv):
+            ranking['query'] = sys.argv[i + 1]
+            i += 2
+        elif arg == '--top' and i + 1 < len(sys.argv):
+            ranking['top_k'] = int(sys.argv[i + 1])
+            i += 2
+        elif arg == '--recency-weight' and i + 1 < len(sys.argv):
+            ranking['recency_weight'] = float(sys.argv[i + 1])
+            i += 2
+        elif arg == '--citation-weight' and i + 1 < len(sys.argv):
+            ranking['citation_weight'] = float(sys.argv[i + 1])
+            i += 2
+        elif arg == '--baseline' and i + 1 < len(sys.argv):
+            ranking['baseline'] = sys.argv[i + 1]
+            i += 2
         elif arg == '--year-start' and i + 1 < len(sys.argv):
             year_start = int(sys.argv[i + 1])
             i += 2
@@ -263,9 +636,46 @@ def main():
         elif arg == '--summary':
             show_summary = True
             i += 1
+        elif arg == '--clusters' and i + 1 < len(sys.argv):
+            n_clusters = int(sys.argv[i + 1])
+            i += 2
+        elif arg == '--stream':
+            streaming = True
+            i += 1
+        elif arg == '--no-index-cache':
+            index_cache = None
+            i += 1
         else:
             i += 1
 
+    if ranking['query'] and not rank_criteria:
+        rank_criteria = 'relevance'
+
+    if rank_criteria == 'impact' and rank_by_impact is None:
+        print("Error: impact ranking requires numpy. Install with: pip install numpy")
+        sys.exit(1)
+
+    if n_clusters is not None and cluster_results is None:
+        print("Error: topic clustering requires numpy. Install with: pip install numpy")
+        sys.exit(1)
+
+    if streaming:
+        if n_clusters is not None:
+            print("Error: --clusters needs all results in memory; run topic_clusters.py on the "
+                  "JSON Lines file instead", file=sys.stderr)
+            sys.exit(1)
+        stream_main(results_file, output_file, output_format, do_dedup, year_start, year_end,
+                    rank_criteria, show_summary, ranking, index_cache)
+        return
+
+    # Load results
+    try:
+        with open(results_file, 'r', encoding='utf-8') as f:
+            results = json.load(f)
+    except Exception as e:
+        print(f"Error loading results: {e}")
+        sys.exit(1)
+
     # Process results
     if do_dedup:
         results = deduplicate_results(results)
@@ -276,8 +686,22 @@ def main():
         print(f"After year filter: {len(results)} results")
 
     if rank_criteria:
-        results = rank_results(results, rank_criteria)
+        index = None
+        if rank_criteria == 'relevance' and ranking['query'] and index_cache:
+            options = {'mode': 'json', 'deduplicate': do_dedup, 'year_start': year_start, 'year_end': year_end}
+            index = load_file_index(results_file, results, options, cache_dir=index_cache)
+        results = rank_results(results, rank_criteria, index=index, **ranking)
         print(f"Ranked by: {rank_criteria}")
+    elif ranking['top_k'] is not None:
+        results = results[:ranking['top_k']]
+
+    if n_clusters is not None:
+        clusters = cluster_results(results, n_clusters or None)
+        print("\n" + "="*60)
+        print("TOPIC CLUSTERS")
+        print("="*60)
+        print(format_clusters(clusters))
+        print()
 
     # Show summary
     if show_summary:
@@ -299,5 +723,30 @@ def main():
     else:
         print(output)
 
+def stream_main(results_file: str, output_file: Optional[str], output_format: str, deduplicate: bool,
+                year_start: Optional[int], year_end: Optional[int], rank_criteria: Optional[str],
+                show_summary: bool, ranking: Dict, index_cache: Optional[str] = INDEX_CACHE_DIR):
+    """Run the command-line pipeline in streaming mode; progress goes to stderr."""
+    summary = {} if show_summary else None
+    output = open(output_file, 'w', encoding='utf-8', buffering=WRITE_BUFFER) if output_file else sys.stdout
+    try:
+        count = stream_results(results_file, output, output_format, deduplicate, year_start, year_end,
+                               rank_criteria, summary, index_cache=index_cache, **ranking)
+    except (OSError, ValueError) as e:
+        print(f"Error processing results: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if output_file:
+            output.close()
+
+    print(f"Processed {count} results", file=sys.stderr)
+    if summary is not None:
+        print("\n" + "="*60, file=sys.stderr)
+        print("SEARCH SUMMARY", file=sys.stderr)
+        print("="*60, file=sys.stderr)
+        print(json.dumps(summary, indent=2), file=sys.stderr)
+    if output_file:
+        print(f"✓ Results saved to: {output_file}", file=sys.stderr)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""
+Local Search Library
+Keep every harvested search result in a persistent SQLite FTS5 index, merged
+on DOI, PMID, arXiv ID and title, so refined searches run locally instead of
+going back to the database APIs.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import sqlite3
+import argparse
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from record_linkage import is_preprint_doi, merge_cluster, normalize_text, record_identifiers
+from search_databases import iter_formatted_results, WRITE_BUFFER
+
+
+DEFAULT_LIBRARY = os.path.join(
+    os.getenv('LITERATURE_LIBRARY_DIR', os.path.expanduser('~/.cache/literature-review')),
+    'library.sqlite'
+)
+
+# Indexed text columns and their BM25 weights
+TEXT_COLUMNS = ('title', 'authors', 'abstract', 'keywords', 'venue')
+COLUMN_WEIGHTS = (10.0, 3.0, 1.0, 4.0, 1.0)
+
+# Field names accepted in queries ("author:hinton", "journal:nature")
+FIELD_ALIASES = {'author': 'authors', 'journal': 'venue', 'keyword': 'keywords', 'ti': 'title', 'ab': 'abstract'}
+
+# Titles shorter than this are too ambiguous to merge on
+MIN_TITLE_WORDS = 5
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    title TEXT, authors TEXT, abstract TEXT, keywords TEXT, venue TEXT,
+    year INTEGER, citations INTEGER, doi TEXT,
+    record TEXT NOT NULL,
+    added REAL, updated REAL
+);
+CREATE INDEX IF NOT EXISTS records_year ON records (year);
+CREATE TABLE IF NOT EXISTS identifiers (
+    kind TEXT, value TEXT, record INTEGER NOT NULL,
+    PRIMARY KEY (kind, value)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS record_sources (
+    record INTEGER NOT NULL, source TEXT COLLATE NOCASE NOT NULL,
+    PRIMARY KEY (source, record)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS ingests (
+    file TEXT, records INTEGER, added INTEGER, merged INTEGER, ingested REAL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS records_fts USING fts5 (
+    title, authors, abstract, keywords, venue,
+    content='records', content_rowid='id',
+    tokenize='porter unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS records_insert AFTER INSERT ON records BEGIN
+    INSERT INTO records_fts (rowid, title, authors, abstract, keywords, venue)
+    VALUES (new.id, new.title, new.authors, new.abstract, new.keywords, new.venue);
+END;
+CREATE TRIGGER IF NOT EXISTS records_update AFTER UPDATE ON records BEGIN
+    INSERT INTO records_fts (records_fts, rowid, title, authors, abstract, keywords, venue)
+    VALUES ('delete', old.id, old.title, old.authors, old.abstract, old.keywords, old.venue);
+    INSERT INTO records_fts (rowid, title, authors, abstract, keywords, venue)
+    VALUES (new.id, new.title, new.authors, new.abstract, new.keywords, new.venue);
+END;
+'''
+
+QUERY_TOKEN = re.compile(r'"[^"]*"|[(),]|[^\s(),"]+')
+
+
+def _text(value) -> str:
+    if isinstance(value, (list, tuple)):
+        return '; '.join(_text(item) for item in value)
+    if isinstance(value, dict):
+        return value.get('name') or ' '.join(filter(None, [value.get('given'), value.get('family')]))
+    return str(value) if value is not None else ''
+
+
+def _int(value, pattern: Optional[str] = None) -> Optional[int]:
+    if pattern:
+        match = re.search(pattern, str(value or ''))
+        return int(match.group()) if match else None
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def library_keys(result: Dict) -> List[Tuple[str, str]]:
+    """
+    Get the merge keys of a search result, strongest first.
+
+    Args:
+        result: Search result
+
+    Returns:
+        List of (kind, value): doi, pmid and arxiv identifiers, then the
+        normalized title if it has at least MIN_TITLE_WORDS words
+    """
+    keys = [(kind, value) for kind, value in record_identifiers(result).items()]
+    keys.sort(key=lambda key: ('doi', 'pmid', 'arxiv').index(key[0]))
+    title = normalize_text(str(result.get('title') or ''))
+    if len(title.split()) >= MIN_TITLE_WORDS:
+        keys.append(('title', title))
+    return keys
+
+
+def fts_query(query: str) -> str:
+    """
+    Translate a search query to FTS5 syntax.
+
+    Supports AND/OR/NOT, parentheses, "exact phrases", prefix* terms, NEAR
+    and field filters (title:, abstract:, authors:/author:, keywords:,
+    venue:/journal:). Terms with punctuation ("covid-19") become phrases
+    instead of FTS5 syntax errors.
+
+    Args:
+        query: Query text
+
+    Returns:
+        FTS5 MATCH expression
+    """
+    parts = []
+    in_near = False
+    for token in QUERY_TOKEN.findall(query):
+        if token == ',':
+            # Only NEAR(term term, distance) takes a comma
+            if in_near:
+                parts.append(token)
+            continue
+        if token[0] in '"()' or token in ('AND', 'OR', 'NOT', 'NEAR'):
+            if token == '(' and parts and parts[-1] == 'NEAR':
+                in_near = True
+            elif token == ')':
+                in_near = False
+            parts.append(token)
+            continue
+
+        field, colon, term = token.partition(':')
+        field = FIELD_ALIASES.get(field.lower(), field.lower())
+        prefix = ''
+        if colon and field in TEXT_COLUMNS:
+            prefix = f'{field}:'
+        else:
+            term = token
+        if not term:
+            parts.append(prefix)
+            continue
+
+        star = '*' if term.endswith('*') else ''
+        term = term.rstrip('*')
+        if not re.fullmatch(r'\w+', term):
+            term = '"' + term.replace('"', '') + '"'
+        parts.append(f'{prefix}{term}{star}')
+
+    # A field filter applies to the phrase or group that follows it
+    return re.sub(r':\s+', ':', ' '.join(parts)).replace('NEAR (', 'NEAR(').replace(' ,', ',')
+
+
+class SearchLibrary:
+    """Persistent full-text library of search results."""
+
+    def __init__(self, path: str = DEFAULT_LIBRARY):
+        """
+        Open (or create) the library.
+
+        Args:
+            path: SQLite file (':memory:' for no persistence)
+        """
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self) -> 'SearchLibrary':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the database."""
+        self.conn.close()
+
+    def __len__(self) -> int:
+        return self.conn.execute('SELECT COUNT(*) FROM records').fetchone()[0]
+
+    def _find(self, keys: List[Tuple[str, str]], doi: Optional[str]) -> Optional[int]:
+        """Get the stored record sharing a merge key, if any."""
+        for kind, value in keys:
+            row = self.conn.execute('SELECT record FROM identifiers WHERE kind = ? AND value = ?',
+                                    (kind, value)).fetchone()
+            if row is None:
+                continue
+            if kind == 'title' and doi and not is_preprint_doi(doi):
+                # Same title but two different published DOIs: distinct papers
+                stored = self.conn.execute('SELECT doi FROM records WHERE id = ?', row).fetchone()[0]
+                if stored and stored != doi and not is_preprint_doi(stored):
+                    continue
+            return row[0]
+        return None
+
+    @staticmethod
+    def _columns(result: Dict) -> Tuple:
+        doi = record_identifiers(result).get('doi')
+        return (
+            _text(result.get('title')),
+            _text(result.get('authors')),
+            _text(result.get('abstract')),
+            _text(result.get('keywords')),
+            _text(result.get('journal') or result.get('venue')),
+            _int(result.get('year'), r'\d{4}'),
+            _int(result.get('citations')),
+            doi
+        )
+
+    def add(self, result: Dict) -> Tuple[int, bool]:
+        """
+        Add one search result, merging it into a stored duplicate if any.
+
+        Args:
+            result: Search result
+
+        Returns:
+            Tuple of (record id, whether it was merged into an existing record)
+        """
+        now = time.time()
+        keys = library_keys(result)
+        record_id = self._find(keys, record_identifiers(result).get('doi'))
+        sources = {str(result.get('source') or 'Unknown')}
+        sources.update(str(source) for source in result.get('sources') or [])
+
+        if record_id is None:
+            cursor = self.conn.execute(
+                'INSERT INTO records (title, authors, abstract, keywords, venue, year, citations, doi, '
+                'record, added, updated) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                self._columns(result) + (json.dumps(result), now, now)
+            )
+            record_id = cursor.lastrowid
+            merged = False
+        else:
+            stored = json.loads(self.conn.execute('SELECT record FROM records WHERE id = ?',
+                                                  (record_id,)).fetchone()[0])
+            sources.update(stored.get('sources') or [stored.get('source') or 'Unknown'])
+            result = merge_cluster([stored, result], [0, 1])
+            result.pop('provenance', None)
+            result['sources'] = sorted(sources)
+            # Keys the merged record gained (e.g. a DOI found by another database)
+            keys = library_keys(result)
+            self.conn.execute(
+                'UPDATE records SET title = ?, authors = ?, abstract = ?, keywords = ?, venue = ?, year = ?, '
+                'citations = ?, doi = ?, record = ?, updated = ? WHERE id = ?',
+                self._columns(result) + (json.dumps(result), now, record_id)
+            )
+            merged = True
+
+        self.conn.executemany('INSERT OR IGNORE INTO identifiers (kind, value, record) VALUES (?, ?, ?)',
+                              [(kind, value, record_id) for kind, value in keys])
+        self.conn.executemany('INSERT OR IGNORE INTO record_sources (record, source) VALUES (?, ?)',
+                              [(record_id, source) for source in sources])
+        return record_id, merged
+
+    def ingest(self, results: Iterable[Dict], name: str = '') -> Dict:
+        """
+        Add many search results in one transaction.
+
+        Args:
+            results: Search results (any iterable)
+            name: Label recorded in the ingest log (e.g. the file name)
+
+        Returns:
+            Dictionary with records, added and merged counts
+        """
+        counts = {'records': 0, 'added': 0, 'merged': 0}
+        with self.conn:
+            for result in results:
+                _, merged = self.add(result)
+                counts['records'] += 1
+                counts['merged' if merged else 'added'] += 1
+            self.conn.execute('INSERT INTO ingests (file, records, added, merged, ingested) VALUES (?, ?, ?, ?, ?)',
+                              (name, counts['records'], counts['added'], counts['merged'], time.time()))
+        return counts
+
+    def ingest_file(self, filepath: str) -> Dict:
+        """
+        Ingest a JSON (list of results) or JSON Lines results file.
+
+        Args:
+            filepath: Results file, e.g. from search_databases.py --format json
+
+        Returns:
+            Dictionary with records, added and merged counts
+        """
+        with open(filepath, 'r', encoding='utf-8') as f:
+            if filepath.endswith('.jsonl'):
+                results = (json.loads(line) for line in f if line.strip())
+                return self.ingest(results, os.path.abspath(filepath))
+            return self.ingest(json.load(f), os.path.abspath(filepath))
+
+    def search(self, query: Optional[str] = None, year_start: Optional[int] = None,
+               year_end: Optional[int] = None, sources: Optional[List[str]] = None,
+               sort: str = 'relevance', limit: Optional[int] = 100) -> List[Dict]:
+        """
+        Search the library.
+
+        Args:
+            query: Full-text query (see fts_query); None to list by filters only
+            year_start: Minimum year (inclusive)
+            year_end: Maximum year (inclusive)
+            sources: Keep records found by any of these databases
+            sort: relevance (BM25, title weighted highest), year or citations
+            limit: Maximum number of results (None for all)
+
+        Returns:
+            Stored records, best first; with a query, each has relevance_score
+        """
+        conditions, parameters = [], []
+        select = 'SELECT r.record, NULL FROM records r'
+        if query:
+            weights = ', '.join(str(weight) for weight in COLUMN_WEIGHTS)
+            select = (f'SELECT r.record, bm25(records_fts, {weights}) FROM records_fts '
+                      'JOIN records r ON r.id = records_fts.rowid')
+            conditions.append('records_fts MATCH ?')
+            parameters.append(fts_query(query))
+        if year_start:
+            conditions.append('r.year >= ?')
+            parameters.append(year_start)
+        if year_end:
+            conditions.append('r.year <= ?')
+            parameters.append(year_end)
+        if sources:
+            placeholders = ','.join('?' * len(sources))
+            conditions.append(f'r.id IN (SELECT record FROM record_sources WHERE source IN ({placeholders}))')
+            parameters.extend(sources)
+
+        order = {
+            'relevance': '2, r.id' if query else 'r.id',
+            'year': 'r.year IS NULL, r.year DESC, r.id',
+            'citations': 'r.citations IS NULL, r.citations DESC, r.id'
+        }[sort]
+        sql = select + (' WHERE ' + ' AND '.join(conditions) if conditions else '') + f' ORDER BY {order}'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            parameters.append(limit)
+
+        try:
+            rows = self.conn.execute(sql, parameters).fetchall()
+        except sqlite3.OperationalError as e:
+            raise ValueError(f'Invalid query {query!r}: {e}')
+
+        results = []
+        for record, score in rows:
+            result = json.loads(record)
+            if score is not None:
+                result['relevance_score'] = round(-score, 4)
+            results.append(result)
+        return results
+
+    def stats(self) -> Dict:
+        """Get record counts per source and the ingest log."""
+        return {
+            'records': len(self),
+            'sources': dict(self.conn.execute(
+                'SELECT source, COUNT(*) FROM record_sources GROUP BY source ORDER BY COUNT(*) DESC')),
+            'ingests': [
+                {'file': file, 'records': records, 'added': added, 'merged': merged,
+                 'ingested': time.strftime('%Y-%m-%d %H:%M', time.localtime(ingested))}
+                for file, records, added, merged, ingested in self.conn.execute(
+                    'SELECT file, records, added, merged, ingested FROM ingests ORDER BY ingested')
+            ]
+        }
+
+
+def main():
+    """Command-line interface."""
+    parser = argparse.ArgumentParser(
+        description='Persistent local full-text library of literature search results',
+        epilog='Example: python search_library.py search \'title:crispr AND "sickle cell" NOT review\' '
+               '--year-start 2018 --source PubMed'
+    )
+    parser.add_argument('--library', default=DEFAULT_LIBRARY, help=f'Library file (default: {DEFAULT_LIBRARY})')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    ingest = commands.add_parser('ingest', help='Add JSON or JSON Lines result files')
+    ingest.add_argument('files', nargs='+', help='Result files')
+
+    search = commands.add_parser('search', help='Search the library')
+    search.add_argument('query', nargs='?', help='Query: AND/OR/NOT, "phrases", prefix*, field:term')
+    search.add_argument('--year-start', type=int, help='Minimum year')
+    search.add_argument('--year-end', type=int, help='Maximum year')
+    search.add_argument('--source', action='append', help='Found by this database (repeatable)')
+    search.add_argument('--sort', choices=['relevance', 'year', 'citations'], default='relevance')
+    search.add_argument('--limit', type=int, default=100, help='Maximum results (0 for all)')
+    search.add_argument('--format', choices=['json', 'jsonl', 'markdown', 'bibtex'], default='markdown')
+    search.add_argument('--output', help='Output file (default: stdout)')
+
+    commands.add_parser('stats', help='Show library contents')
+
+    args = parser.parse_args()
+
+    with SearchLibrary(args.library) as library:
+        if args.command == 'ingest':
+            for filepath in args.files:
+                try:
+                    counts = library.ingest_file(filepath)
+                except (OSError, ValueError) as e:
+                    print(f"Error ingesting {filepath}: {e}", file=sys.stderr)
+                    sys.exit(1)
+                print(f"{filepath}: {counts['records']} records ({counts['added']} new, "
+                      f"{counts['merged']} merged)", file=sys.stderr)
+            print(f"Library: {len(library)} records in {library.path}", file=sys.stderr)
+
+        elif args.command == 'search':
+            start = time.perf_counter()
+            try:
+                results = library.search(args.query, args.year_start, args.year_end, args.source,
+                                         args.sort, args.limit or None)
+            except ValueError as e:
+                print(f"Error: {e}", file=sys.stderr)
+                sys.exit(1)
+            print(f"{len(results)} results in {(time.perf_counter() - start) * 1000:.1f} ms", file=sys.stderr)
+
+            output = open(args.output, 'w', encoding='utf-8', buffering=WRITE_BUFFER) if args.output else sys.stdout
+            try:
+                for chunk in iter_formatted_results(results, args.format, total=len(results)):
+                    output.write(chunk)
+            finally:
+                if args.output:
+                    output.close()
+                    print(f"✓ Results saved to: {args.output}", file=sys.stderr)
+
+        else:
+            print(json.dumps(library.stats(), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,642 @@
+#!/usr/bin/env python3
+"""
+Columnar Search Statistics
+Summarize literature search results with vectorized NumPy group-bys: citation
+percentiles per year and field, h-indices, source overlap, and top venues and
+authors. Reads JSON, JSON Lines, Parquet and Arrow/Feather files.
+"""
+
+import re
+import sys
+import json
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from record_linkage import AUTHOR_SEPARATOR
+
+# Column names tried in order, for search results and exports of other tools
+YEAR_KEYS = ('year', 'publication_year', 'pub_year')
+CITATION_KEYS = ('citations', 'cited_by_count', 'citation_count', 'citationCount')
+VENUE_KEYS = ('journal', 'venue', 'container-title', 'booktitle')
+AUTHOR_KEYS = ('authors', 'author')
+FIELD_KEYS = ('fields', 'field', 'fields_of_study', 'subjects', 'categories')
+
+PERCENTILES = (25, 50, 75, 90, 99)
+
+# Sources beyond this many (by records found) are left out of the overlap matrix
+MAX_OVERLAP_SOURCES = 32
+
+YEAR = re.compile(r'\d{4}')
+
+
+def _first_value(result: Dict, keys: Tuple[str, ...]):
+    for key in keys:
+        value = result.get(key)
+        if value not in (None, '', []):
+            return value
+    return None
+
+
+def parse_year(value) -> int:
+    """Get a four-digit year from a value, or 0 if there is none."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value if 0 < value < 10000 else 0
+    match = YEAR.search(str(value or ''))
+    return int(match.group()) if match else 0
+
+
+def parse_citations(value) -> int:
+    """Get a citation count from a value, or -1 if it is unknown."""
+    if value in (None, '') or isinstance(value, bool):
+        return -1
+    try:
+        count = int(float(value))
+    except (ValueError, TypeError, OverflowError):
+        return -1
+    return count if count >= 0 else -1
+
+
+def _author_name(author) -> str:
+    if isinstance(author, dict):
+        return author.get('name') or ' '.join(filter(None, [author.get('given'), author.get('family')]))
+    return str(author or '')
+
+
+def split_authors(value) -> List[str]:
+    """
+    Split an author field into names.
+
+    Handles author lists (of strings or {name} / {given, family} objects),
+    "Smith J, Doe A", "Smith, John and Doe, Jane" and "John Smith; Jane Doe".
+    Names are kept as written, so "J. Smith" and "John Smith" count apart.
+
+    Args:
+        value: Author field
+
+    Returns:
+        List of author names
+    """
+    if isinstance(value, (list, tuple)):
+        names = [_author_name(author) for author in value]
+    elif isinstance(value, str):
+        names = []
+        for part in AUTHOR_SEPARATOR.split(value):
+            pieces = part.split(',')
+            # "Smith, John" is one author; "Smith J, Doe A" is two
+            if len(pieces) == 2 and len(pieces[0].split()) == 1:
+                names.append(part)
+            else:
+                names.extend(pieces)
+    else:
+        return []
+    names = [' '.join(name.split()) for name in names]
+    return [name for name in names if name and name.lower().rstrip('.') not in ('et al', 'others')]
+
+
+def _split_values(value) -> List[str]:
+    if isinstance(value, (list, tuple)):
+        return [str(item) for item in value if item not in (None, '')]
+    if isinstance(value, str):
+        return [part for part in re.split(r'\s*[;,|]\s*', value) if part]
+    return [str(value)] if value is not None else []
+
+
+class _Categories:
+    """Map labels to integer codes; labels differing only in case or spacing share a code."""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.labels: List[str] = []
+        # Exact spellings seen so far, to skip normalizing repeated labels
+        self._seen: Dict[str, int] = {}
+
+    def code(self, label: str) -> int:
+        code = self._seen.get(label)
+        if code is None:
+            normalized = ' '.join(str(label).split())
+            key = normalized.casefold()
+            code = self.codes.get(key)
+            if code is None:
+                code = self.codes[key] = len(self.labels)
+                self.labels.append(normalized)
+            self._seen[label] = code
+        return code
+
+
+class ColumnBuilder:
+    """Accumulate search results one at a time into compact columns."""
+
+    def __init__(self):
+        self.years = array('H')
+        self.citations = array('q')
+        self.source_categories = _Categories()
+        self.sources = array('l')
+        self.venue_categories = _Categories()
+        self.venues = array('l')
+        # Multi-valued columns: value codes plus per-record offsets (CSR)
+        self.found_in = (array('q', [0]), array('l'))
+        self.author_categories = _Categories()
+        self.authors = (array('q', [0]), array('l'))
+        self.field_categories = _Categories()
+        self.fields = (array('q', [0]), array('l'))
+        # Normalized impact, if a ranking attached it (see citation_impact.py)
+        self.percentiles = array('d')
+
+    def __len__(self) -> int:
+        return len(self.years)
+
+    def add(self, result: Dict) -> None:
+        """Append one search result."""
+        self.years.append(parse_year(_first_value(result, YEAR_KEYS)))
+        self.citations.append(parse_citations(_first_value(result, CITATION_KEYS)))
+
+        source = self.source_categories.code(result.get('source') or 'Unknown')
+        self.sources.append(source)
+        # Merged duplicates list every database that found them
+        found_in = {source}
+        for name in _split_values(result.get('sources')):
+            found_in.add(self.source_categories.code(name))
+        self._append_codes(self.found_in, found_in)
+
+        venue = _first_value(result, VENUE_KEYS)
+        if isinstance(venue, list):
+            venue = venue[0]
+        self.venues.append(self.venue_categories.code(str(venue)) if venue else -1)
+
+        authors = split_authors(_first_value(result, AUTHOR_KEYS))
+        self._append_codes(self.authors, {self.author_categories.code(name): None for name in authors})
+        fields = _split_values(_first_value(result, FIELD_KEYS))
+        self._append_codes(self.fields, {self.field_categories.code(name): None for name in fields})
+
+        percentile = result.get('citation_percentile')
+        self.percentiles.append(float(percentile) if isinstance(percentile, (int, float)) else np.nan)
+
+    @staticmethod
+    def _append_codes(column: Tuple[array, array], codes: Iterable[int]) -> None:
+        offsets, values = column
+        values.extend(codes)
+        offsets.append(len(values))
+
+    def build(self) -> 'ResultColumns':
+        """Convert the accumulated columns to NumPy arrays."""
+        def multi(column, categories):
+            offsets, values = column
+            return (np.frombuffer(offsets, dtype=np.int64).copy(),
+                    np.frombuffer(values, dtype=np.dtype(f'i{values.itemsize}')).astype(np.int64),
+                    categories.labels)
+
+        def single(codes, categories):
+            return (np.frombuffer(codes, dtype=np.dtype(f'i{codes.itemsize}')).astype(np.int64),
+                    categories.labels)
+
+        return ResultColumns(
+            years=np.frombuffer(self.years, dtype=np.uint16).astype(np.int64),
+            citations=np.frombuffer(self.citations, dtype=np.int64).copy(),
+            sources=single(self.sources, self.source_categories),
+            found_in=multi(self.found_in, self.source_categories),
+            venues=single(self.venues, self.venue_categories),
+            authors=multi(self.authors, self.author_categories),
+            fields=multi(self.fields, self.field_categories),
+            percentiles=np.frombuffer(self.percentiles, dtype=np.float64).copy()
+        )
+
+
+def group_citation_stats(groups: np.ndarray, citations: np.ndarray, n_groups: int,
+                         percentiles: Iterable[int] = PERCENTILES) -> Dict[str, np.ndarray]:
+    """
+    Citation statistics for every group at once.
+
+    Observations are sorted once by (group, citations descending); counts,
+    totals, percentiles (linear interpolation, as numpy.percentile) and
+    h-indices then follow from each group's start offset.
+
+    Args:
+        groups: Group code per observation (-1 for none)
+        citations: Citation count per observation (-1 for unknown)
+        n_groups: Number of groups
+        percentiles: Percentiles to compute
+
+    Returns:
+        Dictionary of per-group arrays: results, cited (observations with a
+        known count), total, mean, h_index and p<percentile> (NaN for groups
+        without known counts)
+    """
+    in_group = groups >= 0
+    stats = {'results': np.bincount(groups[in_group], minlength=n_groups)}
+
+    known = in_group & (citations >= 0)
+    group, count = groups[known], citations[known]
+    order = np.lexsort((-count, group))
+    group, count = group[order], count[order]
+
+    cited = np.bincount(group, minlength=n_groups)
+    total = np.bincount(group, weights=count, minlength=n_groups).astype(np.int64)
+    starts = np.cumsum(cited) - cited
+    # A group's h-index: how many of its papers have at least their (1-based) rank in citations
+    rank = np.arange(len(group)) - starts[group] + 1
+    stats['cited'] = cited
+    stats['total'] = total
+    with np.errstate(invalid='ignore', divide='ignore'):
+        stats['mean'] = total / cited
+    stats['h_index'] = np.bincount(group[count >= rank], minlength=n_groups)
+
+    has_counts = cited > 0
+    span = np.maximum(cited - 1, 0)
+    last = starts + span
+    for percentile in percentiles:
+        position = percentile / 100 * span
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, span)
+        values = np.full(n_groups, np.nan)
+        if len(count):
+            # Ascending position i sits at last - i in descending order
+            low = count[np.where(has_counts, last - lower, 0)]
+            high = count[np.where(has_counts, last - upper, 0)]
+            values = np.where(has_counts, low + (high - low) * (position - lower), np.nan)
+        stats[f'p{percentile}'] = values
+
+    return stats
+
+
+def _top_codes(counts: np.ndarray, top: int) -> np.ndarray:
+    """Codes of the `top` largest counts, largest first; ties keep code order."""
+    if top <= 0 or not len(counts):
+        return np.array([], dtype=np.int64)
+    if len(counts) > top:
+        threshold = np.partition(counts, len(counts) - top)[len(counts) - top]
+        candidates = np.flatnonzero(counts >= threshold)
+    else:
+        candidates = np.arange(len(counts))
+    candidates = candidates[counts[candidates] > 0]
+    return candidates[np.lexsort((candidates, -counts[candidates]))][:top]
+
+
+def _number(value):
+    if isinstance(value, (float, np.floating)):
+        return None if np.isnan(value) else round(float(value), 2)
+    return int(value)
+
+
+def _group_rows(stats: Dict[str, np.ndarray], codes: Iterable[int], name: str,
+                labels: List) -> List[Dict]:
+    rows = []
+    for code in codes:
+        row = {name: labels[code]}
+        row.update((key, _number(values[code])) for key, values in stats.items())
+        rows.append(row)
+    return rows
+
+
+class ResultColumns:
+    """Search results as NumPy columns, with categorical codes for text fields."""
+
+    def __init__(self, years: np.ndarray, citations: np.ndarray,
+                 sources: Tuple[np.ndarray, List[str]], found_in: Tuple[np.ndarray, np.ndarray, List[str]],
+                 venues: Tuple[np.ndarray, List[str]], authors: Tuple[np.ndarray, np.ndarray, List[str]],
+                 fields: Tuple[np.ndarray, np.ndarray, List[str]], percentiles: Optional[np.ndarray] = None):
+        """
+        Initialize columns.
+
+        Args:
+            years: Year per result (0 if unknown)
+            citations: Citation count per result (-1 if unknown)
+            sources: (code per result, labels) of the source database
+            found_in: (offsets, codes, labels) of every database that found
+                each result; labels are shared with sources
+            venues: (code per result or -1, labels)
+            authors: (offsets, codes, labels)
+            fields: (offsets, codes, labels) of fields of study / categories
+            percentiles: Field- and year-normalized citation percentile per
+                result (NaN if not computed)
+        """
+        self.years = years
+        self.citations = citations
+        self.sources = sources
+        self.found_in = found_in
+        self.venues = venues
+        self.authors = authors
+        self.fields = fields
+        self.percentiles = percentiles if percentiles is not None else np.full(len(years), np.nan)
+
+    def __len__(self) -> int:
+        return len(self.years)
+
+    @classmethod
+    def from_records(cls, results: Iterable[Dict]) -> 'ResultColumns':
+        """Convert result dictionaries (any iterable) in one pass."""
+        builder = ColumnBuilder()
+        for result in results:
+            builder.add(result)
+        return builder.build()
+
+    @classmethod
+    def from_arrow(cls, table) -> 'ResultColumns':
+        """
+        Convert a pyarrow Table without going through Python dictionaries.
+
+        Numbers and categories are converted per distinct value (via
+        dictionary encoding); list columns keep their offsets.
+
+        Args:
+            table: pyarrow.Table of search results
+
+        Returns:
+            ResultColumns
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        rows = table.num_rows
+
+        def column(keys):
+            for key in keys:
+                if key in table.column_names:
+                    return table.column(key).combine_chunks()
+            return None
+
+        def per_value(values, convert: Callable, missing) -> np.ndarray:
+            """Convert each distinct value once, then gather through the dictionary indices."""
+            if pa.types.is_dictionary(values.type):
+                encoded = values
+            else:
+                if not pa.types.is_string(values.type) and not pa.types.is_large_string(values.type):
+                    values = values.cast(pa.string())
+                encoded = values.dictionary_encode()
+            lookup = np.array([convert(value) for value in encoded.dictionary.to_pylist()] + [missing],
+                              dtype=np.int64)
+            indices = pc.fill_null(encoded.indices, -1).to_numpy(zero_copy_only=False).astype(np.int64)
+            return lookup[indices]
+
+        def numbers(keys, convert, missing) -> np.ndarray:
+            values = column(keys)
+            if values is None:
+                return np.full(rows, missing, dtype=np.int64)
+            if pa.types.is_integer(values.type) or pa.types.is_floating(values.type):
+                converted = pc.fill_null(values, missing).to_numpy(zero_copy_only=False)
+                converted = np.nan_to_num(converted, nan=missing).astype(np.int64)
+                if convert is parse_year:
+                    return np.where((converted > 0) & (converted < 10000), converted, 0)
+                return np.where(converted < 0, -1, converted)
+            return per_value(values, convert, missing)
+
+        def single(keys, categories, default=None) -> np.ndarray:
+            values = column(keys)
+            if values is None:
+                return np.full(rows, -1 if default is None else categories.code(default), dtype=np.int64)
+            if pa.types.is_list(values.type) or pa.types.is_large_list(values.type):
+                values = pa.array([value[0] if value else None for value in values.to_pylist()], pa.string())
+            missing = -1 if default is None else categories.code(default)
+            return per_value(values, lambda value: categories.code(value) if value else missing, missing)
+
+        def multi(keys, categories, split) -> Tuple[np.ndarray, np.ndarray]:
+            values = column(keys)
+            if values is None:
+                return np.zeros(rows + 1, dtype=np.int64), np.array([], dtype=np.int64)
+            if (pa.types.is_list(values.type) or pa.types.is_large_list(values.type)) \
+                    and pa.types.is_string(values.type.value_type):
+                lengths = pc.fill_null(pc.list_value_length(values), 0).to_numpy(zero_copy_only=False)
+                offsets = np.concatenate([[0], np.cumsum(lengths, dtype=np.int64)])
+                flat = pc.list_flatten(values)
+                return offsets, per_value(flat, lambda value: categories.code(value) if value else -1, -1)
+            # Delimited strings or lists of objects
+            builder_offsets, codes = array('q', [0]), array('q')
+            for value in values.to_pylist():
+                codes.extend(dict.fromkeys(categories.code(name) for name in split(value)))
+                builder_offsets.append(len(codes))
+            return np.frombuffer(builder_offsets, dtype=np.int64), np.frombuffer(codes, dtype=np.int64)
+
+        source_categories = _Categories()
+        sources = single(('source',), source_categories, default='Unknown')
+        listed_offsets, listed_codes = multi(('sources',), source_categories, _split_values)
+        # Each record was found by its own source plus any listed after merging;
+        # distinct (row, code) pairs come out sorted by row
+        pair_rows = np.concatenate([np.arange(rows), np.repeat(np.arange(rows), np.diff(listed_offsets))])
+        pair_codes = np.concatenate([sources, listed_codes])
+        width = max(len(source_categories.labels), 1)
+        pairs = np.unique((pair_rows * width + pair_codes)[pair_codes >= 0])
+        found_codes = pairs % width
+        found_offsets = np.concatenate([[0], np.cumsum(np.bincount(pairs // width, minlength=rows))])
+
+        percentiles = column(('citation_percentile',))
+        if percentiles is not None and (pa.types.is_integer(percentiles.type) or pa.types.is_floating(percentiles.type)):
+            percentiles = pc.fill_null(percentiles.cast(pa.float64()), np.nan).to_numpy(zero_copy_only=False)
+        else:
+            percentiles = None
+
+        venue_categories, author_categories, field_categories = _Categories(), _Categories(), _Categories()
+        venues = single(VENUE_KEYS, venue_categories)
+        author_offsets, author_codes = multi(AUTHOR_KEYS, author_categories, split_authors)
+        field_offsets, field_codes = multi(FIELD_KEYS, field_categories, _split_values)
+
+        return cls(
+            years=numbers(YEAR_KEYS, parse_year, 0),
+            citations=numbers(CITATION_KEYS, parse_citations, -1),
+            sources=(sources, source_categories.labels),
+            found_in=(found_offsets, found_codes, source_categories.labels),
+            venues=(venues, venue_categories.labels),
+            authors=(author_offsets, author_codes, author_categories.labels),
+            fields=(field_offsets, field_codes, field_categories.labels),
+            percentiles=percentiles
+        )
+
+    @classmethod
+    def read(cls, path: str) -> 'ResultColumns':
+        """
+        Load results from JSON, JSON Lines, Parquet or Arrow/Feather.
+
+        Args:
+            path: Results file; the format follows the extension
+
+        Returns:
+            ResultColumns
+        """
+        lower = path.lower()
+        if lower.endswith(('.parquet', '.pq', '.arrow', '.feather', '.ipc')):
+            return cls.from_arrow(read_table(path))
+        with open(path, 'r', encoding='utf-8') as f:
+            if lower.endswith('.jsonl'):
+                return cls.from_records(json.loads(line) for line in f if line.strip())
+            return cls.from_records(json.load(f))
+
+    def _expand(self, column: Tuple[np.ndarray, np.ndarray, List[str]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Row index and value code for every (result, value) pair of a multi-valued column."""
+        offsets, codes, _ = column
+        rows = np.repeat(np.arange(len(self)), np.diff(offsets))
+        keep = codes >= 0
+        return rows[keep], codes[keep]
+
+    def source_overlap(self) -> Dict:
+        """
+        Count results found by each pair of databases.
+
+        Each result's set of databases becomes a bitmask; the matrix is
+        computed from the distinct masks and their counts.
+
+        Returns:
+            Dictionary with sources (labels), matrix (matrix[i][j]: results
+            found by both i and j; the diagonal is each database's total)
+            and exclusive (results found by that database only)
+        """
+        rows, codes = self._expand(self.found_in)
+        labels = self.found_in[2]
+        found = np.bincount(codes, minlength=len(labels))
+        kept = _top_codes(found, MAX_OVERLAP_SOURCES)
+        bit = np.full(len(labels), -1, dtype=np.int64)
+        bit[kept] = np.arange(len(kept))
+
+        keep = bit[codes] >= 0
+        rows, values = rows[keep], np.left_shift(1, bit[codes[keep]])
+        masks = np.zeros(len(self), dtype=np.int64)
+        if len(rows):
+            starts = np.flatnonzero(np.concatenate([[True], rows[1:] != rows[:-1]]))
+            masks[rows[starts]] = np.bitwise_or.reduceat(values, starts)
+
+        distinct, counts = np.unique(masks[masks > 0], return_counts=True)
+        bits = (distinct[:, None] >> np.arange(len(kept))) & 1
+        matrix = (bits * counts[:, None]).T @ bits
+        exclusive = np.zeros(len(kept), dtype=np.int64)
+        single = (distinct & (distinct - 1)) == 0
+        exclusive[np.log2(distinct[single]).astype(np.int64)] = counts[single]
+
+        names = [labels[code] for code in kept]
+        return {
+            'sources': names,
+            'matrix': matrix.tolist(),
+            'exclusive': dict(zip(names, exclusive.tolist()))
+        }
+
+    def summary(self, top: int = 10) -> Dict:
+        """
+        Compute every summary statistic.
+
+        The first keys match the original summary (total_results, sources,
+        year_distribution, avg_citations over cited results, total_citations).
+        Results carrying citation_percentile (from ranking by impact) add an
+        impact block.
+
+        Args:
+            top: Number of venues, authors and fields to report
+
+        Returns:
+            Summary dictionary
+        """
+        n = len(self)
+        years, citations = self.years, self.citations
+        source_codes, source_labels = self.sources
+
+        source_counts = np.bincount(source_codes, minlength=len(source_labels))
+        distinct_years, year_groups, year_counts = np.unique(years, return_inverse=True, return_counts=True)
+        year_distribution = {str(year): int(count) for year, count in zip(distinct_years, year_counts) if year}
+        if len(distinct_years) and distinct_years[0] == 0:
+            year_distribution['Unknown'] = int(year_counts[0])
+
+        positive = citations > 0
+        summary = {
+            'total_results': n,
+            'sources': {source_labels[code]: int(source_counts[code])
+                        for code in _top_codes(source_counts, len(source_counts))},
+            'year_distribution': year_distribution,
+            'avg_citations': float(citations[positive].mean()) if positive.any() else 0,
+            'total_citations': int(citations[positive].sum())
+        }
+
+        overall = group_citation_stats(np.zeros(n, dtype=np.int64), citations, 1)
+        summary['citations'] = {key: _number(values[0]) for key, values in overall.items()}
+
+        year_groups = np.where(years > 0, year_groups.reshape(-1), -1)
+        by_year = group_citation_stats(year_groups, citations, len(distinct_years))
+        summary['citations_by_year'] = _group_rows(
+            by_year, [code for code in range(len(distinct_years)) if distinct_years[code]], 'year',
+            [int(year) for year in distinct_years])
+
+        rows, codes = self._expand(self.fields)
+        by_field = group_citation_stats(codes, citations[rows], len(self.fields[2]))
+        summary['citations_by_field'] = _group_rows(
+            by_field, _top_codes(by_field['results'], top), 'field', self.fields[2])
+
+        summary['source_overlap'] = self.source_overlap()
+
+        venue_codes, venue_labels = self.venues
+        by_venue = group_citation_stats(venue_codes, citations, len(venue_labels), percentiles=(50,))
+        summary['top_venues'] = _group_rows(by_venue, _top_codes(by_venue['results'], top), 'venue', venue_labels)
+
+        rows, codes = self._expand(self.authors)
+        by_author = group_citation_stats(codes, citations[rows], len(self.authors[2]), percentiles=(50,))
+        summary['top_authors'] = _group_rows(
+            by_author, _top_codes(by_author['results'], top), 'author', self.authors[2])
+
+        ranked = self.percentiles[~np.isnan(self.percentiles)]
+        if len(ranked):
+            # Share of results in the top 10% / 1% of their (field, year) cohort
+            summary['impact'] = {
+                'ranked': int(len(ranked)),
+                'mean_percentile': round(float(ranked.mean()), 2),
+                'median_percentile': round(float(np.median(ranked)), 2),
+                'top_10_percent': round(float((ranked >= 90).mean()), 4),
+                'top_1_percent': round(float((ranked >= 99).mean()), 4)
+            }
+
+        return summary
+
+
+def read_table(path: str):
+    """
+    Read a Parquet or Arrow/Feather file into a pyarrow Table.
+
+    Args:
+        path: .parquet/.pq, or .arrow/.feather/.ipc (IPC file or stream format)
+
+    Returns:
+        pyarrow.Table
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.feather as feather
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError('pyarrow required for Parquet/Arrow input. Install with: pip install pyarrow')
+
+    wanted = {'source', 'sources', 'citation_percentile'}.union(YEAR_KEYS, CITATION_KEYS, VENUE_KEYS, AUTHOR_KEYS, FIELD_KEYS)
+    if path.lower().endswith(('.parquet', '.pq')):
+        # Read only the columns the summary uses
+        names = [name for name in pq.read_schema(path).names if name in wanted]
+        return pq.read_table(path, columns=names)
+    try:
+        table = feather.read_table(path)
+    except pa.ArrowInvalid:
+        with pa.memory_map(path) as source:
+            table = pa.ipc.open_stream(source).read_all()
+    return table.select([name for name in table.column_names if name in wanted])
+
+
+def main():
+    """Command-line interface."""
+    if len(sys.argv) < 2:
+        print("Usage: python search_statistics.py <results.json|.jsonl|.parquet|.arrow> [summary.json] [--top N]")
+        sys.exit(1)
+
+    top = 10
+    args = sys.argv[1:]
+    if '--top' in args:
+        index = args.index('--top')
+        top = int(args[index + 1])
+        del args[index:index + 2]
+
+    try:
+        columns = ResultColumns.read(args[0])
+    except (OSError, ValueError, ImportError) as e:
+        print(f"Error loading results: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    output = json.dumps(columns.summary(top), indent=2)
+    if len(args) > 1:
+        with open(args[1], 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"✓ Summary saved to: {args[1]}", file=sys.stderr)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,660 @@
+#!/usr/bin/env python3
+"""
+Semantic Similarity Index
+Find conceptually related papers that share few keywords with a query.
+Abstracts from the local library, the arXiv store and result files are
+embedded on the CPU with TF-IDF + truncated SVD (latent semantic analysis),
+stored as a memory-mapped float16 matrix and searched through an inverted
+file (IVF) index.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from bm25_ranking import term_counts
+from record_linkage import record_identifiers
+
+DEFAULT_INDEX = os.path.join(
+    os.getenv('LITERATURE_LIBRARY_DIR', os.path.expanduser('~/.cache/literature-review')),
+    'semantic_index'
+)
+
+# Embedding model
+DIMENSIONS = 128
+SAMPLE_SIZE = 50000        # documents the model and the coarse quantizer are fitted on
+MIN_DF = 3                 # terms in fewer sample documents are dropped
+MAX_DF = 0.5               # ... and terms in more than this share of them
+MAX_TERMS = 100000
+SVD_OVERSAMPLES = 10
+SVD_POWER_ITERATIONS = 3
+
+# IVF index: lists = LISTS_PER_SQRT * sqrt(documents), searched DEFAULT_PROBES at a time
+LISTS_PER_SQRT = 1.0
+DEFAULT_PROBES = 12
+KMEANS_ITERATIONS = 12
+EXACT_BELOW = 20000        # smaller collections are scanned exhaustively
+
+# Rows (or nonzeros) handled per block, to bound temporary memory
+BLOCK_ROWS = 8192
+BLOCK_NONZEROS = 1 << 19
+
+
+class SparseRows:
+    """Minimal CSR matrix (documents x terms) with blocked dense products."""
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, n_columns: int):
+        self.indptr, self.indices, self.data, self.n_columns = indptr, indices, data, n_columns
+
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+
+    def dot(self, matrix: np.ndarray) -> np.ndarray:
+        """
+        Product with a dense (n_columns x k) matrix.
+
+        Rows are sorted by length and taken in groups padded to a common
+        length (pointing at an appended zero row), so each group is one
+        gather and one batched matrix multiplication.
+        """
+        return self.padded_dot(_pad(matrix))
+
+    def padded_dot(self, padded: np.ndarray) -> np.ndarray:
+        """Product with a dense matrix that already has the zero row appended (see _pad)."""
+        out = np.zeros((len(self), padded.shape[1]), dtype=np.float32)
+        if not len(self.data):
+            return out
+        lengths = np.diff(self.indptr)
+        order = np.argsort(lengths, kind='stable')
+        sorted_lengths = lengths[order]
+        start = int(np.searchsorted(sorted_lengths, 1))
+        while start < len(order):
+            end = min(len(order), start + max(1, BLOCK_NONZEROS // int(sorted_lengths[start])))
+            width = int(sorted_lengths[end - 1])
+            if (end - start) * width > 2 * BLOCK_NONZEROS:
+                end = start + max(1, BLOCK_NONZEROS // width)
+                width = int(sorted_lengths[end - 1])
+            rows = order[start:end]
+            columns = np.arange(width)
+            present = columns < lengths[rows, None]
+            positions = np.minimum(self.indptr[rows, None] + columns, len(self.data) - 1)
+            indices = np.where(present, self.indices[positions], self.n_columns)
+            weights = np.where(present, self.data[positions], 0).astype(np.float32)
+            out[rows] = np.matmul(weights[:, None, :], padded[indices])[:, 0]
+            start = end
+        return out
+
+    def transpose(self) -> 'SparseRows':
+        """Transposed matrix (terms x documents)."""
+        order = np.argsort(self.indices, kind='stable')
+        rows = np.repeat(np.arange(len(self), dtype=np.int32), np.diff(self.indptr))
+        counts = np.bincount(self.indices, minlength=self.n_columns)
+        indptr = np.concatenate([[0], np.cumsum(counts)])
+        return SparseRows(indptr, rows[order], self.data[order], len(self))
+
+
+def _pad(matrix: np.ndarray) -> np.ndarray:
+    """Append a zero row, the target of padding entries in SparseRows.padded_dot."""
+    return np.vstack([matrix, np.zeros((1, matrix.shape[1]))]).astype(np.float32)
+
+
+def _qr(matrix: np.ndarray) -> np.ndarray:
+    return np.linalg.qr(matrix)[0]
+
+
+class TfidfWeights:
+    """Vocabulary and IDF weights for sublinear, L2-normalized TF-IDF."""
+
+    def __init__(self, terms: List[str], idf: np.ndarray):
+        """
+        Initialize weights.
+
+        Args:
+            terms: Vocabulary (tokenized terms)
+            idf: Inverse document frequency per term
+        """
+        self.terms = terms
+        self.idf = idf.astype(np.float32)
+        self.vocabulary = {term: index for index, term in enumerate(terms)}
+
+    @classmethod
+    def from_counts(cls, documents: List[Dict[str, int]], min_df: int = MIN_DF, max_df: float = MAX_DF,
+                    max_terms: int = MAX_TERMS) -> 'TfidfWeights':
+        """
+        Choose the vocabulary and IDF weights from documents.
+
+        Args:
+            documents: Term counts per document (see bm25_ranking.term_counts)
+            min_df: Minimum document frequency of a term
+            max_df: Maximum document frequency of a term, as a share of documents
+            max_terms: Keep at most this many terms (the most frequent)
+
+        Returns:
+            Fitted weights
+        """
+        frequencies: Dict[str, int] = {}
+        for document in documents:
+            for term in document:
+                frequencies[term] = frequencies.get(term, 0) + 1
+        ceiling = max_df * len(documents)
+        terms = [term for term, df in frequencies.items() if min_df <= df <= ceiling]
+        terms = sorted(sorted(terms, key=lambda term: -frequencies[term])[:max_terms])
+        df = np.array([frequencies[term] for term in terms], dtype=np.float64)
+        return cls(terms, np.log((1 + len(documents)) / (1 + df)) + 1)
+
+    def tfidf(self, texts: Iterable[str]) -> SparseRows:
+        """
+        Weight texts with sublinear TF-IDF, L2-normalized per document.
+
+        Args:
+            texts: Document texts
+
+        Returns:
+            Documents x terms sparse matrix (terms outside the vocabulary are dropped)
+        """
+        return self.weigh(term_counts(text) for text in texts)
+
+    def weigh(self, documents: Iterable[Dict[str, int]]) -> SparseRows:
+        """TF-IDF matrix of documents given as term counts."""
+        vocabulary = self.vocabulary
+        indptr, indices, counts = [0], [], []
+        for document in documents:
+            for term, count in document.items():
+                column = vocabulary.get(term)
+                if column is not None:
+                    indices.append(column)
+                    counts.append(count)
+            indptr.append(len(indices))
+
+        indptr = np.asarray(indptr, dtype=np.int64)
+        indices = np.asarray(indices, dtype=np.int32)
+        data = (1 + np.log(np.asarray(counts, dtype=np.float32))) * self.idf[indices]
+        lengths = np.diff(indptr)
+        rows = np.repeat(np.arange(len(lengths)), lengths)
+        norms = np.sqrt(np.bincount(rows, weights=data * data, minlength=len(lengths)))
+        data /= np.maximum(norms, 1e-12)[rows].astype(np.float32)
+        return SparseRows(indptr, indices, data, len(self.terms))
+
+
+class LsaModel(TfidfWeights):
+    """TF-IDF weighting and a truncated SVD projection, fitted on a document sample."""
+
+    def __init__(self, terms: List[str], idf: np.ndarray, projection: np.ndarray):
+        """
+        Initialize model.
+
+        Args:
+            terms: Vocabulary (tokenized terms)
+            idf: Inverse document frequency per term
+            projection: Terms x dimensions projection (right singular vectors)
+        """
+        super().__init__(terms, idf)
+        self.projection = projection.astype(np.float32)
+        self._padded_projection = _pad(self.projection)
+
+    @property
+    def dimensions(self) -> int:
+        return self.projection.shape[1]
+
+    def embed(self, texts: Iterable[str]) -> np.ndarray:
+        """
+        Embed texts as unit vectors.
+
+        Args:
+            texts: Document texts
+
+        Returns:
+            Documents x dimensions float32 array (all-zero rows for texts
+            without any vocabulary term)
+        """
+        vectors = self.tfidf(texts).padded_dot(self._padded_projection)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    @classmethod
+    def fit(cls, texts: List[str], dimensions: int = DIMENSIONS, min_df: int = MIN_DF,
+            max_df: float = MAX_DF, max_terms: int = MAX_TERMS, seed: int = 0) -> 'LsaModel':
+        """
+        Fit the vocabulary, IDF weights and SVD projection.
+
+        Uses randomized SVD (range finder with power iterations) on the
+        sparse TF-IDF matrix, so only thin dense matrices are formed.
+
+        Args:
+            texts: Sample of document texts
+            dimensions: Embedding dimensions
+            min_df: Minimum document frequency of a term
+            max_df: Maximum document frequency of a term, as a share of texts
+            max_terms: Keep at most this many terms (the most frequent)
+            seed: Random seed
+
+        Returns:
+            Fitted model
+        """
+        documents = [term_counts(text) for text in texts]
+        weights = TfidfWeights.from_counts(documents, min_df, max_df, max_terms)
+        terms = weights.terms
+        if len(terms) <= dimensions:
+            raise ValueError(f'Only {len(terms)} terms occur in at least {min_df} documents; '
+                             f'need more than {dimensions} (index more documents or lower --dimensions)')
+        matrix = weights.weigh(documents)
+        del documents
+        transposed = matrix.transpose()
+
+        rng = np.random.default_rng(seed)
+        basis = _qr(matrix.dot(rng.standard_normal((len(terms), dimensions + SVD_OVERSAMPLES)).astype(np.float32)))
+        for _ in range(SVD_POWER_ITERATIONS):
+            basis = _qr(matrix.dot(_qr(transposed.dot(basis))))
+        # Small (k x terms) matrix whose right singular vectors approximate the matrix's
+        _, _, right = np.linalg.svd(transposed.dot(basis).T, full_matrices=False)
+        return cls(terms, weights.idf, right[:dimensions].T)
+
+    def save(self, path: Path) -> None:
+        np.savez(path, terms=np.array(self.terms), idf=self.idf, projection=self.projection)
+
+    @classmethod
+    def load(cls, path: Path) -> 'LsaModel':
+        data = np.load(path)
+        return cls(data['terms'].tolist(), data['idf'], data['projection'])
+
+
+def kmeans(vectors: np.ndarray, k: int, iterations: int = KMEANS_ITERATIONS, seed: int = 0) -> np.ndarray:
+    """
+    Spherical k-means for the IVF coarse quantizer.
+
+    Args:
+        vectors: Unit vectors (n x d)
+        k: Number of centroids
+        iterations: Lloyd iterations
+        seed: Random seed
+
+    Returns:
+        Unit centroids (k x d)
+    """
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), k, replace=False)].astype(np.float32)
+    for _ in range(iterations):
+        assignment = assign(vectors, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        empty = np.flatnonzero(np.bincount(assignment, minlength=k) == 0)
+        # Reseed empty lists with random vectors
+        sums[empty] = vectors[rng.choice(len(vectors), len(empty), replace=False)]
+        centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+    return centroids
+
+
+def assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Nearest (highest cosine) centroid of every vector, in blocks."""
+    assignment = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), BLOCK_ROWS):
+        block = np.asarray(vectors[start:start + BLOCK_ROWS], dtype=np.float32)
+        assignment[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return assignment
+
+
+def _batches(items: Iterable, size: int) -> Iterator[List]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _text(value) -> str:
+    if isinstance(value, (list, tuple)):
+        return '; '.join(str(item) for item in value)
+    return str(value) if value is not None else ''
+
+
+def _document(result: Dict, fallback: str) -> Dict:
+    """Index entry for a search result: keys, display fields and embedded text."""
+    identifiers = record_identifiers(result)
+    keys = [f'{kind}:{value}' for kind, value in identifiers.items()] or [fallback]
+    year = str(result.get('year') or result.get('published') or '')[:4]
+    return {
+        'keys': keys,
+        'title': _text(result.get('title')),
+        'year': int(year) if year.isdigit() else None,
+        'source': result.get('source') or '',
+        'text': f"{_text(result.get('title'))}. {_text(result.get('abstract') or result.get('summary'))}"
+    }
+
+
+def iter_documents(source: str) -> Iterator[Dict]:
+    """
+    Read documents from a local source.
+
+    Args:
+        source: The search library (search_library.py), the arXiv store
+            (academic-search/arxiv_oai.py), or a JSON / JSON Lines results file
+
+    Yields:
+        Documents with keys (doi:/pmid:/arxiv: identifiers), title, year,
+        source and text
+    """
+    if source.endswith(('.sqlite', '.db')):
+        conn = sqlite3.connect(f'file:{source}?mode=ro', uri=True)
+        try:
+            tables = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            if 'papers' in tables:
+                rows = conn.execute('SELECT arxiv_id, title, authors, abstract, created, doi FROM papers ORDER BY id')
+                for arxiv_id, title, authors, abstract, created, doi in rows:
+                    yield _document({'arxiv_id': arxiv_id, 'doi': doi, 'title': title, 'abstract': abstract,
+                                     'year': created, 'source': 'arXiv'}, f'arxiv:{arxiv_id}')
+            elif 'records' in tables:
+                for record_id, record in conn.execute('SELECT id, record FROM records ORDER BY id'):
+                    yield _document(json.loads(record), f'library:{record_id}')
+            else:
+                raise ValueError(f'{source} is neither a search library nor an arXiv store')
+        finally:
+            conn.close()
+        return
+
+    stem = Path(source).stem
+    with open(source, 'r', encoding='utf-8') as f:
+        if source.endswith('.jsonl'):
+            results = (json.loads(line) for line in f if line.strip())
+        else:
+            results = json.load(f)
+            if isinstance(results, dict):
+                results = results.get('results') or results.get('papers') or []
+        for position, result in enumerate(results):
+            yield _document(result, f'{stem}:{position}')
+
+
+class SemanticIndex:
+    """Memory-mapped document vectors with an IVF nearest-neighbor index."""
+
+    def __init__(self, path: str = DEFAULT_INDEX):
+        """
+        Open an index built with SemanticIndex.build.
+
+        Args:
+            path: Index directory
+        """
+        self.path = Path(path)
+        self.model = LsaModel.load(self.path / 'model.npz')
+        # Vectors are stored grouped by IVF list; documents[row] is the document of a row
+        self.vectors = np.load(self.path / 'vectors.npy', mmap_mode='r')
+        self.documents = np.load(self.path / 'documents.npy', mmap_mode='r')
+        self.rows = np.load(self.path / 'rows.npy', mmap_mode='r')
+        self.centroids = np.load(self.path / 'centroids.npy')
+        self.list_offsets = np.load(self.path / 'list_offsets.npy')
+        self.keys = np.load(self.path / 'keys.npy', mmap_mode='r')
+        self.key_documents = np.load(self.path / 'key_documents.npy', mmap_mode='r')
+        self.meta_offsets = np.load(self.path / 'meta_offsets.npy', mmap_mode='r')
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def document(self, position: int) -> Dict:
+        """Stored keys, title, year and source of a document."""
+        with open(self.path / 'meta.jsonl', 'rb') as f:
+            f.seek(int(self.meta_offsets[position]))
+            return json.loads(f.readline())
+
+    def find(self, key: str) -> Optional[int]:
+        """
+        Look up a document by identifier.
+
+        Args:
+            key: DOI, PMID or arXiv ID, with or without a 'doi:' / 'pmid:' /
+                'arxiv:' prefix
+
+        Returns:
+            Document position, or None if not indexed
+        """
+        candidates = [key] if ':' in key and key.split(':', 1)[0] in ('doi', 'pmid', 'arxiv') else []
+        candidates += [f'{kind}:{value}' for kind, value in record_identifiers(
+            {'doi': key if key.startswith('10.') else '', 'pmid': key, 'arxiv_id': key}).items()]
+        candidates.append(key)
+        for candidate in candidates:
+            encoded = candidate.lower().encode('utf-8')
+            if len(encoded) > self.keys.dtype.itemsize:
+                continue
+            position = int(np.searchsorted(self.keys, encoded))
+            if position < len(self.keys) and self.keys[position] == encoded:
+                return int(self.key_documents[position])
+        return None
+
+    def _search(self, query: np.ndarray, top_k: int, probes: int, exclude: Optional[int]) -> List[Tuple[int, float]]:
+        if len(self.centroids) > 1 and probes < len(self.centroids):
+            lists = np.argpartition(-(self.centroids @ query), probes)[:probes]
+            ranges = [(int(self.list_offsets[i]), int(self.list_offsets[i + 1])) for i in np.sort(lists)]
+        else:
+            ranges = [(0, len(self.vectors))]
+
+        scores, rows = [], []
+        for start, end in ranges:
+            for block in range(start, end, BLOCK_ROWS * 8):
+                stop = min(end, block + BLOCK_ROWS * 8)
+                scores.append(np.asarray(self.vectors[block:stop], dtype=np.float32) @ query)
+                rows.append(np.arange(block, stop))
+        if not scores:
+            return []
+        scores, rows = np.concatenate(scores), np.concatenate(rows)
+
+        documents = np.asarray(self.documents[rows])
+        if exclude is not None:
+            keep = documents != exclude
+            scores, documents = scores[keep], documents[keep]
+        count = min(top_k, len(scores))
+        best = np.argpartition(-scores, count - 1)[:count] if count < len(scores) else np.arange(len(scores))
+        best = best[np.lexsort((documents[best], -scores[best]))]
+        return [(int(documents[i]), round(float(scores[i]), 4)) for i in best]
+
+    def similar(self, position: int, top_k: int = 10, probes: int = DEFAULT_PROBES) -> List[Tuple[int, float]]:
+        """
+        Find the documents most similar to an indexed document.
+
+        Args:
+            position: Document position (see find)
+            top_k: Number of neighbors
+            probes: IVF lists to scan (more is slower and more exact)
+
+        Returns:
+            List of (document position, cosine similarity), most similar first
+        """
+        query = np.asarray(self.vectors[int(self.rows[position])], dtype=np.float32)
+        return self._search(query, top_k, probes, exclude=position)
+
+    def search(self, text: str, top_k: int = 10, probes: int = DEFAULT_PROBES) -> List[Tuple[int, float]]:
+        """
+        Find the documents most similar to free text (e.g. an abstract).
+
+        Args:
+            text: Query text
+            top_k: Number of neighbors
+            probes: IVF lists to scan
+
+        Returns:
+            List of (document position, cosine similarity), most similar first
+        """
+        query = self.model.embed([text])[0]
+        if not query.any():
+            return []
+        return self._search(query, top_k, probes, exclude=None)
+
+    @classmethod
+    def build(cls, sources: List[str], path: str = DEFAULT_INDEX, dimensions: int = DIMENSIONS,
+              sample_size: int = SAMPLE_SIZE, seed: int = 0) -> 'SemanticIndex':
+        """
+        Build an index over every document with text in the sources.
+
+        Documents are read twice: once to deduplicate on DOI / PMID / arXiv
+        ID and draw a random sample for fitting the model, then in blocks
+        to embed them into a memory-mapped matrix.
+
+        Args:
+            sources: Library, arXiv store or results files (see iter_documents)
+            path: Index directory (replaced)
+            dimensions: Embedding dimensions
+            sample_size: Documents to fit the model and IVF centroids on
+            seed: Random seed
+
+        Returns:
+            The opened index
+        """
+        directory = Path(path)
+        directory.mkdir(parents=True, exist_ok=True)
+        rng = random.Random(seed)
+
+        # Pass 1: deduplicate, store metadata and sample texts
+        seen = set()
+        keep = bytearray()
+        sample: List[str] = []
+        meta_offsets = []
+        key_rows: List[Tuple[bytes, int]] = []
+        with open(directory / 'meta.jsonl', 'wb') as meta:
+            for source in sources:
+                for document in iter_documents(source):
+                    keys = [key.lower() for key in document['keys']]
+                    if any(key in seen for key in keys) or len(document['text']) < 3:
+                        keep.append(0)
+                        continue
+                    keep.append(1)
+                    seen.update(keys)
+                    position = len(meta_offsets)
+                    key_rows.extend((key.encode('utf-8'), position) for key in keys)
+                    meta_offsets.append(meta.tell())
+                    text = document.pop('text')
+                    meta.write(json.dumps(document, ensure_ascii=False).encode('utf-8') + b'\n')
+                    # Reservoir sample
+                    if len(sample) < sample_size:
+                        sample.append(text)
+                    else:
+                        slot = rng.randrange(position + 1)
+                        if slot < sample_size:
+                            sample[slot] = text
+        seen.clear()
+        total = len(meta_offsets)
+        if not total:
+            raise ValueError('No documents with text to index')
+        print(f'{total} documents; fitting model on {len(sample)}', file=sys.stderr)
+
+        model = LsaModel.fit(sample, dimensions, min_df=min(MIN_DF, max(1, len(sample) // 100)), seed=seed)
+        model.save(directory / 'model.npz')
+
+        # Pass 2: embed in blocks into a memory-mapped matrix, in document order
+        embedded = np.lib.format.open_memmap(directory / 'embedded.tmp.npy', mode='w+', dtype=np.float16,
+                                             shape=(total, model.dimensions))
+        texts = (document['text'] for source in sources for document in iter_documents(source))
+        kept = (text for text, flag in zip(texts, keep) if flag)
+        position = 0
+        for block in _batches(kept, BLOCK_ROWS):
+            embedded[position:position + len(block)] = model.embed(block)
+            position += len(block)
+        embedded.flush()
+
+        # IVF: cluster a sample of vectors, then group all vectors by nearest centroid
+        n_lists = 1 if total < EXACT_BELOW else int(LISTS_PER_SQRT * np.sqrt(total))
+        if n_lists > 1:
+            training = np.sort(np.random.default_rng(seed).choice(total, min(total, max(sample_size, 40 * n_lists)),
+                                                                  replace=False))
+            centroids = kmeans(np.asarray(embedded[training], dtype=np.float32), n_lists, seed=seed)
+            assignment = assign(embedded, centroids)
+        else:
+            centroids = np.zeros((1, model.dimensions), dtype=np.float32)
+            assignment = np.zeros(total, dtype=np.int32)
+        documents = np.argsort(assignment, kind='stable')
+        list_offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=n_lists))])
+
+        vectors = np.lib.format.open_memmap(directory / 'vectors.npy', mode='w+', dtype=np.float16,
+                                            shape=(total, model.dimensions))
+        for start in range(0, total, BLOCK_ROWS * 8):
+            chunk = documents[start:start + BLOCK_ROWS * 8]
+            vectors[start:start + len(chunk)] = embedded[chunk]
+        vectors.flush()
+        del vectors, embedded
+        os.remove(directory / 'embedded.tmp.npy')
+
+        rows = np.empty(total, dtype=np.int64)
+        rows[documents] = np.arange(total)
+        np.save(directory / 'documents.npy', documents.astype(np.int64))
+        np.save(directory / 'rows.npy', rows)
+        np.save(directory / 'centroids.npy', centroids)
+        np.save(directory / 'list_offsets.npy', list_offsets.astype(np.int64))
+        np.save(directory / 'meta_offsets.npy', np.asarray(meta_offsets, dtype=np.int64))
+
+        key_rows.sort()
+        np.save(directory / 'keys.npy', np.array([key for key, _ in key_rows]))
+        np.save(directory / 'key_documents.npy', np.array([position for _, position in key_rows], dtype=np.int64))
+        return cls(path)
+
+
+def main():
+    """Command line interface."""
+    usage = ('Usage:\n'
+             '  python semantic_index.py build <source> [<source> ...] [--index DIR] [--dimensions N]\n'
+             '  python semantic_index.py similar <doi|pmid|arxiv id> [--index DIR] [--top N] [--probes N]\n'
+             '  python semantic_index.py search "<text>" [--index DIR] [--top N] [--probes N]\n'
+             'Sources: the search library (library.sqlite), the arXiv store (arxiv.sqlite), '
+             'or JSON / JSON Lines results files')
+    args = sys.argv[1:]
+    if len(args) < 2 or args[0] not in ('build', 'similar', 'search'):
+        print(usage)
+        sys.exit(1)
+
+    options = {'--index': DEFAULT_INDEX, '--dimensions': str(DIMENSIONS), '--top': '10',
+               '--probes': str(DEFAULT_PROBES)}
+    positional = []
+    i = 1
+    while i < len(args):
+        if args[i] in options and i + 1 < len(args):
+            options[args[i]] = args[i + 1]
+            i += 2
+        else:
+            positional.append(args[i])
+            i += 1
+
+    if args[0] == 'build':
+        start = time.perf_counter()
+        try:
+            index = SemanticIndex.build(positional, options['--index'], int(options['--dimensions']))
+        except (OSError, ValueError, sqlite3.Error) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print(f"✓ {len(index)} documents indexed to {options['--index']} "
+              f"({len(index.centroids)} lists, {time.perf_counter() - start:.1f}s)")
+        return
+
+    try:
+        index = SemanticIndex(options['--index'])
+    except OSError:
+        print(f"Error: no semantic index at {options['--index']}; run 'semantic_index.py build' first")
+        sys.exit(1)
+
+    query = ' '.join(positional)
+    top, probes = int(options['--top']), int(options['--probes'])
+    start = time.perf_counter()
+    if args[0] == 'similar':
+        position = index.find(query)
+        if position is None:
+            print(f"Error: {query} is not in the index")
+            sys.exit(1)
+        print(f"Papers like: {index.document(position)['title']}\n")
+        neighbors = index.similar(position, top, probes)
+    else:
+        neighbors = index.search(query, top, probes)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    for rank, (position, score) in enumerate(neighbors, 1):
+        document = index.document(position)
+        year = f" ({document['year']})" if document.get('year') else ''
+        print(f"{rank:3d}. [{score:.3f}] {document['title']}{year}  {document['keys'][0]}")
+    print(f"\n{len(neighbors)} neighbors in {elapsed:.1f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Topic Clustering
+Group search results into themes before screening: spherical k-means on
+the sparse TF-IDF matrix of titles, keywords and abstracts, with every
+cluster labelled by its top terms.
+"""
+
+import sys
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from bm25_ranking import term_counts
+from semantic_index import SparseRows, TfidfWeights
+
+# Automatic cluster count: about sqrt(results / DOCUMENTS_PER_CLUSTER), capped
+MAX_CLUSTERS = 30
+DOCUMENTS_PER_CLUSTER = 10
+
+MIN_DF = 2
+MAX_DF = 0.5
+LABEL_TERMS = 5
+EXAMPLE_TITLES = 3
+
+MAX_ITERATIONS = 40
+TOLERANCE = 0.001          # stop when fewer than this share of results change cluster
+SEEDING_SAMPLE = 20000     # k-means++ seeds are drawn from at most this many results
+
+
+def result_text(result: Dict) -> str:
+    """Title, keywords and abstract of a search result (arXiv results use summary)."""
+    parts = [result.get('title'), result.get('keywords'), result.get('abstract') or result.get('summary')]
+    return '. '.join(' '.join(map(str, part)) if isinstance(part, (list, tuple)) else str(part)
+                     for part in parts if part)
+
+
+def default_clusters(n_results: int) -> int:
+    """Automatic number of clusters for a result set."""
+    return max(2, min(MAX_CLUSTERS, round((n_results / DOCUMENTS_PER_CLUSTER) ** 0.5)))
+
+
+def _rows(matrix: SparseRows, rows: np.ndarray) -> SparseRows:
+    """Sub-matrix of some rows."""
+    lengths = np.diff(matrix.indptr)[rows]
+    starts = matrix.indptr[rows]
+    positions = np.repeat(starts - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths) + np.arange(lengths.sum())
+    indptr = np.concatenate([[0], np.cumsum(lengths)])
+    return SparseRows(indptr, matrix.indices[positions], matrix.data[positions], matrix.n_columns)
+
+
+def _dense_row(matrix: SparseRows, row: int) -> np.ndarray:
+    vector = np.zeros(matrix.n_columns, dtype=np.float32)
+    start, end = matrix.indptr[row], matrix.indptr[row + 1]
+    vector[matrix.indices[start:end]] = matrix.data[start:end]
+    return vector
+
+
+def _seed(matrix: SparseRows, k: int, rng: np.random.Generator) -> np.ndarray:
+    """k-means++ seeding for cosine distance, on a sample of rows."""
+    candidates = np.flatnonzero(np.diff(matrix.indptr))
+    if len(candidates) > SEEDING_SAMPLE:
+        candidates = np.sort(rng.choice(candidates, SEEDING_SAMPLE, replace=False))
+    sample = _rows(matrix, candidates)
+
+    centroids = [_dense_row(sample, int(rng.integers(len(sample))))]
+    best = sample.dot(centroids[0][:, None])[:, 0]
+    for _ in range(1, k):
+        distance = np.maximum(1 - best, 0)
+        total = distance.sum()
+        row = int(rng.choice(len(sample), p=distance / total)) if total > 0 else int(rng.integers(len(sample)))
+        centroids.append(_dense_row(sample, row))
+        best = np.maximum(best, sample.dot(centroids[-1][:, None])[:, 0])
+    return np.array(centroids)
+
+
+def spherical_kmeans(matrix: SparseRows, k: int, max_iterations: int = MAX_ITERATIONS,
+                     seed: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Cluster L2-normalized sparse rows by cosine similarity.
+
+    Each iteration is one sparse x dense product (similarity to every
+    centroid) and one bincount over the nonzeros (centroid sums).
+
+    Args:
+        matrix: Documents x terms TF-IDF matrix with unit rows
+        k: Number of clusters
+        max_iterations: Maximum Lloyd iterations
+        seed: Random seed
+
+    Returns:
+        Tuple of (cluster per row, unit centroids k x terms, cosine
+        similarity of each row to its centroid)
+    """
+    rng = np.random.default_rng(seed)
+    centroids = _seed(matrix, k, rng)
+    rows = np.repeat(np.arange(len(matrix)), np.diff(matrix.indptr))
+    assignment = np.full(len(matrix), -1)
+
+    for _ in range(max_iterations):
+        similarities = matrix.dot(centroids.T)
+        previous, assignment = assignment, np.argmax(similarities, axis=1)
+        if np.mean(previous != assignment) < TOLERANCE:
+            break
+
+        sums = np.bincount(assignment[rows] * matrix.n_columns + matrix.indices, weights=matrix.data,
+                           minlength=k * matrix.n_columns).reshape(k, matrix.n_columns)
+        empty = np.flatnonzero(np.bincount(assignment, minlength=k) == 0)
+        if len(empty):
+            # Reseed empty clusters with the results that fit their cluster worst
+            fit = similarities[np.arange(len(matrix)), assignment]
+            for cluster, row in zip(empty, np.argsort(fit)[:len(empty)]):
+                sums[cluster] = _dense_row(matrix, int(row))
+        centroids = (sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)).astype(np.float32)
+
+    similarities = matrix.dot(centroids.T)
+    assignment = np.argmax(similarities, axis=1)
+    return assignment, centroids, similarities[np.arange(len(matrix)), assignment]
+
+
+def cluster_results(results: List[Dict], n_clusters: Optional[int] = None, label_terms: int = LABEL_TERMS,
+                    seed: int = 0) -> List[Dict]:
+    """
+    Cluster search results by topic and write the assignment into each record.
+
+    Adds 'cluster' (1 = largest cluster; None for results without any
+    indexed term) and 'cluster_label' (top terms) to every result.
+
+    Args:
+        results: Search results from search_databases.py or arxiv_search.py
+        n_clusters: Number of clusters (default: see default_clusters)
+        label_terms: Terms per cluster label
+        seed: Random seed
+
+    Returns:
+        List of clusters, largest first: cluster, size, label, terms and
+        the titles of the results closest to the centroid
+    """
+    documents = [term_counts(result_text(result)) for result in results]
+    weights = TfidfWeights.from_counts(documents, min_df=min(MIN_DF, max(1, len(results) // 50)), max_df=MAX_DF)
+    matrix = weights.weigh(documents)
+    del documents
+
+    clustered = np.flatnonzero(np.diff(matrix.indptr))
+    k = min(n_clusters or default_clusters(len(clustered)), len(clustered))
+    for result in results:
+        result['cluster'] = None
+        result['cluster_label'] = None
+    if k == 0:
+        return []
+
+    assignment, centroids, fit = spherical_kmeans(_rows(matrix, clustered), k, seed=seed)
+    sizes = np.bincount(assignment, minlength=k)
+    # Number clusters by size, largest first
+    order = np.argsort(-sizes, kind='stable')
+    number = np.empty(k, dtype=np.int64)
+    number[order] = np.arange(1, k + 1)
+
+    clusters = []
+    for cluster in order.tolist():
+        if not sizes[cluster]:
+            continue
+        top = np.argsort(-centroids[cluster])[:label_terms]
+        terms = [weights.terms[term] for term in top.tolist() if centroids[cluster, term] > 0]
+        members = np.flatnonzero(assignment == cluster)
+        closest = members[np.argsort(-fit[members])[:EXAMPLE_TITLES]]
+        clusters.append({
+            'cluster': int(number[cluster]),
+            'size': int(sizes[cluster]),
+            'label': ', '.join(terms),
+            'terms': terms,
+            'examples': [str(results[clustered[row]].get('title') or '') for row in closest.tolist()]
+        })
+
+    labels = {cluster['cluster']: cluster['label'] for cluster in clusters}
+    for row, cluster in zip(clustered.tolist(), number[assignment].tolist()):
+        results[row]['cluster'] = cluster
+        results[row]['cluster_label'] = labels[cluster]
+    return clusters
+
+
+def format_clusters(clusters: List[Dict]) -> str:
+    """Format clusters as a table for the terminal."""
+    lines = [f"{'#':>3}  {'Size':>6}  Top terms", '-' * 60]
+    for cluster in clusters:
+        lines.append(f"{cluster['cluster']:>3}  {cluster['size']:>6}  {cluster['label']}")
+        for title in cluster['examples']:
+            lines.append(f"{'':>13}- {title[:100]}")
+    return '\n'.join(lines)
+
+
+def load_results(filepath: str):
+    """
+    Load results from JSON (a list, or arxiv_search.py's {"papers": [...]}) or JSON Lines.
+
+    Returns:
+        Tuple of (loaded document, list of results inside it)
+    """
+    with open(filepath, 'r', encoding='utf-8') as f:
+        if filepath.endswith('.jsonl'):
+            results = [json.loads(line) for line in f if line.strip()]
+            return results, results
+        data = json.load(f)
+    if isinstance(data, dict):
+        return data, data.get('papers') or data.get('results') or []
+    return data, data
+
+
+def main():
+    """Command line interface."""
+    if len(sys.argv) < 2:
+        print("Usage: python topic_clusters.py <results.json|.jsonl> [output_file] [options]")
+        print("\nClusters search_databases.py results or arxiv_search.py --output-format json / --harvest")
+        print("output, and writes the results back with 'cluster' and 'cluster_label' fields.")
+        print("\nOptions:")
+        print("  --clusters N     Number of clusters (default: automatic, at most 30)")
+        print("  --terms N        Terms per cluster label (default: 5)")
+        print("  --group          Order the results by cluster")
+        sys.exit(1)
+
+    input_file = sys.argv[1]
+    output_file = None
+    n_clusters = None
+    label_terms = LABEL_TERMS
+    group = False
+
+    i = 2
+    while i < len(sys.argv):
+        arg = sys.argv[i]
+        if arg == '--clusters' and i + 1 < len(sys.argv):
+            n_clusters = int(sys.argv[i + 1]) or None
+            i += 2
+        elif arg == '--terms' and i + 1 < len(sys.argv):
+            label_terms = int(sys.argv[i + 1])
+            i += 2
+        elif arg == '--group':
+            group = True
+            i += 1
+        elif not arg.startswith('--') and output_file is None:
+            output_file = arg
+            i += 1
+        else:
+            i += 1
+
+    try:
+        data, results = load_results(input_file)
+    except (OSError, ValueError) as e:
+        print(f"Error loading results: {e}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    clusters = cluster_results(results, n_clusters, label_terms)
+    print(f"{len(results)} results in {len(clusters)} clusters ({time.perf_counter() - start:.1f}s)\n")
+    print(format_clusters(clusters))
+
+    if group:
+        results.sort(key=lambda result: result['cluster'] or len(clusters) + 1)
+    if output_file:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            if output_file.endswith('.jsonl'):
+                for result in results:
+                    f.write(json.dumps(result, ensure_ascii=False) + '\n')
+            else:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+        print(f"\n✓ Clustered results saved to: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,19 +4,38 @@ Citation Verification Script
 Verifies DOIs, URLs, and citation metadata for accuracy.
 """
 
+import os
 import re
+import sys
+import argparse
 import requests
 import json
+from pathlib import Path
 from typing import Dict, List, Tuple
 from urllib.parse import urlparse
 import time
 
+# Reuse the CSL-JSON cache and renderer from the citation-management skill when installed alongside
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'citation-management' / 'scripts'))
+try:
+    from crossref_bulk import normalize_doi
+    from csl_render import CSLStore, CitationRenderer, csl_year
+except ImportError:
+    CSLStore = None
+try:
+    from file_watcher import watch_files
+except ImportError:
+    watch_files = None
+
 class CitationVerifier:
     def __init__(self):
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'CitationVerifier/1.0 (Literature Review Tool)'
         })
+        self.csl_records = {}
+        self.doi_results = {}  # Kept between runs in watch mode
+        self.renderer = CitationRenderer() if CSLStore is not None else None
 
     def extract_dois(self, text: str) -> List[str]:
         """Extract all DOIs from text."""
@@ -49,23 +68,60 @@ class CitationVerifier:
 
             if response.status_code == 200:
                 data = response.json()
-                message = data.get('message', {})
-
-                # Extract key metadata
-                metadata = {
-                    'title': message.get('title', [''])[0],
-                    'authors': self._format_authors(message.get('author', [])),
-                    'year': self._extract_year(message),
-                    'journal': message.get('container-title', [''])[0],
-                    'volume': message.get('volume', ''),
-                    'pages': message.get('page', ''),
-                    'doi': doi
-                }
-                return metadata
+                return self._metadata_from_message(doi, data.get('message', {}))
             return {}
         except Exception as e:
             return {"error": str(e)}
 
+    def _metadata_from_message(self, doi: str, message: Dict) -> Dict:
+        """Extract key metadata from a CrossRef work message."""
+        return {
+            'title': message.get('title', [''])[0] if message.get('title') else '',
+            'authors': self._format_authors(message.get('author', [])),
+            'year': self._extract_year(message),
+            'journal': message.get('container-title', [''])[0] if message.get('container-title') else '',
+            'volume': message.get('volume', ''),
+            'pages': message.get('page', ''),
+            'doi': doi
+        }
+
+    def _metadata_from_csl(self, doi: str, csl: Dict) -> Dict:
+        """Extract key metadata from a CSL-JSON record."""
+        return {
+            'title': csl.get('title', ''),
+            'authors': self._format_authors(csl.get('author', [])),
+            'year': csl_year(csl),
+            'journal': csl.get('container-title', ''),
+            'volume': csl.get('volume', ''),
+            'pages': csl.get('page', ''),
+            'doi': doi
+        }
+
+    def verify_dois(self, dois: List[str]) -> Dict[str, Tuple[bool, Dict]]:
+        """
+        Verify many DOIs, using cached CSL-JSON records and CrossRef bulk
+        filter requests when available. DOIs not found are checked individually.
+        Returns {doi: (is_valid, metadata)}
+        """
+        results = {}
+        records = {}
+        if CSLStore is not None:
+            records = CSLStore(session=self.session).get_many(dois)
+
+        for doi in dois:
+            if doi in results:
+                continue
+            csl = records.get(normalize_doi(doi)) if records else None
+            if csl:
+                self.csl_records[doi] = csl
+                results[doi] = (True, self._metadata_from_csl(doi, csl))
+            else:
+                print(f"Verifying DOI: {doi}")
+                results[doi] = self.verify_doi(doi)
+                time.sleep(0.5)  # Rate limiting
+
+        return results
+
     def _format_authors(self, authors: List[Dict]) -> str:
         """Format author list."""
         if not authors:
@@ -108,6 +164,7 @@ class CitationVerifier:
     def verify_citations_in_file(self, filepath: str) -> Dict:
         """
         Verify all citations in a markdown file.
+        DOIs verified by an earlier call are not looked up again.
         Returns a report of verification results.
         """
         with open(filepath, 'r', encoding='utf-8') as f:
@@ -122,9 +179,12 @@ class CitationVerifier:
             'metadata': {}
         }
 
+        new_dois = [doi for doi in dict.fromkeys(dois) if doi not in self.doi_results]
+        if new_dois:
+            self.doi_results.update(self.verify_dois(new_dois))
+
         for doi in dois:
-            print(f"Verifying DOI: {doi}")
-            is_valid, metadata = self.verify_doi(doi)
+            is_valid, metadata = self.doi_results[doi]
 
             if is_valid:
                 report['verified'].append(doi)
@@ -132,12 +192,14 @@ class CitationVerifier:
             else:
                 report['failed'].append(doi)
 
-            time.sleep(0.5)  # Rate limiting
-
         return report
 
     def format_citation_apa(self, metadata: Dict) -> str:
         """Format citation in APA style."""
+        csl = self.csl_records.get(metadata.get('doi', ''))
+        if csl:
+            return self.renderer.render(csl, 'apa')
+
         authors = metadata.get('authors', '')
         year = metadata.get('year', 'n.d.')
         title = metadata.get('title', '')
@@ -160,6 +222,10 @@ class CitationVerifier:
 
     def format_citation_nature(self, metadata: Dict) -> str:
         """Format citation in Nature style."""
+        csl = self.csl_records.get(metadata.get('doi', ''))
+        if csl:
+            return self.renderer.render(csl, 'nature')
+
         authors = metadata.get('authors', '')
         title = metadata.get('title', '')
         journal = metadata.get('journal', '')
@@ -179,20 +245,8 @@ class CitationVerifier:
 
         return citation
 
-def main():
-    """Example usage."""
-    import sys
-
-    if len(sys.argv) < 2:
-        print("Usage: python verify_citations.py <markdown_file>")
-        sys.exit(1)
-
-    filepath = sys.argv[1]
-    verifier = CitationVerifier()
-
-    print(f"Verifying citations in: {filepath}")
-    report = verifier.verify_citations_in_file(filepath)
-
+def print_report(verifier: CitationVerifier, report: Dict):
+    """Print a verification report with verified citations in APA format."""
     print("\n" + "="*60)
     print("CITATION VERIFICATION REPORT")
     print("="*60)
@@ -211,12 +265,57 @@ def main():
             citation = verifier.format_citation_apa(metadata)
             print(f"\n{citation}")
 
-    # Save detailed report
-    output_file = filepath.replace('.md', '_citation_report.json')
+def save_report(report: Dict, filepath: str):
+    """Save a verification report next to the verified file."""
+    output_file = os.path.splitext(filepath)[0] + '_citation_report.json'
     with open(output_file, 'w', encoding='utf-8') as f:
         json.dump(report, f, indent=2)
 
     print(f"\n\nDetailed report saved to: {output_file}")
 
+def main():
+    """Example usage."""
+    parser = argparse.ArgumentParser(
+        description='Verify DOIs cited in a markdown, LaTeX or BibTeX file'
+    )
+    parser.add_argument('file', help='File to verify (e.g. review.md)')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running and verify only new DOIs whenever the file is saved')
+    parser.add_argument('--interval', type=float, default=1.0,
+                        help='Seconds between checks in --watch mode when inotify is unavailable')
+    args = parser.parse_args()
+
+    filepath = args.file
+    verifier = CitationVerifier()
+
+    if args.watch:
+        if watch_files is None:
+            print("Error: --watch needs the citation-management skill installed alongside")
+            sys.exit(1)
+
+        seen = set()
+
+        def reverify(changed):
+            known = len(verifier.doi_results)
+            report = verifier.verify_citations_in_file(filepath)
+            current = set(report['verified']) | set(report['failed'])
+            print(f"{len(current - seen)} DOIs added, {len(seen - current)} removed, "
+                  f"{len(verifier.doi_results) - known} looked up", file=sys.stderr)
+            seen.clear()
+            seen.update(current)
+            print_report(verifier, report)
+            save_report(report, filepath)
+
+        watch_files([filepath], reverify, interval=args.interval)
+        return
+
+    print(f"Verifying citations in: {filepath}")
+    report = verifier.verify_citations_in_file(filepath)
+
+    print_report(verifier, report)
+
+    # Save detailed report
+    save_report(report, filepath)
+
 if __name__ == "__main__":
     main()
@@ -296,7 +296,8 @@ class OpenAlexClient:
         self,
         entity_type: str,
         group_field: str,
-        filter_params: Optional[Dict] = None
+        filter_params: Optional[Dict] = None,
+        all_groups: bool = False
     ) -> List[Dict[str, Any]]:
         """
         Aggregate results by field.
@@ -305,6 +306,8 @@ class OpenAlexClient:
             entity_type: Type of entity ('works', 'authors', etc.)
             group_field: Field to group by
             filter_params: Optional filters
+            all_groups: Page through every group with cursor paging (otherwise
+                only the first page of groups is returned)
 
         Returns:
             List of grouped results with counts
@@ -317,8 +320,22 @@ class OpenAlexClient:
             filter_str = ','.join([f"{k}:{v}" for k, v in filter_params.items()])
             params['filter'] = filter_str
 
-        response = self._make_request(f"/{entity_type}", params)
-        return response.get('group_by', [])
+        if not all_groups:
+            response = self._make_request(f"/{entity_type}", params)
+            return response.get('group_by', [])
+
+        params['per-page'] = 200
+        params['cursor'] = '*'
+        groups = []
+        while params['cursor']:
+            response = self._make_request(f"/{entity_type}", params)
+            page = response.get('group_by', [])
+            if not page:
+                break
+            groups.extend(page)
+            params['cursor'] = response.get('meta', {}).get('next_cursor')
+
+        return groups
 
 
 if __name__ == "__main__":